@@ -0,0 +1,260 @@
+"""Extract every PDF/DOCX resume under a directory tree, resumably, without going through the HTTP API.
+
+Runs the same pipeline as ``/extract_resume_details/`` (``main.extract_resume``):
+conversion in the process pool, local extraction, revision reuse, the LLM
+scheduler, the extraction cache and the resume store. A checkpoint manifest
+decides what is left to do. Each result is appended to
+``<output>/results.ndjson`` as soon as it finishes, and then recorded in
+``<output>/manifest.sqlite3``. Running the same command again skips every
+file that already succeeded and has not changed since. Failed files are
+tried again.
+
+    python -m backfill /data/resumes --output backfill_output --concurrency 8
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+import converters
+import main
+from scheduler import Priority, current_priority
+from timing import set_file_type, start_request_timing
+from uploads import verify_format
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillManifest:
+    """Which files of a backfill are finished, keyed by path relative to the input root.
+
+    A file counts as done only while its size and modification time are the
+    ones it was extracted with, so an edited file is extracted again.
+    """
+
+    def __init__(self, db_path):
+        # Only ever used from the event loop thread; every write is one small local transaction
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    elapsed_ms REAL NOT NULL,
+                    finished_at REAL NOT NULL
+                )"""
+            )
+
+    def done(self):
+        """``{path: (size, mtime_ns)}`` of the files that succeeded."""
+        rows = self._connection.execute("SELECT path, size, mtime_ns FROM files WHERE status = 'done'")
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def record(self, path, size, mtime_ns, error, elapsed_ms):
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, "failed" if error else "done", error, elapsed_ms, time.time()),
+            )
+
+    def counts(self):
+        return dict(self._connection.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall())
+
+    def close(self):
+        self._connection.close()
+
+
+def find_resumes(root):
+    """``(relative path, size, mtime_ns)`` of every supported file under ``root``, in a stable order."""
+    found = []
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() not in main.SUPPORTED_EXTENSIONS:
+                continue
+            path = os.path.join(directory, filename)
+            info = os.stat(path)
+            found.append((os.path.relpath(path, root), info.st_size, info.st_mtime_ns))
+    return found
+
+
+def read_resume(path):
+    """The file's bytes, after the size and content checks an upload gets."""
+    if os.path.getsize(path) > main.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {main.MAX_UPLOAD_BYTES} bytes.")
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    verify_format(io.BytesIO(file_bytes), os.path.splitext(path)[1].lower())
+    return file_bytes
+
+
+class Progress:
+    """Counts and throughput of a running backfill, logged every ``interval`` seconds."""
+
+    def __init__(self, total, skipped, interval):
+        self.total = total
+        self.skipped = skipped
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.completed = 0
+        self.failed = 0
+        self.bytes = 0
+        self.outcomes = {}
+
+    def add(self, size, error, outcome):
+        self.completed += 1
+        self.bytes += size
+        if error:
+            self.failed += 1
+        else:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval or self.completed == self.total:
+            self.last_report = now
+            logger.info(self.line())
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.completed / elapsed if elapsed else 0.0
+        return {
+            "files": self.total + self.skipped,
+            "skipped": self.skipped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "outcomes": dict(sorted(self.outcomes.items())),
+            "elapsed_seconds": round(elapsed, 1),
+            "files_per_second": round(rate, 2),
+            "mb_per_second": round(self.bytes / 1e6 / elapsed, 2) if elapsed else 0.0,
+            "eta_seconds": round((self.total - self.completed) / rate) if rate else None,
+        }
+
+    def line(self):
+        summary = self.summary()
+        eta = f", ETA {summary['eta_seconds']}s" if summary["eta_seconds"] else ""
+        return (
+            f"{self.completed}/{self.total} files ({self.failed} failed, {self.skipped} skipped as done), "
+            f"{summary['files_per_second']} files/s, {summary['mb_per_second']} MB/s{eta}"
+        )
+
+
+async def run_backfill(root, output, concurrency=4, mode=None, refresh=False, progress_interval=5.0):
+    """Extract every resume under ``root`` not already done according to ``output``'s manifest; returns a summary."""
+    os.makedirs(output, exist_ok=True)
+    manifest = BackfillManifest(os.path.join(output, "manifest.sqlite3"))
+    try:
+        files = await run_in_threadpool(find_resumes, root)
+        done = manifest.done()
+        todo = [entry for entry in files if done.get(entry[0]) != entry[1:]]
+        progress = Progress(len(todo), len(files) - len(todo), progress_interval)
+        logger.info(f"Backfilling {len(todo)} of {len(files)} file(s) under {root} with concurrency {concurrency}")
+
+        pending = asyncio.Queue(maxsize=concurrency)
+        with open(os.path.join(output, "results.ndjson"), "a", encoding="utf-8") as results:
+
+            async def produce():
+                for entry in todo:
+                    await pending.put(entry)
+                for _ in range(concurrency):
+                    await pending.put(None)
+
+            async def work():
+                while True:
+                    entry = await pending.get()
+                    if entry is None:
+                        return
+                    path, size, mtime_ns = entry
+                    timing = start_request_timing()
+                    set_file_type(path)
+                    start = time.perf_counter()
+                    try:
+                        file_bytes = await run_in_threadpool(read_resume, os.path.join(root, path))
+                        result = await main.extract_resume(path, file_bytes, refresh=refresh, mode=mode)
+                        line = {"path": path, **result}
+                        # A part that failed to decode comes back as {"error": ...}; like the cache, don't count it as done
+                        error = "; ".join(
+                            f"{part}: {result[part]['error']}"
+                            for part in ("schema_structured", "formatter_structured")
+                            if "error" in result[part]
+                        ) or None
+                    except HTTPException as e:
+                        error = str(e.detail)
+                    except Exception as e:
+                        logger.error(f"Backfill extraction failed for file: {path}: {e}", exc_info=True)
+                        error = f"Internal Server Error: {e}"
+                    if error:
+                        line = {"path": path, "error": error}
+                    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+                    # The line is written before the manifest says the file is done, so a crash in between
+                    # extracts it again (from the cache) rather than losing it
+                    results.write(json.dumps(line) + "\n")
+                    results.flush()
+                    manifest.record(path, size, mtime_ns, error, elapsed_ms)
+                    progress.add(size, error, timing.outcome or "extracted")
+
+            # Worker tasks inherit this context, so their LLM calls queue behind interactive uploads
+            current_priority.set(Priority.BATCH)
+            await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+        summary = progress.summary()
+        summary["manifest"] = manifest.counts()
+        return summary
+    finally:
+        manifest.close()
+
+
+async def run(args):
+    converters.start_process_pool(args.processes)
+    try:
+        await converters.warm_up_pool()
+        return await run_backfill(
+            args.root,
+            args.output,
+            concurrency=args.concurrency,
+            mode=main.ExtractionMode(args.mode) if args.mode else None,
+            refresh=args.refresh,
+            progress_interval=args.progress_interval,
+        )
+    finally:
+        converters.shutdown_process_pool()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="Directory to search for .pdf and .docx files.")
+    parser.add_argument("--output", default="backfill_output", help="Directory for results.ndjson and the manifest.")
+    parser.add_argument(
+        "--concurrency", type=int, default=main.BATCH_DEFAULT_CONCURRENCY, help="Extractions in flight at once."
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Document conversion processes; 0 converts on the thread pool.",
+    )
+    parser.add_argument(
+        "--mode",
+        default=None,
+        choices=[mode.value for mode in main.ExtractionMode],
+        help="Extraction mode; EXTRACTION_MODE by default.",
+    )
+    parser.add_argument("--refresh", action="store_true", help="Bypass the extraction cache and revision reuse.")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines.")
+    args = parser.parse_args()
+    summary = asyncio.run(run(args))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,159 @@
+"""A/B harness for prompt changes: raw templates (A) against compacted ones (B).
+
+Runs the same fixture corpus through two API processes that differ only in
+their prompt settings (``PROMPT_COMPACTION`` and optionally ``PROMPT_VERSION``)
+and reports, per variant, the input tokens billed (from the API's usage
+metadata, via ``/metrics``), per-request latency, and whether every document
+produced the same extraction as variant A.
+
+Against the local fake server the outputs are canned and input tokens are
+counted as 4 characters each, so that run only checks the plumbing and the
+size of the prompts. Pass ``--live`` (with ``GEMINI_API_KEY`` set) to compare
+against the real model; ``--control`` then re-runs A once more, so the
+A-vs-A disagreement shows how much of the A-vs-B difference is sampling noise.
+
+    python -m benchmarks.ab_prompts --documents 10
+    python -m benchmarks.ab_prompts --live --documents 10 --control --output ab.json
+"""
+import argparse
+import json
+import re
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.load_test import git_commit, percentiles, start_api, start_fake_gemini
+
+_PROMPT_TOKENS = re.compile(r'^resume_llm_tokens_total\{call="([^"]+)",type="prompt",model="[^"]+"\} (\S+)$', re.MULTILINE)
+
+
+def prompt_tokens_by_call(base_url):
+    tokens = {}
+    # Summed over the model tiers each call ran on
+    for call, count in _PROMPT_TOKENS.findall(httpx.get(f"{base_url}/metrics").text):
+        tokens[call] = tokens.get(call, 0) + int(float(count))
+    return tokens
+
+
+def run_variant(name, prompt_env, corpus, warm_up_document, fake_url, args):
+    api, base_url = start_api(fake_url, args, tempfile.mkdtemp(), extra_env=prompt_env)
+    try:
+        prompts = httpx.get(f"{base_url}/prompts/stats").json()
+        outputs, latencies = {}, []
+        with httpx.Client(base_url=base_url, timeout=None) as http:
+            # Converter processes and connections are warm before anything is measured
+            http.post("/extract_resume_details/", files={"file": warm_up_document})
+            tokens_before = prompt_tokens_by_call(base_url)
+            for filename, payload in corpus:
+                start = time.perf_counter()
+                response = http.post("/extract_resume_details/", files={"file": (filename, payload)})
+                latencies.append((time.perf_counter() - start) * 1000)
+                outputs[filename] = response.json() if response.status_code == 200 else {"status": response.status_code}
+        tokens = {
+            call: count - tokens_before.get(call, 0) for call, count in prompt_tokens_by_call(base_url).items()
+        }
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+    return {
+        "name": name,
+        "env": prompt_env,
+        "prompt_version": prompts["prompt_version"],
+        "estimated_prompt_tokens": {prompt: sizes["tokens"] for prompt, sizes in prompts["prompts"].items()},
+        "input_tokens": sum(tokens.values()),
+        "input_tokens_by_call": tokens,
+        "input_tokens_per_document": round(sum(tokens.values()) / len(corpus), 1),
+        "latency": percentiles(latencies),
+        "mean_latency_ms": round(sum(latencies) / len(latencies), 1),
+        "outputs": outputs,
+    }
+
+
+def compare(baseline, variant):
+    """Documents whose extraction differs from the baseline, with the top-level fields that differ."""
+    differing = {}
+    for filename, expected in baseline["outputs"].items():
+        actual = variant["outputs"].get(filename)
+        if actual == expected:
+            continue
+        fields = []
+        for representation in ("schema_structured", "formatter_structured"):
+            expected_part = expected.get(representation) or {}
+            actual_part = (actual or {}).get(representation) or {}
+            fields += [
+                f"{representation}.{field}"
+                for field in sorted(set(expected_part) | set(actual_part))
+                if expected_part.get(field) != actual_part.get(field)
+            ]
+        differing[filename] = fields or ["(response)"]
+    return {
+        "identical": len(baseline["outputs"]) - len(differing),
+        "documents": len(baseline["outputs"]),
+        "differing": differing,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=6, help="Documents per kind.")
+    parser.add_argument("--kinds", default="pdf,docx")
+    parser.add_argument("--mode", default="both", help="EXTRACTION_MODE for both variants.")
+    parser.add_argument("--version-a", default="v1", help="PROMPT_VERSION of variant A.")
+    parser.add_argument("--version-b", default="v1", help="PROMPT_VERSION of variant B.")
+    parser.add_argument("--live", action="store_true", help="Call the real Gemini API instead of the fake server.")
+    parser.add_argument("--control", action="store_true", help="Run variant A a second time as a noise floor.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake Gemini base seconds per call.")
+    parser.add_argument(
+        "--latency-per-kprompt-token", type=float, default=0.05, help="Fake Gemini seconds per 1000 prompt tokens."
+    )
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", default=None, help="Write the full results, outputs included, as JSON here.")
+    args = parser.parse_args()
+
+    kinds = tuple(args.kinds.split(","))
+    corpus = list(build_corpus(args.documents, kinds, seed=args.seed))
+    warm_up_document = next(build_corpus(1, kinds, seed=args.seed - 1))
+    fake_server = fake_url = None
+    if not args.live:
+        backend = FakeBackend(latency=args.latency, latency_per_kprompt_token=args.latency_per_kprompt_token)
+        fake_server, fake_url = start_fake_gemini(backend)
+
+    variants = [
+        ("A", {"PROMPT_VERSION": args.version_a, "PROMPT_COMPACTION": "False"}),
+        ("B", {"PROMPT_VERSION": args.version_b, "PROMPT_COMPACTION": "True"}),
+    ]
+    if args.control:
+        variants.append(("A_control", dict(variants[0][1])))
+    try:
+        results = [run_variant(name, env, corpus, warm_up_document, fake_url, args) for name, env in variants]
+    finally:
+        if fake_server is not None:
+            fake_server.should_exit = True
+
+    baseline = results[0]
+    summary = {
+        "commit": git_commit(),
+        "backend": "gemini" if args.live else "fake",
+        "config": vars(args),
+        "variants": {
+            result["name"]: {
+                **{key: value for key, value in result.items() if key not in ("name", "outputs")},
+                "input_token_change": round(result["input_tokens"] / baseline["input_tokens"] - 1, 3)
+                if baseline["input_tokens"]
+                else None,
+                "matches_A": compare(baseline, result),
+            }
+            for result in results
+        },
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({**summary, "outputs": {result["name"]: result["outputs"] for result in results}}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
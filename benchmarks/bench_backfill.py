@@ -0,0 +1,133 @@
+"""Offline backfill: throughput by LLM concurrency, and what a resumed run redoes after an interruption.
+
+Writes ``--documents`` PDF and DOCX resumes per kind into a directory tree
+and backfills it in-process (``backfill.run_backfill``) against the fake
+Gemini client. Every run passes ``refresh``, so each one extracts every
+file again rather than reading the previous run's cache. Reported:
+
+- Files per second at each ``--concurrency`` level.
+- An interrupted run: the first run is cancelled once half the files are
+  done, and a second run over the same output resumes it. The second run
+  should only extract the files that had not finished.
+- A repeated run over an output that is already complete, which should
+  extract nothing.
+
+    python -m benchmarks.bench_backfill --documents 50 --processes 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+workdir = tempfile.mkdtemp()
+# The API's stores go to a scratch directory before main is imported
+for variable, filename in (
+    ("EXTRACTION_CACHE_PATH", "cache.sqlite3"),
+    ("JOB_QUEUE_PATH", "jobs.sqlite3"),
+    ("REVISION_INDEX_PATH", "revisions.sqlite3"),
+    ("RESUME_STORE_PATH", "resumes.sqlite3"),
+):
+    os.environ[variable] = os.path.join(workdir, filename)
+os.environ.setdefault("GEMINI_API_KEY", "backfill-bench-fake-key")
+
+import backfill  # noqa: E402
+import converters  # noqa: E402
+import main  # noqa: E402
+from benchmarks.corpus import build_corpus  # noqa: E402
+from benchmarks.fake_gemini import FakeGeminiClient  # noqa: E402
+from benchmarks.load_test import git_commit  # noqa: E402
+
+
+def write_tree(root, documents, seed):
+    for index, (filename, payload) in enumerate(build_corpus(documents, ("pdf", "docx"), seed=seed)):
+        directory = os.path.join(root, f"batch_{index % 4}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, filename), "wb") as f:
+            f.write(payload)
+
+
+def finished(manifest_path):
+    manifest = backfill.BackfillManifest(manifest_path)
+    try:
+        return sum(manifest.counts().values())
+    finally:
+        manifest.close()
+
+
+async def interrupted_run(root, output, concurrency, files):
+    """Cancel a backfill once half the files are done, then resume it; returns both runs' counts."""
+    first = asyncio.create_task(backfill.run_backfill(root, output, concurrency, refresh=True, progress_interval=60))
+    manifest = os.path.join(output, "manifest.sqlite3")
+    while True:
+        await asyncio.sleep(0.05)
+        if os.path.exists(manifest) and finished(manifest) >= files // 2:
+            break
+    first.cancel()
+    try:
+        await first
+    except asyncio.CancelledError:
+        pass
+    finished_before = finished(manifest)
+    second = await backfill.run_backfill(root, output, concurrency, refresh=True, progress_interval=60)
+    with open(os.path.join(output, "results.ndjson")) as f:
+        lines = sum(1 for _ in f)
+    return {
+        "finished_before_interrupt": finished_before,
+        "skipped_on_resume": second["skipped"],
+        "extracted_on_resume": second["completed"],
+        "result_lines": lines,
+        "manifest": second["manifest"],
+    }
+
+
+async def run(args):
+    root = os.path.join(workdir, "resumes")
+    write_tree(root, args.documents, args.seed)
+    files = len(backfill.find_resumes(root))
+    converters.start_process_pool(args.processes)
+    await converters.warm_up_pool()
+    try:
+        throughput = {}
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            output = tempfile.mkdtemp(dir=workdir)
+            summary = await backfill.run_backfill(root, output, concurrency, refresh=True, progress_interval=60)
+            throughput[concurrency] = {
+                key: summary[key] for key in ("completed", "failed", "elapsed_seconds", "files_per_second")
+            }
+        resumed_output = tempfile.mkdtemp(dir=workdir)
+        resumed = await interrupted_run(root, resumed_output, max(throughput), files)
+        repeat = await backfill.run_backfill(root, resumed_output, max(throughput), refresh=True, progress_interval=60)
+    finally:
+        converters.shutdown_process_pool()
+    return {
+        "files": files,
+        "throughput_by_concurrency": throughput,
+        "interrupted_and_resumed": resumed,
+        "repeat_of_complete_run": {key: repeat[key] for key in ("skipped", "completed", "elapsed_seconds")},
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=50, help="Documents per kind.")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels to time.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Conversion processes.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake Gemini base seconds per call.")
+    parser.add_argument(
+        "--latency-per-kchar", type=float, default=0.5, help="Fake Gemini generation seconds per 1000 output chars."
+    )
+    parser.add_argument("--seed", type=int, default=25)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    main.client = FakeGeminiClient(latency=args.latency, latency_per_kchar=args.latency_per_kchar)
+    summary = {"commit": git_commit(), "config": vars(args), **asyncio.run(run(args))}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
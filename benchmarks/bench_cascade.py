@@ -0,0 +1,117 @@
+"""Model cascade vs. a single model: latency, the share of resumes finished on the fast tier, and token cost.
+
+Runs the same corpus through two API processes against the local fake Gemini
+server: one on the strong model alone (``GEMINI_MODELS`` set to it) and one
+on the cascade, where every extraction starts on the fast tier. The fast tier
+answers in ``--fast-latency-scale`` of the time and leaves the experience
+sections out of ``--fast-incomplete-rate`` of its answers, which the
+completeness check catches and escalates. Token counts per model come from
+``/metrics``; cost uses the per-million input/output prices below (the
+published paid-tier prices of the two default models at the time of writing).
+
+    python -m benchmarks.bench_cascade --documents 10
+    python -m benchmarks.bench_cascade --documents 10 --fast-incomplete-rate 0.3
+"""
+import argparse
+import json
+import re
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.load_test import git_commit, percentiles, start_api, start_fake_gemini
+
+FAST_MODEL = "gemini-1.5-flash-8b"
+STRONG_MODEL = "gemini-1.5-flash"
+
+# USD per million tokens: (input, output)
+PRICES = {FAST_MODEL: (0.0375, 0.15), STRONG_MODEL: (0.075, 0.30)}
+
+_TOKENS = re.compile(
+    r'^resume_llm_tokens_total\{call="[^"]+",type="(prompt|output)",model="([^"]+)"\} (\S+)$', re.MULTILINE
+)
+
+
+def tokens_by_model(base_url):
+    tokens = {}
+    for token_type, model, count in _TOKENS.findall(httpx.get(f"{base_url}/metrics").text):
+        tokens.setdefault(model, {"prompt": 0, "output": 0})[token_type] += int(float(count))
+    return tokens
+
+
+def cost(tokens):
+    return sum(
+        (counts["prompt"] * PRICES[model][0] + counts["output"] * PRICES[model][1]) / 1e6
+        for model, counts in tokens.items()
+    )
+
+
+def run_variant(name, models, corpus, fake_url, args):
+    env = {"GEMINI_MODELS": ",".join(models), "CONTEXT_CACHE_ENABLED": "False"}
+    api, base_url = start_api(fake_url, args, tempfile.mkdtemp(), extra_env=env)
+    latencies = []
+    try:
+        with httpx.Client(base_url=base_url, timeout=None) as http:
+            for filename, payload in corpus:
+                start = time.perf_counter()
+                http.post("/extract_resume_details/", files={"file": (filename, payload)}).raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+        tokens = tokens_by_model(base_url)
+        cascade = httpx.get(f"{base_url}/cascade/stats").json()
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+    first_tier = cascade["tiers"][models[0]]
+    return {
+        "name": name,
+        "models": models,
+        "latency": percentiles(latencies),
+        "mean_latency_ms": round(sum(latencies) / len(latencies), 1),
+        "finished_on_first_tier": round(first_tier["accepted"] / first_tier["attempts"], 3),
+        "tiers": cascade["tiers"],
+        "tokens": tokens,
+        "cost_usd_per_1000_documents": round(cost(tokens) / len(corpus) * 1000, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10, help="Documents per kind.")
+    parser.add_argument("--kinds", default="pdf,docx")
+    parser.add_argument("--mode", default="both", help="EXTRACTION_MODE for both variants.")
+    parser.add_argument("--latency", type=float, default=0.8, help="Fake seconds per call on the strong model.")
+    parser.add_argument("--fast-latency-scale", type=float, default=0.5, help="Fast tier latency relative to strong.")
+    parser.add_argument(
+        "--fast-incomplete-rate", type=float, default=0.1, help="Share of fast-tier answers missing experience."
+    )
+    parser.add_argument("--seed", type=int, default=20)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    corpus = list(build_corpus(args.documents, tuple(args.kinds.split(",")), seed=args.seed))
+    backend = FakeBackend(
+        latency=args.latency,
+        model_latency_scale={FAST_MODEL: args.fast_latency_scale},
+        model_incomplete_rate={FAST_MODEL: args.fast_incomplete_rate},
+    )
+    fake_server, fake_url = start_fake_gemini(backend)
+    try:
+        results = [
+            run_variant("single", [STRONG_MODEL], corpus, fake_url, args),
+            run_variant("cascade", [FAST_MODEL, STRONG_MODEL], corpus, fake_url, args),
+        ]
+    finally:
+        fake_server.should_exit = True
+
+    summary = {"commit": git_commit(), "config": vars(args), "variants": {result["name"]: result for result in results}}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Cold-start benchmark: import time, time to a listening port and time to the first extraction.
+
+Every run starts from a fresh interpreter, the way a scaled-to-zero instance
+does. ``import main`` is timed in its own process; then ``uvicorn main:app`` is
+spawned against the local fake Gemini server and a resume is uploaded the
+moment the port answers, followed by a second upload to show what a warm
+request costs. Medians over ``--runs`` are printed as JSON.
+
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --runs 5 --no-warmup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.load_test import REPO_ROOT, free_port, git_commit, parse_server_timing, start_fake_gemini
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+
+
+def api_env(fake_url, workdir, warmup):
+    return dict(
+        os.environ,
+        GEMINI_API_KEY="cold-start-fake-key",
+        GEMINI_BASE_URL=fake_url,
+        EXTRACTION_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+        JOB_QUEUE_PATH=os.path.join(workdir, "jobs.sqlite3"),
+        REVISION_INDEX_PATH=os.path.join(workdir, "revisions.sqlite3"),
+        RESUME_STORE_PATH=os.path.join(workdir, "resumes.sqlite3"),
+        WARMUP_ON_STARTUP=str(warmup),
+    )
+
+
+def time_import(env):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def upload(http, base_url, filename, payload):
+    start = time.perf_counter()
+    response = http.post(f"{base_url}/extract_resume_details/", files={"file": (filename, payload)})
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000, parse_server_timing(response.headers.get("server-timing"))
+
+
+def time_server_start(env, corpus, workdir, delay):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    spawned = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=open(os.path.join(workdir, "api.log"), "a"),
+    )
+    try:
+        with httpx.Client(timeout=None) as http:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"API server exited with code {process.returncode}, see {workdir}/api.log")
+                try:
+                    http.get(f"{base_url}/cache/stats", timeout=1.0)
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            ready_ms = (time.perf_counter() - spawned) * 1000
+            time.sleep(delay)
+
+            (first_name, first_payload), (second_name, second_payload) = corpus
+            first_ms, first_stages = upload(http, base_url, first_name, first_payload)
+            second_ms, _ = upload(http, base_url, second_name, second_payload)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {
+        "port_ready_ms": ready_ms,
+        "first_response_ms": ready_ms + delay * 1000 + first_ms,
+        "first_request_ms": first_ms,
+        "second_request_ms": second_ms,
+        "first_request_stages": first_stages,
+    }
+
+
+def median_of(runs, key):
+    return round(statistics.median(run[key] for run in runs), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--kind", default="docx", choices=("pdf", "docx"))
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake Gemini seconds per call.")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between the port opening and the first upload.")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="Set WARMUP_ON_STARTUP=False.")
+    parser.add_argument("--output", default=None, help="Write the full results as JSON here.")
+    args = parser.parse_args()
+
+    fake_server, fake_url = start_fake_gemini(FakeBackend(latency=args.latency))
+    workdir = tempfile.mkdtemp()
+    imports, starts = [], []
+    try:
+        for run in range(args.runs):
+            # Fresh documents and cache files per run, so every first request goes all the way to the model
+            run_dir = tempfile.mkdtemp(dir=workdir)
+            env = api_env(fake_url, run_dir, args.warmup)
+            imports.append(time_import(env))
+            corpus = list(build_corpus(2, (args.kind,), seed=1000 + run))
+            starts.append(time_server_start(env, corpus, run_dir, args.delay))
+    finally:
+        fake_server.should_exit = True
+
+    stage_names = sorted({name for run in starts for name in run["first_request_stages"]})
+    summary = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "import_main_ms": round(statistics.median(imports), 1),
+        "port_ready_ms": median_of(starts, "port_ready_ms"),
+        "first_response_ms": median_of(starts, "first_response_ms"),
+        "first_request_ms": median_of(starts, "first_request_ms"),
+        "second_request_ms": median_of(starts, "second_request_ms"),
+        "first_request_stages_ms": {
+            name: round(statistics.median(run["first_request_stages"].get(name, 0.0) for run in starts), 1)
+            for name in stage_names
+        },
+        "runs": [dict(run, import_main_ms=round(imported, 1)) for run, imported in zip(starts, imports)],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    print(json.dumps({k: v for k, v in summary.items() if k != "runs"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
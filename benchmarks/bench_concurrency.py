@@ -0,0 +1,117 @@
+"""Concurrency benchmark for ``/extract_resume_details/`` against a fake Gemini.
+
+Compares the previous sequential, blocking extraction against the concurrent
+async path on a single event loop.
+
+    python -m benchmarks.bench_concurrency --latency 0.5 --requests 32 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-fake-key")
+# Isolate the LLM stage: the fake uploads are not real PDFs
+os.environ.setdefault("PDF_TEXT_EXTRACTION", "False")
+os.environ.setdefault("EXTRACTION_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench_cache.sqlite3"))
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "bench_jobs.sqlite3"))
+os.environ.setdefault("REVISION_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "bench_revisions.sqlite3"))
+os.environ.setdefault("RESUME_STORE_PATH", os.path.join(tempfile.mkdtemp(), "bench_resumes.sqlite3"))
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks.fake_gemini import FakeGeminiClient  # noqa: E402
+
+
+async def legacy_extract_from_part(resume_part, mode=None, reused=None):
+    """The pre-async behaviour: two blocking calls in sequence on the event loop (``reused`` is ignored)."""
+    schema_prompt = main.compiled_prompt("schema")
+    formatter_prompt = main.compiled_prompt("formatter")
+    schema_response = main.get_client().models.generate_content(
+        model=main.model_cascade.models[0],
+        contents=[resume_part, schema_prompt.part],
+        config=schema_prompt.config,
+    )
+    formatter_response = main.get_client().models.generate_content(
+        model=main.model_cascade.models[0],
+        contents=[resume_part, formatter_prompt.part],
+        config=formatter_prompt.config,
+    )
+    return (
+        main.decode_json_response(schema_response, "Schema"),
+        main.decode_json_response(formatter_response, "Formatter"),
+    )
+
+
+async def run_load(total_requests, concurrency, mode):
+    semaphore = asyncio.Semaphore(concurrency)
+    # Unique bytes per upload so the extraction cache never short-circuits the LLM path
+    run_id = uuid.uuid4().hex
+    latencies = []
+    transport = httpx.ASGITransport(app=main.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await http.post(
+                    "/extract_resume_details/",
+                    params={"mode": mode},
+                    files={"file": (f"resume_{i}.pdf", f"%PDF-1.4 {run_id} {i}".encode(), "application/pdf")},
+                )
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total_requests / elapsed, 2),
+        "mean_latency_s": round(statistics.mean(latencies), 3),
+        "max_latency_s": round(max(latencies), 3),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake Gemini latency per call in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--mode", default="both", choices=[m.value for m in main.ExtractionMode])
+    parser.add_argument("--skip-legacy", action="store_true", help="Only benchmark the async path.")
+    args = parser.parse_args()
+
+    concurrent_extract = main.extract_from_part
+    variants = [("async", concurrent_extract)]
+    if not args.skip_legacy:
+        variants.insert(0, ("legacy", legacy_extract_from_part))
+
+    results = []
+    for name, extract in variants:
+        main.extract_from_part = extract
+        for concurrency in args.concurrency:
+            main.client = FakeGeminiClient(latency=args.latency, jitter=args.jitter)
+            result = asyncio.run(run_load(args.requests, concurrency, args.mode))
+            result["variant"] = name
+            result["mode"] = args.mode
+            result["llm_calls"] = main.client.backend.calls
+            result["peak_llm_in_flight"] = main.client.backend.peak_in_flight
+            results.append(result)
+            print(json.dumps(result))
+    main.extract_from_part = concurrent_extract
+    return results
+
+
+if __name__ == "__main__":
+    main_cli()
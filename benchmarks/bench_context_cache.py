@@ -0,0 +1,154 @@
+"""Context caching on vs. off: input tokens billed, latency and time to the first streamed section.
+
+Runs the same corpus through two API processes against the local fake Gemini
+server, one with ``CONTEXT_CACHE_ENABLED=False`` (every call resends its prompt)
+and one with it on (calls reference the prompt cached at startup). Half the
+documents go to the blocking endpoint and half to the SSE endpoint. Prompt
+tokens and cached tokens come from the API's usage metrics (``/metrics``);
+``effective_input_tokens`` prices cached tokens at ``--cached-token-price``
+of a regular input token. The fake server charges ``--latency-per-kprompt-token``
+of prefill time for uncached prompt tokens only, so the latency columns show
+what skipping the prompt's prefill is worth at that rate.
+
+    python -m benchmarks.bench_context_cache --documents 10
+    python -m benchmarks.bench_context_cache --documents 10 --cache-min-tokens 32768
+"""
+import argparse
+import json
+import re
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.load_test import git_commit, percentiles, start_api, start_fake_gemini
+
+_TOKENS = re.compile(
+    r'^resume_llm_tokens_total\{call="[^"]+",type="(prompt|cached)",model="[^"]+"\} (\S+)$', re.MULTILINE
+)
+
+
+def tokens_by_type(base_url):
+    totals = {"prompt": 0, "cached": 0}
+    for token_type, count in _TOKENS.findall(httpx.get(f"{base_url}/metrics").text):
+        totals[token_type] += int(float(count))
+    return totals
+
+
+def wait_for_warm_up(base_url, timeout=30.0):
+    """The startup warm-up creates the caches in the background; measure only once it has settled."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = httpx.get(f"{base_url}/context_cache/stats").json()
+        expected = len(stats["prompts"]) * len(httpx.get(f"{base_url}/cascade/stats").json()["models"])
+        if not stats["enabled"] or len(stats["caches"]) + len(stats["unavailable"]) >= expected:
+            return stats
+        time.sleep(0.1)
+    return stats
+
+
+def time_streaming(http, filename, payload):
+    start = time.perf_counter()
+    first_section = None
+    with http.stream("POST", "/extract_resume_details/stream/", files={"file": (filename, payload)}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line == "event: section" and first_section is None:
+                first_section = (time.perf_counter() - start) * 1000
+    return first_section, (time.perf_counter() - start) * 1000
+
+
+def run_variant(name, enabled, corpus, warm_up_document, fake_url, args):
+    env = {"CONTEXT_CACHE_ENABLED": str(enabled), "CONTEXT_CACHE_MIN_TOKENS": str(args.cache_min_tokens)}
+    api, base_url = start_api(fake_url, args, tempfile.mkdtemp(), extra_env=env)
+    half = len(corpus) // 2
+    try:
+        cache_stats = wait_for_warm_up(base_url)
+        blocking, first_sections, streams = [], [], []
+        with httpx.Client(base_url=base_url, timeout=None) as http:
+            http.post("/extract_resume_details/", files={"file": warm_up_document})
+            before = tokens_by_type(base_url)
+            for filename, payload in corpus[:half]:
+                start = time.perf_counter()
+                http.post("/extract_resume_details/", files={"file": (filename, payload)}).raise_for_status()
+                blocking.append((time.perf_counter() - start) * 1000)
+            for filename, payload in corpus[half:]:
+                first_section, total = time_streaming(http, filename, payload)
+                first_sections.append(first_section)
+                streams.append(total)
+        after = tokens_by_type(base_url)
+        cache_stats = httpx.get(f"{base_url}/context_cache/stats").json()
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+    prompt_tokens = after["prompt"] - before["prompt"]
+    cached_tokens = after["cached"] - before["cached"]
+    effective = prompt_tokens - cached_tokens + cached_tokens * args.cached_token_price
+    return {
+        "name": name,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "effective_input_tokens": round(effective),
+        "effective_input_tokens_per_document": round(effective / len(corpus), 1),
+        "blocking_latency": percentiles(blocking),
+        "stream_time_to_first_section": percentiles(first_sections),
+        "stream_total": percentiles(streams),
+        "context_cache": {key: value for key, value in cache_stats.items() if key != "caches"},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=6, help="Documents per kind.")
+    parser.add_argument("--kinds", default="pdf,docx")
+    parser.add_argument("--mode", default="both", help="EXTRACTION_MODE for both variants.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake Gemini base seconds per call.")
+    parser.add_argument(
+        "--latency-per-kprompt-token", type=float, default=0.1, help="Fake Gemini prefill seconds per 1000 uncached tokens."
+    )
+    parser.add_argument(
+        "--cache-min-tokens", type=int, default=0, help="Fake Gemini refuses smaller caches (32768 for gemini-1.5-flash)."
+    )
+    parser.add_argument("--cached-token-price", type=float, default=0.25, help="Price of a cached token vs. a regular one.")
+    parser.add_argument("--seed", type=int, default=19)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    kinds = tuple(args.kinds.split(","))
+    corpus = list(build_corpus(args.documents, kinds, seed=args.seed))
+    warm_up_document = next(build_corpus(1, kinds, seed=args.seed - 1))
+    backend = FakeBackend(
+        latency=args.latency,
+        latency_per_kprompt_token=args.latency_per_kprompt_token,
+        cache_min_tokens=args.cache_min_tokens,
+    )
+    fake_server, fake_url = start_fake_gemini(backend)
+    try:
+        results = [
+            run_variant(name, enabled, corpus, warm_up_document, fake_url, args)
+            for name, enabled in (("inline", False), ("cached", True))
+        ]
+    finally:
+        fake_server.should_exit = True
+
+    inline, cached = results
+    summary = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "variants": {result["name"]: result for result in results},
+        "effective_input_token_change": round(
+            cached["effective_input_tokens"] / inline["effective_input_tokens"] - 1, 3
+        )
+        if inline["effective_input_tokens"]
+        else None,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""DOCX conversion benchmark: per-request MarkItDown + temp file vs. warm in-memory converter.
+
+Each variant runs in a process of its own and reports per-file conversion
+time, tracemalloc peak and how far the conversions raised the process's peak
+RSS above what it was after set-up (importing MarkItDown, and building the
+warm converter for ``warm_in_memory``). Throughput through the shared process
+pool is reported as well.
+
+    python -m benchmarks.bench_docx_conversion --count 30 --processes 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import converters
+from benchmarks.corpus import build_corpus
+
+
+def legacy_convert(file_bytes):
+    """The previous path: write a temp file and build a fresh MarkItDown per request."""
+    from markitdown import MarkItDown
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp_file:
+        tmp_file.write(file_bytes)
+        docx_path = tmp_file.name
+    try:
+        return MarkItDown().convert(docx_path).text_content
+    finally:
+        os.unlink(docx_path)
+
+
+def _setup_legacy():
+    import markitdown  # noqa: F401
+
+
+# Set-up that is not timed, and the per-file conversion that is
+VARIANTS = {
+    "legacy_tempfile_fresh_converter": (_setup_legacy, legacy_convert),
+    "warm_in_memory": (converters._get_markitdown, converters.docx_to_text_markitdown),
+}
+
+
+def _peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(label, corpus):
+    setup, convert = VARIANTS[label]
+    start = time.perf_counter()
+    setup()
+    setup_ms = (time.perf_counter() - start) * 1000
+    baseline = _peak_rss_kb()
+    timings = []
+    tracemalloc.start()
+    for _, file_bytes in corpus:
+        start = time.perf_counter()
+        convert(file_bytes)
+        timings.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "variant": label,
+        "files": len(corpus),
+        "setup_ms": round(setup_ms, 2),
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p95_ms": round(sorted(timings)[int(0.95 * (len(timings) - 1))], 2),
+        "tracemalloc_peak_kb": round(peak / 1024, 1),
+        "peak_rss_growth_kb": _peak_rss_kb() - baseline,
+    }
+
+
+async def pool_throughput(corpus, processes):
+    converters.start_process_pool(processes)
+    try:
+        # Warm the workers so pool start-up is not counted
+        await asyncio.gather(*(converters.run_conversion(converters.docx_to_text_markitdown, corpus[0][1])
+                               for _ in range(max(processes, 1))))
+        start = time.perf_counter()
+        await asyncio.gather(*(converters.run_conversion(converters.docx_to_text_markitdown, file_bytes)
+                               for _, file_bytes in corpus))
+        elapsed = time.perf_counter() - start
+    finally:
+        converters.shutdown_process_pool()
+    return {"variant": f"pool_{processes}", "files": len(corpus), "files_per_s": round(len(corpus) / elapsed, 1)}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    corpus = list(build_corpus(args.count, kinds=("docx",)))
+    results = []
+    for label in VARIANTS:
+        # A fresh process per variant, so one's peak RSS and warm converter do not carry over to the next
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(measure, label, corpus).result())
+    results.append(asyncio.run(pool_throughput(corpus, args.processes)))
+    for result in results:
+        print(json.dumps(result))
+    return results
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,106 @@
+"""Bulk export throughput and memory: Parquet, Arrow and NDJSON against one JSON file per resume.
+
+Fills a fresh ``ResumeStore`` with ``--resumes`` synthetic records (see
+``bench_resume_store``), then exports all of them once per format, each in
+its own process so that its peak memory can be measured on its own:
+
+- ``parquet`` and ``arrow``: ``export.write_tables``, one file per normalized
+  table.
+- ``ndjson``: ``export.iter_ndjson`` for every table, written to one file
+  per table.
+- ``json_files``: the old route, where each record becomes a pretty-printed
+  JSON document.
+
+Records and table rows per second, output size, and the process's peak RSS
+above its baseline are reported. Run it with two ``--resumes`` values to see
+whether memory stays flat as the store grows.
+
+    python -m benchmarks.bench_export --resumes 20000
+"""
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.bench_resume_store import build_records
+from benchmarks.load_test import git_commit
+from export import TABLES, iter_ndjson, write_tables
+from resume_store import ResumeStore
+
+FORMATS = ("parquet", "arrow", "ndjson", "json_files")
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _size_mb(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 1e6
+
+
+def run_format(db_path, export_format, chunk_size):
+    store = ResumeStore(db_path)
+    baseline = _peak_rss_mb()
+    directory = tempfile.mkdtemp()
+    start = time.perf_counter()
+    if export_format in ("parquet", "arrow"):
+        counts = write_tables(store.iter_records(chunk_size), directory, export_format, chunk_size)
+    elif export_format == "ndjson":
+        counts = {}
+        for table in TABLES:
+            with open(os.path.join(directory, f"{table}.ndjson"), "wb") as f:
+                counts[table] = 0
+                for block in iter_ndjson(store.iter_records(chunk_size), table, chunk_size):
+                    f.write(block)
+                    counts[table] += block.count(b"\n")
+    else:
+        counts = {"resumes": 0}
+        for resume in store.iter_records(chunk_size):
+            with open(os.path.join(directory, f"resume_{resume['id']}.json"), "w") as f:
+                json.dump(resume["record"], f, indent=4)
+            counts["resumes"] += 1
+    seconds = time.perf_counter() - start
+    return {
+        "format": export_format,
+        "seconds": round(seconds, 2),
+        "resumes_per_second": round(counts["resumes"] / seconds, 1),
+        "rows_per_second": round(sum(counts.values()) / seconds, 1),
+        "rows": counts,
+        "output_mb": round(_size_mb(directory), 1),
+        "peak_rss_growth_mb": round(_peak_rss_mb() - baseline, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Resumes flattened and written at a time.")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--seed", type=int, default=24)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "resumes.sqlite3")
+    store = ResumeStore(db_path)
+    for index, record in enumerate(build_records(args.resumes, args.seed)):
+        store.add(f"document-{index}", f"resume_{index:05d}.pdf", record)
+
+    results = []
+    for export_format in args.formats.split(","):
+        # A fresh process per format, so each peak RSS is its own
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(run_format, db_path, export_format, args.chunk_size).result())
+
+    summary = {"commit": git_commit(), "config": vars(args), "formats": {result["format"]: result for result in results}}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Tail latency with and without hedged requests against a heavy-tailed fake Gemini,
+plus the circuit breaker failing fast against a failing one.
+
+    python -m benchmarks.bench_hedging --latency 0.2 --sigma 1.0 --calls 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-fake-key")
+os.environ.setdefault("EXTRACTION_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench_cache.sqlite3"))
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "bench_jobs.sqlite3"))
+os.environ.setdefault("REVISION_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "bench_revisions.sqlite3"))
+os.environ.setdefault("RESUME_STORE_PATH", os.path.join(tempfile.mkdtemp(), "bench_resumes.sqlite3"))
+
+import main  # noqa: E402
+from benchmarks.fake_gemini import FakeGeminiClient  # noqa: E402
+from google.genai import errors as genai_errors  # noqa: E402
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller  # noqa: E402
+from scheduler import LLMScheduler  # noqa: E402
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1)
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(ordered[-1] * 1000, 1)}
+
+
+async def timed_calls(calls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await main.llm_generate(["resume text", "prompt"], {"response_mime_type": "application/json"}, call="schema")
+            # Only the failures the backend and breaker produce; anything else is a bug in the benchmark
+            except (genai_errors.APIError, CircuitOpenError, asyncio.TimeoutError):
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies, failures
+
+
+def configure(hedging, hedge_percentile=0.9, hedge_min_delay=0.0):
+    main.llm_scheduler = LLMScheduler(max_concurrency=10_000, max_retries=0)
+    main.llm_resilience = ResilientCaller(
+        breaker=CircuitBreaker(failure_threshold=5, reset_timeout=5.0),
+        hedge_percentile=hedge_percentile,
+        hedge_min_delay=hedge_min_delay,
+        hedging_enabled=hedging,
+        is_failure=main.is_retryable_llm_error,
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.1, help="Median fake latency in seconds.")
+    parser.add_argument("--sigma", type=float, default=1.0, help="Lognormal sigma of the latency tail.")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--hedge-percentile", type=float, default=0.9)
+    args = parser.parse_args()
+
+    results = []
+    for hedging in (False, True):
+        configure(hedging, args.hedge_percentile)
+        main.client = FakeGeminiClient(latency=args.latency, latency_sigma=args.sigma)
+        latencies, failures = asyncio.run(timed_calls(args.calls, args.concurrency))
+        results.append({
+            "variant": "hedged" if hedging else "plain",
+            "calls": args.calls,
+            "failures": failures,
+            "backend_calls": main.client.backend.calls,
+            **percentiles(latencies),
+            "resilience": main.llm_resilience.stats(),
+        })
+
+    configure(False)
+    main.client = FakeGeminiClient(latency=args.latency, error_rate=1.0)
+    latencies, failures = asyncio.run(timed_calls(50, 1))
+    results.append({
+        "variant": "breaker_against_failing_backend",
+        "calls": 50,
+        "failures": failures,
+        "backend_calls": main.client.backend.calls,
+        **percentiles(latencies),
+        "resilience": main.llm_resilience.stats(),
+    })
+    for result in results:
+        print(json.dumps(result))
+    return results
+
+
+if __name__ == "__main__":
+    main_cli()
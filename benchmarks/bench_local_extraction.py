@@ -0,0 +1,113 @@
+"""Local extraction on vs. off: output tokens, latency, and how often each section is filled locally.
+
+Runs the same corpus through two API processes against the local fake Gemini
+server, one with ``LOCAL_EXTRACTION=False`` (the model writes every section)
+and one with it on (education, certifications and skills are filled from the
+converted text and left out of the calls). The fake server leaves out the
+sections the request asks it to, and charges ``--latency-per-kchar`` of
+generation time for what it does write, so the latency columns show what the
+shorter answers are worth at that rate. Output tokens come from the API's
+usage metrics (``/metrics``), the local extraction time from its stage timings.
+
+    python -m benchmarks.bench_local_extraction --documents 10
+    python -m benchmarks.bench_local_extraction --documents 10 --mode combined
+"""
+import argparse
+import json
+import re
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.load_test import git_commit, percentiles, start_api, start_fake_gemini
+
+_OUTPUT_TOKENS = re.compile(r'^resume_llm_tokens_total\{call="([^"]+)",type="output",model="[^"]+"\} (\S+)$', re.MULTILINE)
+_LOCAL_EXTRACT = re.compile(
+    r'^resume_stage_duration_seconds_(sum|count)\{stage="local_extract",file_type="[^"]+"\} (\S+)$', re.MULTILINE
+)
+
+
+def scrape(base_url):
+    text = httpx.get(f"{base_url}/metrics").text
+    output_tokens = {}
+    for call, count in _OUTPUT_TOKENS.findall(text):
+        output_tokens[call] = output_tokens.get(call, 0) + int(float(count))
+    local = {"sum": 0.0, "count": 0.0}
+    for kind, value in _LOCAL_EXTRACT.findall(text):
+        local[kind] += float(value)
+    return output_tokens, local
+
+
+def run_variant(name, enabled, corpus, fake_url, args):
+    env = {"LOCAL_EXTRACTION": str(enabled), "CONTEXT_CACHE_ENABLED": "False", "GEMINI_MODELS": args.model}
+    api, base_url = start_api(fake_url, args, tempfile.mkdtemp(), extra_env=env)
+    latencies = []
+    try:
+        with httpx.Client(base_url=base_url, timeout=None) as http:
+            for filename, payload in corpus:
+                start = time.perf_counter()
+                http.post("/extract_resume_details/", files={"file": (filename, payload)}).raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+        output_tokens, local = scrape(base_url)
+        local_stats = httpx.get(f"{base_url}/local_extraction/stats").json()
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+    total_output = sum(output_tokens.values())
+    return {
+        "name": name,
+        "output_tokens": total_output,
+        "output_tokens_per_document": round(total_output / len(corpus), 1),
+        "output_tokens_by_call": output_tokens,
+        "latency": percentiles(latencies),
+        "mean_latency_ms": round(sum(latencies) / len(latencies), 1),
+        "local_extract_mean_ms": round(local["sum"] / local["count"] * 1000, 2) if local["count"] else None,
+        "fill_rates": {section: counts["fill_rate"] for section, counts in local_stats["sections"].items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10, help="Documents per kind.")
+    parser.add_argument("--kinds", default="pdf,docx")
+    parser.add_argument("--mode", default="both", help="EXTRACTION_MODE for both variants.")
+    parser.add_argument("--model", default="gemini-1.5-flash", help="Single model tier for both variants.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake Gemini base seconds per call.")
+    parser.add_argument(
+        "--latency-per-kchar", type=float, default=0.5, help="Fake Gemini generation seconds per 1000 output chars."
+    )
+    parser.add_argument("--seed", type=int, default=21)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    corpus = list(build_corpus(args.documents, tuple(args.kinds.split(",")), seed=args.seed))
+    backend = FakeBackend(latency=args.latency, latency_per_kchar=args.latency_per_kchar)
+    fake_server, fake_url = start_fake_gemini(backend)
+    try:
+        results = [
+            run_variant(name, enabled, corpus, fake_url, args) for name, enabled in (("model_only", False), ("local", True))
+        ]
+    finally:
+        fake_server.should_exit = True
+
+    model_only, local = results
+    summary = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "variants": {result["name"]: result for result in results},
+        "output_token_change": round(local["output_tokens"] / model_only["output_tokens"] - 1, 3)
+        if model_only["output_tokens"]
+        else None,
+        "mean_latency_change": round(local["mean_latency_ms"] / model_only["mean_latency_ms"] - 1, 3),
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Local PDF text extraction vs. sending raw PDF bytes to Gemini.
+
+Reports per-file extraction latency and input-token counts for both
+representations. Token counts come from ``count_tokens`` when
+``--count-tokens`` is given (needs GEMINI_API_KEY); otherwise they are
+estimated with Gemini's documented 258 tokens per PDF page plus ~4 chars per
+text token. ``--live`` additionally times a real ``generate_content`` call
+with each representation.
+
+    python -m benchmarks.bench_pdf_text --count 20 --scanned-ratio 0.2
+    python -m benchmarks.bench_pdf_text --corpus-dir ~/resumes --count-tokens --live
+"""
+import argparse
+import io
+import json
+import os
+import pathlib
+import statistics
+import time
+
+import pdfplumber
+
+from benchmarks.corpus import build_corpus
+from converters import pdf_to_text
+
+PDF_PAGE_TOKENS = 258
+CHARS_PER_TOKEN = 4
+
+
+def load_corpus(args):
+    if args.corpus_dir:
+        for path in sorted(pathlib.Path(args.corpus_dir).expanduser().rglob("*.pdf")):
+            yield path.name, path.read_bytes()
+    else:
+        yield from build_corpus(args.count, kinds=("pdf",), scanned_ratio=args.scanned_ratio)
+
+
+def estimate_tokens(file_bytes, text):
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        pages = len(pdf.pages)
+    text_tokens = len(text or "") // CHARS_PER_TOKEN
+    return PDF_PAGE_TOKENS * pages + text_tokens, (text_tokens if text else None)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus-dir", help="Directory of real PDF resumes; defaults to a synthetic corpus.")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--scanned-ratio", type=float, default=0.2)
+    parser.add_argument("--count-tokens", action="store_true")
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--model", default="gemini-1.5-flash")
+    args = parser.parse_args()
+
+    client = None
+    if args.count_tokens or args.live:
+        from google import genai
+        from google.genai import types
+
+        client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+
+    rows = []
+    for filename, file_bytes in load_corpus(args):
+        start = time.perf_counter()
+        text = pdf_to_text(file_bytes)
+        row = {
+            "file": filename,
+            "bytes": len(file_bytes),
+            "text_layer": text is not None,
+            "extract_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if client is not None:
+            pdf_part = types.Part.from_bytes(data=file_bytes, mime_type="application/pdf")
+            text_part = types.Part.from_text(text=text) if text else None
+            row["pdf_tokens"] = client.models.count_tokens(model=args.model, contents=[pdf_part]).total_tokens
+            row["text_tokens"] = (
+                client.models.count_tokens(model=args.model, contents=[text_part]).total_tokens if text_part else None
+            )
+            if args.live:
+                for label, part in (("pdf", pdf_part), ("text", text_part)):
+                    if part is None:
+                        continue
+                    start = time.perf_counter()
+                    client.models.generate_content(
+                        model=args.model,
+                        contents=[part, "Return the candidate's name and latest job title as JSON."],
+                        config={"response_mime_type": "application/json"},
+                    )
+                    row[f"{label}_llm_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        else:
+            row["pdf_tokens"], row["text_tokens"] = estimate_tokens(file_bytes, text)
+        rows.append(row)
+        print(json.dumps(row))
+
+    fast_path = [row for row in rows if row["text_tokens"]]
+    summary = {
+        "files": len(rows),
+        "text_layer_files": len(fast_path),
+        "mean_extract_ms": round(statistics.mean(row["extract_ms"] for row in rows), 2) if rows else None,
+        "token_reduction": (
+            round(1 - sum(row["text_tokens"] for row in fast_path) / sum(row["pdf_tokens"] for row in fast_path), 3)
+            if fast_path else None
+        ),
+        "token_source": "count_tokens" if client is not None else "estimate",
+    }
+    for label in ("pdf", "text"):
+        timings = [row[f"{label}_llm_ms"] for row in rows if f"{label}_llm_ms" in row]
+        if timings:
+            summary[f"mean_{label}_llm_ms"] = round(statistics.mean(timings), 1)
+    print(json.dumps(summary))
+    return summary
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,117 @@
+"""Resume store: ingest throughput and query latency over a large set of extracted records.
+
+Fills a fresh ``ResumeStore`` in-process with ``--resumes`` synthetic
+ResumeSchema records. Skills are drawn from the taxonomy, and roles,
+clients, degrees, certifications and bullets from the benchmark corpus. It
+then times each kind of query the ``/resumes/search`` endpoint serves:
+keywords, all of some skills, any of them, skills with keywords, a role
+phrase, a client with an education level, and a deep page. No model is
+involved, so the numbers are the store alone (SQLite FTS5 plus the skill and
+education indexes). Skill spellings go through the same taxonomy matcher the
+API uses.
+
+    python -m benchmarks.bench_resume_store --resumes 20000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.corpus import CERTIFICATIONS, COMPANIES, DEGREES, OBJECTS, ROLES, VERBS
+from benchmarks.load_test import git_commit, percentiles
+from local_extraction import SKILLS_TAXONOMY_PATH, load_skill_matcher
+from resume_store import ResumeStore
+
+QUERIES = {
+    "keyword": {"keywords": "streaming pipeline"},
+    "keyword_prefix": {"keywords": "kube*"},
+    "skills_all": {"skills": ["python", "k8s"]},
+    "skills_any": {"skills": ["Rust", "Go", "Scala"], "match_all_skills": False},
+    "skills_and_keyword": {"skills": ["PyTorch"], "keywords": "feature store"},
+    "role": {"role": "machine learning engineer"},
+    "client_and_education": {"client": "Globex", "education": "master"},
+    "deep_page": {"keywords": "billing", "offset": 2000},
+}
+
+
+def build_records(count, seed):
+    with open(SKILLS_TAXONOMY_PATH) as f:
+        categories = json.load(f)["categories"]
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        jobs = [
+            {
+                "client": rng.choice(COMPANIES),
+                "Project": None,
+                "role": rng.choice(ROLES),
+                "location": "San Francisco, USA",
+                "duration": "Jan 2020 - Dec 2023",
+                "description": [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}." for _ in range(4)],
+            }
+            for _ in range(rng.randint(1, 4))
+        ]
+        credits = [
+            {"category": category, "items": rng.sample(skills, min(len(skills), rng.randint(2, 6)))}
+            for category, skills in rng.sample(sorted(categories.items()), 3)
+        ]
+        records.append(
+            {
+                "professional_summary": f"{rng.randint(2, 20)}+ years as a {jobs[0]['role']}.",
+                "professional_experience": [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}."],
+                "awards": [],
+                "certifications": [{"certification": c} for c in rng.sample(CERTIFICATIONS, rng.randint(0, 2))],
+                "education": [{"degree": rng.choice(DEGREES)}],
+                "credits": credits,
+                "work_experience": jobs,
+                "project_experience": [],
+            }
+        )
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=50, help="Timed runs of each query.")
+    parser.add_argument("--limit", type=int, default=20, help="Page size.")
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    records = build_records(args.resumes, args.seed)
+    matcher, _ = load_skill_matcher()
+    store = ResumeStore(os.path.join(tempfile.mkdtemp(), "resumes.sqlite3"), get_skill_matcher=lambda: matcher)
+
+    start = time.perf_counter()
+    for index, record in enumerate(records):
+        store.add(f"document-{index}", f"resume_{index:05d}.pdf", record)
+    ingest_seconds = time.perf_counter() - start
+
+    queries = {}
+    for name, query in QUERIES.items():
+        latencies = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            result = store.search(**query, limit=args.limit)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries[name] = {"query": query, "total": result["total"], "returned": len(result["results"]), **percentiles(latencies)}
+
+    summary = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "ingest_per_second": round(len(records) / ingest_seconds, 1),
+        "database_mb": round(os.path.getsize(store.db_path) / 1e6, 1),
+        "queries": queries,
+        "store": store.stats(),
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
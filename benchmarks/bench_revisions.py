@@ -0,0 +1,140 @@
+"""Revision reuse on vs. off: LLM calls, output tokens and latency for lightly edited resubmissions.
+
+Each variant is a fresh API process against the local fake Gemini server.
+It first extracts ``--documents`` original resumes, then one revision of
+each. A revision has a random edit: a reworded job bullet, an extra skill,
+a new phone number or a new certification. Only the revisions are measured.
+With ``REVISION_REUSE=False`` every revision is a full extraction. With it on,
+the revision is matched to its original through the MinHash/LSH index, and
+only the sections its edit touched go back to the model. Calls and output
+tokens come from the API's usage metrics (``/metrics``).
+
+    python -m benchmarks.bench_revisions --documents 10
+"""
+import argparse
+import json
+import random
+import re
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.corpus import CERTIFICATIONS, build_docx, build_pdf, resume_lines
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.load_test import git_commit, percentiles, start_api, start_fake_gemini
+
+BUILDERS = {"pdf": build_pdf, "docx": build_docx}
+
+_CALLS = re.compile(r'^resume_llm_calls_total\{call="[^"]+",outcome="success",model="[^"]+"\} (\S+)$', re.MULTILINE)
+_OUTPUT_TOKENS = re.compile(r'^resume_llm_tokens_total\{call="[^"]+",type="output",model="[^"]+"\} (\S+)$', re.MULTILINE)
+
+
+def revise(lines, rng):
+    """The lines with one small edit a candidate might make before resubmitting; also returns its name."""
+    lines = list(lines)
+    edit = rng.choice(["bullet", "skill", "phone", "certification"])
+    if edit == "bullet":
+        index = rng.choice([i for i, line in enumerate(lines) if line.startswith("- ")])
+        lines[index] = lines[index].replace("improving throughput", "cutting latency")
+    elif edit == "skill":
+        index = lines.index("SKILLS") + 1
+        lines[index] += ", Rust"
+    elif edit == "phone":
+        lines[1] = lines[1].replace("0100", f"01{rng.randint(10, 99)}")
+    else:
+        lines.append(rng.choice([c for c in CERTIFICATIONS if c not in lines]))
+    return lines, edit
+
+
+def build_pairs(count, kinds, seed):
+    rng = random.Random(seed)
+    pairs = []
+    for index in range(count):
+        for kind in kinds:
+            lines = resume_lines(seed * 1000 + index)
+            revised, edit = revise(lines, rng)
+            build = BUILDERS[kind]
+            pairs.append(((f"resume_{index:03d}.{kind}", build(lines)), (f"resume_{index:03d}_v2.{kind}", build(revised)), edit))
+    return pairs
+
+
+def scrape(base_url):
+    text = httpx.get(f"{base_url}/metrics").text
+    return (
+        sum(int(float(count)) for count in _CALLS.findall(text)),
+        sum(int(float(count)) for count in _OUTPUT_TOKENS.findall(text)),
+    )
+
+
+def run_variant(name, enabled, pairs, fake_url, args):
+    env = {"REVISION_REUSE": str(enabled), "CONTEXT_CACHE_ENABLED": "False", "GEMINI_MODELS": args.model}
+    api, base_url = start_api(fake_url, args, tempfile.mkdtemp(), extra_env=env)
+    latencies, by_edit = [], {}
+    try:
+        with httpx.Client(base_url=base_url, timeout=None) as http:
+            for original, _, _ in pairs:
+                http.post("/extract_resume_details/", files={"file": original}).raise_for_status()
+            calls_before, tokens_before = scrape(base_url)
+            for _, revision, edit in pairs:
+                start = time.perf_counter()
+                http.post("/extract_resume_details/", files={"file": revision}).raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+                by_edit.setdefault(edit, []).append(latencies[-1])
+            calls_after, tokens_after = scrape(base_url)
+            revisions = http.get("/revisions/stats").json()
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+    return {
+        "name": name,
+        "llm_calls_per_revision": round((calls_after - calls_before) / len(pairs), 2),
+        "output_tokens_per_revision": round((tokens_after - tokens_before) / len(pairs), 1),
+        "latency": percentiles(latencies),
+        "mean_latency_ms": round(sum(latencies) / len(latencies), 1),
+        "mean_latency_ms_by_edit": {edit: round(sum(values) / len(values), 1) for edit, values in sorted(by_edit.items())},
+        "revisions": revisions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10, help="Original resumes per kind.")
+    parser.add_argument("--kinds", default="pdf,docx")
+    parser.add_argument("--mode", default="both", help="EXTRACTION_MODE for both variants.")
+    parser.add_argument("--model", default="gemini-1.5-flash", help="Single model tier for both variants.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake Gemini base seconds per call.")
+    parser.add_argument(
+        "--latency-per-kchar", type=float, default=0.5, help="Fake Gemini generation seconds per 1000 output chars."
+    )
+    parser.add_argument("--seed", type=int, default=22)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    pairs = build_pairs(args.documents, tuple(args.kinds.split(",")), args.seed)
+    backend = FakeBackend(latency=args.latency, latency_per_kchar=args.latency_per_kchar)
+    fake_server, fake_url = start_fake_gemini(backend)
+    try:
+        results = [run_variant(name, enabled, pairs, fake_url, args) for name, enabled in (("full", False), ("reuse", True))]
+    finally:
+        fake_server.should_exit = True
+
+    full, reuse = results
+    summary = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "edits": {edit: sum(1 for _, _, e in pairs if e == edit) for edit in sorted({e for _, _, e in pairs})},
+        "variants": {result["name"]: result for result in results},
+        "output_token_change": round(reuse["output_tokens_per_revision"] / full["output_tokens_per_revision"] - 1, 3)
+        if full["output_tokens_per_revision"]
+        else None,
+        "mean_latency_change": round(reuse["mean_latency_ms"] / full["mean_latency_ms"] - 1, 3),
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
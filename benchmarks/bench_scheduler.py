@@ -0,0 +1,97 @@
+"""LLM scheduler under a quota-limited fake Gemini that injects 429s.
+
+Runs a burst of batch extractions with a few interactive uploads arriving
+mid-burst, first with an effectively unlimited scheduler and no retries,
+then with the configured concurrency limit, retries and backoff.
+
+    python -m benchmarks.bench_scheduler --quota 6 --error-rate 0.05 --batch 30 --interactive 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-fake-key")
+os.environ.setdefault("PDF_TEXT_EXTRACTION", "False")
+os.environ.setdefault("EXTRACTION_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench_cache.sqlite3"))
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "bench_jobs.sqlite3"))
+os.environ.setdefault("REVISION_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "bench_revisions.sqlite3"))
+os.environ.setdefault("RESUME_STORE_PATH", os.path.join(tempfile.mkdtemp(), "bench_resumes.sqlite3"))
+
+import main  # noqa: E402
+from benchmarks.fake_gemini import FakeGeminiClient  # noqa: E402
+from scheduler import LLMScheduler, Priority, current_priority  # noqa: E402
+
+
+async def one(priority, results):
+    current_priority.set(priority)
+    start = time.perf_counter()
+    try:
+        await main.extract_resume("resume.pdf", f"%PDF {uuid.uuid4().hex}".encode(), mode=main.ExtractionMode.BOTH)
+        ok = True
+    except Exception:
+        ok = False
+    results.append((priority, ok, time.perf_counter() - start))
+
+
+async def run(args):
+    results = []
+    batch = [asyncio.create_task(one(Priority.BATCH, results)) for _ in range(args.batch)]
+    await asyncio.sleep(args.latency)
+    interactive = [asyncio.create_task(one(Priority.INTERACTIVE, results)) for _ in range(args.interactive)]
+    await asyncio.gather(*batch, *interactive)
+    return results
+
+
+def summarize(label, results):
+    summary = {"variant": label}
+    for priority in Priority:
+        rows = [row for row in results if row[0] == priority]
+        ok = [row[2] for row in rows if row[1]]
+        summary[priority.name.lower()] = {
+            "succeeded": len(ok),
+            "failed": len(rows) - len(ok),
+            "mean_latency_s": round(statistics.mean(ok), 3) if ok else None,
+        }
+    summary["backend_429s"] = main.client.backend.rate_limited
+    summary["scheduler"] = main.llm_scheduler.stats()
+    return summary
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--quota", type=int, default=6, help="Concurrent calls the fake accepts before 429s.")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--batch", type=int, default=30)
+    parser.add_argument("--interactive", type=int, default=5)
+    args = parser.parse_args()
+
+    variants = [
+        ("unscheduled", LLMScheduler(max_concurrency=10_000, max_retries=0, is_retryable=main.is_transient_error)),
+        (
+            "scheduled",
+            LLMScheduler(
+                max_concurrency=args.quota,
+                max_retries=5,
+                base_backoff_seconds=args.latency / 2,
+                max_backoff_seconds=args.latency * 4,
+                is_retryable=main.is_transient_error,
+            ),
+        ),
+    ]
+    summaries = []
+    for label, scheduler in variants:
+        main.llm_scheduler = scheduler
+        main.client = FakeGeminiClient(latency=args.latency, error_rate=args.error_rate, max_in_flight=args.quota)
+        summaries.append(summarize(label, asyncio.run(run(args))))
+        print(json.dumps(summaries[-1]))
+    return summaries
+
+
+if __name__ == "__main__":
+    main_cli()
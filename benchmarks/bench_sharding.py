@@ -0,0 +1,66 @@
+"""Monolithic vs. section-sharded schema extraction latency against a fake Gemini.
+
+The fake backend's latency grows with output length, so one giant generation
+is slower than several smaller ones running in parallel.
+
+    python -m benchmarks.bench_sharding --base-latency 1.0 --latency-per-kchar 0.4 --requests 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-fake-key")
+os.environ.setdefault("EXTRACTION_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench_cache.sqlite3"))
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "bench_jobs.sqlite3"))
+os.environ.setdefault("REVISION_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "bench_revisions.sqlite3"))
+os.environ.setdefault("RESUME_STORE_PATH", os.path.join(tempfile.mkdtemp(), "bench_resumes.sqlite3"))
+
+from google.genai import types  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks.fake_gemini import FakeGeminiClient, long_resume  # noqa: E402
+
+
+async def time_mode(mode, requests):
+    part = types.Part.from_text(text="synthetic resume text")
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        schema_structured, _ = await main.extract_from_part(part, mode)
+        timings.append(time.perf_counter() - start)
+        assert "error" not in schema_structured, schema_structured
+    return {
+        "mode": mode.value,
+        "mean_s": round(statistics.mean(timings), 3),
+        "max_s": round(max(timings), 3),
+        "llm_calls": main.client.backend.calls,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-latency", type=float, default=0.5)
+    parser.add_argument("--latency-per-kchar", type=float, default=0.2)
+    parser.add_argument("--jobs", type=int, default=12)
+    parser.add_argument("--requests", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = long_resume(jobs=args.jobs)
+    results = []
+    for mode in (main.ExtractionMode.SCHEMA, main.ExtractionMode.SHARDED):
+        main.client = FakeGeminiClient(
+            latency=args.base_latency, latency_per_kchar=args.latency_per_kchar, payload=payload
+        )
+        results.append(asyncio.run(time_mode(mode, args.requests)))
+    results.append({"output_kchars": round(len(json.dumps(payload)) / 1000, 1)})
+    for result in results:
+        print(json.dumps(result))
+    return results
+
+
+if __name__ == "__main__":
+    main_cli()
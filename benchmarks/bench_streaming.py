@@ -0,0 +1,102 @@
+"""Time-to-first-section for the SSE endpoint vs. the blocking endpoint, against a fake Gemini.
+
+    python -m benchmarks.bench_streaming --latency 4 --requests 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-fake-key")
+os.environ.setdefault("PDF_TEXT_EXTRACTION", "False")
+os.environ.setdefault("EXTRACTION_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench_cache.sqlite3"))
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "bench_jobs.sqlite3"))
+os.environ.setdefault("REVISION_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "bench_revisions.sqlite3"))
+os.environ.setdefault("RESUME_STORE_PATH", os.path.join(tempfile.mkdtemp(), "bench_resumes.sqlite3"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks.fake_gemini import FakeGeminiClient  # noqa: E402
+
+
+async def time_streaming(http, payload):
+    start = time.perf_counter()
+    first_section = None
+    async with http.stream("POST", "/extract_resume_details/stream/", files={"file": ("resume.pdf", payload)}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line == "event: section" and first_section is None:
+                first_section = time.perf_counter() - start
+    return first_section, time.perf_counter() - start
+
+
+async def time_blocking(http, payload):
+    start = time.perf_counter()
+    response = await http.post("/extract_resume_details/", files={"file": ("resume.pdf", payload)})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def start_server():
+    """Serve the app from a real uvicorn thread; ASGITransport buffers whole bodies and hides streaming."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def run(args, base_url):
+    first_sections, stream_totals, blocking_totals = [], [], []
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as http:
+        for i in range(args.requests):
+            payload = f"%PDF-1.4 {uuid.uuid4().hex} {i}".encode()
+            first_section, total = await time_streaming(http, payload)
+            first_sections.append(first_section)
+            stream_totals.append(total)
+            blocking_totals.append(await time_blocking(http, f"%PDF-1.4 {uuid.uuid4().hex}".encode()))
+
+    def ms(values):
+        return round(statistics.mean(values) * 1000, 1)
+
+    return {
+        "requests": args.requests,
+        "fake_latency_s": args.latency,
+        "stream_time_to_first_section_ms": ms(first_sections),
+        "stream_total_ms": ms(stream_totals),
+        "blocking_total_ms": ms(blocking_totals),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    main.client = FakeGeminiClient(latency=args.latency, stream_chunks=args.chunks)
+    server, thread, base_url = start_server()
+    try:
+        result = asyncio.run(run(args, base_url))
+    finally:
+        server.should_exit = True
+        thread.join()
+    print(json.dumps(result))
+    return result
+
+
+if __name__ == "__main__":
+    main_cli()
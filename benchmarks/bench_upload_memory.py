@@ -0,0 +1,129 @@
+"""API process memory under concurrent large uploads, and how fast bad uploads are refused.
+
+Runs the API in its own process against the local fake Gemini server, sends
+``--uploads`` concurrent scanned-PDF sized uploads and samples the server's
+RSS from /proc (Linux) while they are in flight. Oversized and mislabelled
+uploads are timed separately: they should be refused before the body is read.
+
+    python -m benchmarks.bench_upload_memory --uploads 8 --size-mb 20
+    python -m benchmarks.bench_upload_memory --uploads 8 --size-mb 20 --inline-max-mb 100  # all inline
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from benchmarks.corpus import build_docx, resume_lines
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.load_test import start_api, start_fake_gemini
+
+
+def read_status_kb(pid, field):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return None
+
+
+class RssSampler:
+    def __init__(self, pid, interval=0.02):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, read_status_kb(self.pid, "VmRSS") or 0)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def scanned_pdf(size_bytes, seed):
+    # No text layer, so the whole file goes to the model as inline bytes
+    return b"%PDF-1.4\n%" + seed.to_bytes(4, "big") + os.urandom(size_bytes) + b"\n%%EOF\n"
+
+
+async def timed_post(http, filename, payload):
+    start = time.perf_counter()
+    response = await http.post("/extract_resume_details/", files={"file": (filename, payload)})
+    return response.status_code, round((time.perf_counter() - start) * 1000, 1)
+
+
+async def run(args, base_url):
+    size = int(args.size_mb * 1024 * 1024)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as http:
+        payloads = [scanned_pdf(size, seed) for seed in range(args.uploads)]
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(timed_post(http, f"scan_{i}.pdf", payload) for i, payload in enumerate(payloads))
+        )
+        elapsed = time.perf_counter() - started
+        oversized = await timed_post(http, "huge.pdf", scanned_pdf(args.limit_mb * 1024 * 1024 + size, 0))
+        mislabelled = await timed_post(http, "resume.pdf", build_docx(resume_lines(1)))
+    return {
+        "concurrent_uploads": args.uploads,
+        "upload_mb": args.size_mb,
+        "statuses": sorted({status for status, _ in results}),
+        "elapsed_s": round(elapsed, 2),
+        "oversized_upload": {"status": oversized[0], "ms": oversized[1]},
+        "mislabelled_upload": {"status": mislabelled[0], "ms": mislabelled[1]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=float, default=20)
+    parser.add_argument("--limit-mb", type=int, default=25, help="MAX_UPLOAD_BYTES for the API under test.")
+    parser.add_argument("--spool-threshold-kb", type=int, default=1024)
+    parser.add_argument(
+        "--inline-max-mb", type=float, default=4, help="LLM_INLINE_MAX_BYTES; larger PDFs use the Files API."
+    )
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    os.environ.update(
+        MAX_UPLOAD_BYTES=str(args.limit_mb * 1024 * 1024),
+        UPLOAD_SPOOL_THRESHOLD_BYTES=str(args.spool_threshold_kb * 1024),
+        LLM_INLINE_MAX_BYTES=str(int(args.inline_max_mb * 1024 * 1024)),
+        PDF_TEXT_EXTRACTION="False",
+    )
+    fake_server, fake_url = start_fake_gemini(FakeBackend(latency=args.latency))
+    api, base_url = start_api(fake_url, SimpleNamespace(mode=None), tempfile.mkdtemp())
+    try:
+        idle_kb = read_status_kb(api.pid, "VmRSS")
+        with RssSampler(api.pid) as sampler:
+            summary = asyncio.run(run(args, base_url))
+        summary.update(
+            idle_rss_mb=round(idle_kb / 1024, 1),
+            peak_rss_mb=round(max(sampler.peak_kb, read_status_kb(api.pid, "VmHWM") or 0) / 1024, 1),
+        )
+        summary["peak_rss_per_upload_mb"] = round(
+            (summary["peak_rss_mb"] - summary["idle_rss_mb"]) / args.uploads, 1
+        )
+        summary["files_left_on_fake_gemini"] = httpx.get(f"{fake_url}/stats").json()["files"]
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+        fake_server.should_exit = True
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Synthetic resume corpus for the benchmarks.
+
+PDFs are written by a tiny hand-rolled writer (one Helvetica text layer per
+page) so no PDF authoring library is required; DOCX files use python-docx.
+"""
+import io
+import random
+
+FIRST_NAMES = ["Avery", "Jordan", "Riya", "Mateo", "Chen", "Fatima", "Noah", "Priya", "Lucas", "Amara"]
+LAST_NAMES = ["Patel", "Garcia", "Nguyen", "Okafor", "Schmidt", "Kim", "Rossi", "Haddad", "Silva", "Ivanova"]
+ROLES = ["Software Engineer", "Data Scientist", "Machine Learning Engineer", "DevOps Engineer", "Business Analyst"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Health", "Stark Industries", "Wayne Enterprises"]
+SKILLS = [
+    "Python", "Java", "Go", "SQL", "JavaScript", "TypeScript", "React", "Node.js", "AWS", "Azure", "GCP",
+    "Docker", "Kubernetes", "Terraform", "Spark", "Kafka", "Airflow", "PyTorch", "TensorFlow", "Pandas",
+]
+DEGREES = [
+    "Bachelor of Science in Computer Science, Arizona State University, Tempe, USA, 2015",
+    "Master of Science in Data Science, University of Washington, Seattle, USA, 2018",
+    "Bachelor of Engineering in Electronics, Anna University, Chennai, India, 2012",
+]
+CERTIFICATIONS = [
+    "AWS Certified Solutions Architect - Amazon Web Services",
+    "Certified Kubernetes Administrator - Cloud Native Computing Foundation",
+    "Professional Scrum Master I - Scrum.org",
+]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Optimized", "Delivered", "Scaled"]
+OBJECTS = ["a streaming ingestion pipeline", "the billing service", "CI/CD for 40 services",
+           "a feature store", "the reporting warehouse", "an internal ML platform"]
+
+
+def resume_lines(seed, jobs=3, bullets_per_job=5):
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{rng.choice(ROLES)} | {name.split()[0].lower()}@example.com | +1 555 0100", ""]
+    lines += ["PROFESSIONAL SUMMARY",
+              f"{rng.randint(4, 15)}+ years of experience delivering data and platform products "
+              f"across {rng.choice(['finance', 'healthcare', 'retail', 'telecom'])}.", ""]
+    lines.append("WORK EXPERIENCE")
+    year = 2024
+    for _ in range(jobs):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)}, San Francisco, USA    Jan {start} - Dec {year}")
+        for _ in range(bullets_per_job):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)}, improving throughput by {rng.randint(10, 90)}%.")
+        year = start
+        lines.append("")
+    lines += ["SKILLS", "Languages: " + ", ".join(rng.sample(SKILLS[:6], 4)),
+              "Cloud & Tools: " + ", ".join(rng.sample(SKILLS[6:], 6)), ""]
+    lines += ["EDUCATION", rng.choice(DEGREES), ""]
+    lines += ["CERTIFICATIONS", rng.choice(CERTIFICATIONS)]
+    return lines
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(lines, text_layer=True, lines_per_page=48):
+    """Return PDF bytes; with ``text_layer=False`` pages only contain vector boxes (a scan stand-in)."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # placeholder, filled once the kids are known
+    page_ids = []
+    for page_lines in pages:
+        if text_layer:
+            ops = ["BT", "/F1 10 Tf", "14 TL", "50 800 Td"]
+            for line in page_lines:
+                ops.append(f"({_pdf_escape(line)}) Tj T*")
+            ops.append("ET")
+        else:
+            ops = [f"50 {800 - 14 * i} {min(500, 6 * len(line))} 8 re f" for i, line in enumerate(page_lines) if line]
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] /CropBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content_id, font_id)
+        ))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for index, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % index + body + b"\nendobj\n")
+    xref_at = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref_at))
+    return out.getvalue()
+
+
+def build_docx(lines):
+    import docx
+
+    document = docx.Document()
+    for line in lines:
+        if line.isupper():
+            document.add_heading(line.title(), level=2)
+        elif line.startswith("- "):
+            document.add_paragraph(line[2:], style="List Bullet")
+        else:
+            document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def build_corpus(count=10, kinds=("pdf", "docx"), scanned_ratio=0.0, seed=7):
+    """Yield ``(filename, bytes)`` for ``count`` resumes of each kind, from 1 to ~4 pages long."""
+    rng = random.Random(seed)
+    for index in range(count):
+        lines = resume_lines(seed + index, jobs=rng.randint(2, 10), bullets_per_job=rng.randint(3, 8))
+        if "pdf" in kinds:
+            scanned = rng.random() < scanned_ratio
+            suffix = "_scanned" if scanned else ""
+            yield f"resume_{index:03d}{suffix}.pdf", build_pdf(lines, text_layer=not scanned)
+        if "docx" in kinds:
+            yield f"resume_{index:03d}.docx", build_docx(lines)
@@ -0,0 +1,235 @@
+"""In-process stand-in for ``genai.Client`` used by the benchmarks.
+
+It mimics just enough of ``client.models`` / ``client.aio.models`` for the
+extraction path in ``main.py`` and answers with a canned resume after a
+configurable delay, so no network access or API key is needed.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+
+from google.genai import errors as genai_errors
+
+# The note main.py appends when the local extractor already filled some sections
+_OMITTED_SECTIONS = re.compile(r"leave them out of your answer: ([\w, ]+)")
+
+
+def omitted_sections(prompt_text):
+    match = _OMITTED_SECTIONS.search(prompt_text)
+    return {name.strip() for name in match.group(1).split(",")} if match else set()
+
+
+SAMPLE_RESUME = {
+    "professional_summary": "8+ years of experience building data platforms and ML services.",
+    "professional_experience": [
+        "Led migration of batch pipelines to streaming, cutting data latency by 90%.",
+        "Mentored a team of five engineers across two product lines.",
+    ],
+    "awards": ["Engineering Excellence Award 2022"],
+    "certifications": [{"certification": "AWS Certified Solutions Architect - Amazon Web Services"}],
+    "education": [{"degree": "Bachelor of Science in Computer Science, Arizona State University, Tempe, USA, 2015"}],
+    "credits": [
+        {"category": "Programming Languages", "items": ["Python", "SQL", "Go"]},
+        {"category": "Cloud & DevOps", "items": ["AWS", "Docker", "Kubernetes"]},
+    ],
+    "work_experience": [
+        {
+            "client": "Acme Corp",
+            "Project": "Realtime Analytics",
+            "role": "Senior Software Engineer",
+            "location": "San Francisco, USA",
+            "duration": "Jan 2020 - Present",
+            "description": ["Built a streaming ingestion layer by adopting Kafka, achieving sub-second dashboards."],
+        }
+    ],
+    "project_experience": [
+        {
+            "Project": "Fraud Scoring",
+            "role": "Machine Learning Engineer",
+            "location": None,
+            "duration": "Aug 2018 - Dec 2019",
+            "tools": ["Python", "XGBoost"],
+            "description": ["Shipped a gradient boosted fraud model serving 2k requests per second."],
+            "responsibilities": ["Owned model training and online evaluation."],
+        }
+    ],
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class FakeBackend:
+    """Shared state for the sync and async fake model endpoints."""
+
+    def __init__(
+        self,
+        latency=1.0,
+        jitter=0.0,
+        payload=None,
+        stream_chunks=20,
+        latency_per_kchar=0.0,
+        error_rate=0.0,
+        max_in_flight=None,
+        latency_sigma=0.0,
+        latency_per_kprompt_token=0.0,
+        cache_min_tokens=0,
+        model_latency_scale=None,
+        model_incomplete_rate=None,
+    ):
+        self.latency = latency
+        # Lognormal multiplier on every call: sigma around 1.0 gives a heavy right tail
+        self.latency_sigma = latency_sigma
+        # Quota simulation: random 429s, plus 429s whenever more than max_in_flight calls overlap
+        self.error_rate = error_rate
+        self.max_in_flight = max_in_flight
+        self.rate_limited = 0
+        self.stream_chunks = stream_chunks
+        self.jitter = jitter
+        # Generation time grows with output length, so long resumes take longer to write out
+        self.latency_per_kchar = latency_per_kchar
+        # Reading the prompt takes time too, so longer prompts delay the first token
+        self.latency_per_kprompt_token = latency_per_kprompt_token
+        # Context caches smaller than this are refused, as the real API does below its per-model minimum
+        self.cache_min_tokens = cache_min_tokens
+        # Model tiers: a cheaper model answers faster, and sometimes leaves the experience sections out
+        self.model_latency_scale = model_latency_scale or {}
+        self.model_incomplete_rate = model_incomplete_rate or {}
+        self.resume = payload or SAMPLE_RESUME
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def next_delay(self, output_chars=0, model=None):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if self.latency_sigma:
+            delay *= random.lognormvariate(0.0, self.latency_sigma)
+        delay = max(0.0, delay + self.latency_per_kchar * output_chars / 1000)
+        return delay * self.model_latency_scale.get(model, 1.0)
+
+    def prefill_delay(self, prompt_tokens, model=None):
+        # Spent before the first output token; prompt tokens served from a context cache are not counted
+        return self.latency_per_kprompt_token * prompt_tokens / 1000 * self.model_latency_scale.get(model, 1.0)
+
+    def resume_for(self, model=None):
+        if random.random() < self.model_incomplete_rate.get(model, 0.0):
+            return dict(self.resume, work_experience=[], project_experience=[])
+        return self.resume
+
+    def payload_for(self, model=None, fields=None, combined=False, omit=()):
+        """The response text: the whole resume, only the ``fields`` of a section sub-schema, or both representations.
+
+        Sections named in ``omit`` are left out, as the model is asked to.
+        """
+        resume = self.resume_for(model)
+        if omit:
+            resume = {name: value for name, value in resume.items() if name not in omit}
+        if combined:
+            return json.dumps({"schema_structured": resume, "formatter_structured": resume})
+        if fields and set(fields) != set(resume):
+            return json.dumps({name: resume.get(name) for name in fields})
+        return json.dumps(resume)
+
+    def respond(self, contents, config=None, model=None):
+        prompt = " ".join(
+            text for text in (getattr(part, "text", part) for part in contents) if isinstance(text, str)
+        )
+        # The combined-mode prompt asks for both representations under named keys
+        combined = '"schema_structured"' in prompt
+        # Section sub-schemas only get their own fields back
+        fields = getattr((config or {}).get("response_schema"), "model_fields", None)
+        return FakeResponse(self.payload_for(model, fields, combined, omitted_sections(prompt)))
+
+    def _enter(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        over_quota = self.max_in_flight is not None and self.in_flight > self.max_in_flight
+        if over_quota or random.random() < self.error_rate:
+            self.in_flight -= 1
+            self.rate_limited += 1
+            raise genai_errors.ClientError(
+                429,
+                {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Fake quota exceeded."}},
+                None,
+            )
+
+    def _exit(self):
+        self.in_flight -= 1
+
+
+class _SyncModels:
+    def __init__(self, backend):
+        self._backend = backend
+
+    def generate_content(self, model, contents, config=None):
+        self._backend._enter()
+        try:
+            response = self._backend.respond(contents, config, model)
+            time.sleep(self._backend.next_delay(len(response.text), model))
+            return response
+        finally:
+            self._backend._exit()
+
+
+class _AsyncModels:
+    def __init__(self, backend):
+        self._backend = backend
+
+    async def generate_content(self, model, contents, config=None):
+        self._backend._enter()
+        try:
+            response = self._backend.respond(contents, config, model)
+            await asyncio.sleep(self._backend.next_delay(len(response.text), model))
+            return response
+        finally:
+            self._backend._exit()
+
+    async def get(self, model, config=None):
+        return SimpleNamespace(name=f"models/{model}")
+
+    async def generate_content_stream(self, model, contents, config=None):
+        return self._stream(model, contents, config)
+
+    async def _stream(self, model, contents, config):
+        # The total latency is spread evenly over the chunks, like tokens arriving over time
+        self._backend._enter()
+        try:
+            text = self._backend.respond(contents, config, model).text
+            chunk_delay = self._backend.next_delay(len(text), model) / self._backend.stream_chunks
+            chunk_size = max(1, -(-len(text) // self._backend.stream_chunks))
+            for offset in range(0, len(text), chunk_size):
+                await asyncio.sleep(chunk_delay)
+                yield FakeResponse(text[offset:offset + chunk_size])
+        finally:
+            self._backend._exit()
+
+
+class FakeGeminiClient:
+    def __init__(self, **backend_options):
+        self.backend = FakeBackend(**backend_options)
+        self.models = _SyncModels(self.backend)
+        self.aio = SimpleNamespace(models=_AsyncModels(self.backend))
+
+
+def long_resume(jobs=12, bullets=10, projects=8):
+    """A 5-10 page sized resume payload built by repeating the sample sections."""
+    resume = json.loads(json.dumps(SAMPLE_RESUME))
+    job = SAMPLE_RESUME["work_experience"][0]
+    project = SAMPLE_RESUME["project_experience"][0]
+    resume["work_experience"] = [
+        dict(job, client=f"Company {i}", description=[f"{job['description'][0]} ({i}.{b})" for b in range(bullets)])
+        for i in range(jobs)
+    ]
+    resume["project_experience"] = [
+        dict(project, Project=f"Project {i}", description=[f"{project['description'][0]} ({i}.{b})" for b in range(bullets)])
+        for i in range(projects)
+    ]
+    resume["professional_experience"] = [f"Career highlight number {i}." for i in range(bullets)]
+    return resume
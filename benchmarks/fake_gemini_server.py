@@ -0,0 +1,322 @@
+"""A local HTTP stand-in for the Gemini REST API.
+
+Unlike ``fake_gemini.FakeGeminiClient`` this is reached over the network by the
+real ``genai.Client`` (point it here with ``GEMINI_BASE_URL``), so the SDK's
+request building, HTTP pooling and response parsing are part of what gets
+measured. It answers ``generateContent`` and ``streamGenerateContent`` with a
+canned resume after a configurable delay, accepts Files API uploads, keeps
+context caches (``cachedContents``) and answers model lookups.
+
+    python -m benchmarks.fake_gemini_server --port 8765 --latency 1.5 --latency-sigma 0.3
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.fake_gemini import FakeBackend, omitted_sections
+
+
+def _prompt_text(body):
+    return " ".join(
+        part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+    )
+
+
+def _prompt_tokens(body, files):
+    # Same 4 chars per token rule of thumb the scheduler uses; inline and uploaded files are charged by size
+    file_bytes = 0
+    for content in body.get("contents", []):
+        for part in content.get("parts", []):
+            if "inlineData" in part:
+                file_bytes += len(part["inlineData"].get("data", "")) * 3 // 4
+            elif "fileData" in part:
+                file_bytes += files.get(part["fileData"].get("fileUri", part["fileData"].get("file_uri", "")).rsplit("/", 1)[-1], {}).get("size", 0)
+    return len(_prompt_text(body)) // 4 + file_bytes // 4
+
+
+def _usage(prompt_tokens, text, cached_tokens=0):
+    output_tokens = len(text) // 4
+    usage = {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": output_tokens,
+        "totalTokenCount": prompt_tokens + output_tokens,
+    }
+    if cached_tokens:
+        usage["cachedContentTokenCount"] = cached_tokens
+    return usage
+
+
+def _timestamp(epoch_seconds):
+    return datetime.datetime.fromtimestamp(epoch_seconds, datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _ttl_seconds(ttl):
+    return float(str(ttl).rstrip("s"))
+
+
+def _candidate(text, finish_reason="STOP"):
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return candidate
+
+
+def _error(code, status, message):
+    return JSONResponse({"error": {"code": code, "status": status, "message": message}}, status_code=code)
+
+
+def create_app(backend=None):
+    backend = backend or FakeBackend()
+    app = FastAPI(title="Fake Gemini")
+    app.state.backend = backend
+    # Files API uploads: file id -> {"size", "mime_type"}; only the size is kept, not the bytes
+    files = {}
+    upload_sessions = {}
+    # Context caches: cache id -> {"text", "tokens", "model", "display_name", "create_time", "expire_time"}
+    caches = {}
+
+    def live_cache(name):
+        cache_id = (name or "").rsplit("/", 1)[-1]
+        cache = caches.get(cache_id)
+        if cache is not None and cache["expire_time"] <= time.time():
+            del caches[cache_id]
+            cache = None
+        return cache_id, cache
+
+    def cache_resource(cache_id, cache):
+        return {
+            "name": f"cachedContents/{cache_id}",
+            "displayName": cache["display_name"],
+            "model": cache["model"],
+            "createTime": _timestamp(cache["create_time"]),
+            "updateTime": _timestamp(cache["update_time"]),
+            "expireTime": _timestamp(cache["expire_time"]),
+            "usageMetadata": {"totalTokenCount": cache["tokens"]},
+        }
+
+    def response_text(body, model, cached_text=""):
+        prompt = _prompt_text(body)
+        combined = '"schema_structured"' in cached_text + prompt
+        # Section sub-schemas only get their own fields back
+        properties = body.get("generationConfig", {}).get("responseSchema", {}).get("properties")
+        return backend.payload_for(model, properties, combined, omitted_sections(prompt))
+
+    def rate_limited():
+        backend.calls += 1
+        over_quota = backend.max_in_flight is not None and backend.in_flight >= backend.max_in_flight
+        if over_quota or random.random() < backend.error_rate:
+            backend.rate_limited += 1
+            return True
+        backend.in_flight += 1
+        backend.peak_in_flight = max(backend.peak_in_flight, backend.in_flight)
+        return False
+
+    @app.post("/{version}/models/{model_action}")
+    async def models_action(version: str, model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        body = await request.json()
+        if action not in ("generateContent", "streamGenerateContent"):
+            return _error(404, "NOT_FOUND", f"Unknown action {action!r} for {model}.")
+        if rate_limited():
+            return _error(429, "RESOURCE_EXHAUSTED", "Fake quota exceeded.")
+
+        cached_text, cached_tokens = "", 0
+        if body.get("cachedContent"):
+            _, cache = live_cache(body["cachedContent"])
+            if cache is None:
+                backend.in_flight -= 1
+                return _error(403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)")
+            cached_text, cached_tokens = cache["text"], cache["tokens"]
+
+        text = response_text(body, model, cached_text)
+        uncached_tokens = _prompt_tokens(body, files)
+        prompt_tokens = uncached_tokens + cached_tokens
+        prefill = backend.prefill_delay(uncached_tokens, model)
+        delay = backend.next_delay(len(text), model)
+
+        if action == "generateContent":
+            try:
+                await asyncio.sleep(prefill + delay)
+            finally:
+                backend.in_flight -= 1
+            usage = _usage(prompt_tokens, text, cached_tokens)
+            return {"candidates": [_candidate(text)], "usageMetadata": usage, "modelVersion": model}
+
+        async def events():
+            # The total latency is spread evenly over the chunks, like tokens arriving over time
+            try:
+                chunk_size = max(1, -(-len(text) // backend.stream_chunks))
+                chunks = [text[offset:offset + chunk_size] for offset in range(0, len(text), chunk_size)]
+                await asyncio.sleep(prefill)
+                for index, chunk in enumerate(chunks):
+                    await asyncio.sleep(delay / len(chunks))
+                    last = index == len(chunks) - 1
+                    payload = {"candidates": [_candidate(chunk, "STOP" if last else None)], "modelVersion": model}
+                    if last:
+                        payload["usageMetadata"] = _usage(prompt_tokens, text, cached_tokens)
+                    yield f"data: {json.dumps(payload)}\r\n\r\n"
+            finally:
+                backend.in_flight -= 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/{version}/models/{model}")
+    async def get_model(version: str, model: str):
+        # What the API's startup warm-up asks for
+        return {"name": f"models/{model}", "displayName": model, "inputTokenLimit": 1048576}
+
+    @app.post("/{version}/cachedContents")
+    async def create_cache(version: str, request: Request):
+        body = await request.json()
+        text = _prompt_text(body) + _prompt_text({"contents": [body.get("systemInstruction", {})]})
+        tokens = len(text) // 4
+        if tokens < backend.cache_min_tokens:
+            return _error(
+                400,
+                "INVALID_ARGUMENT",
+                f"Cached content is too small. total_token_count={tokens}, min_total_token_count={backend.cache_min_tokens}",
+            )
+        now = time.time()
+        cache_id = uuid.uuid4().hex
+        caches[cache_id] = {
+            "text": text,
+            "tokens": tokens,
+            "model": body.get("model", ""),
+            "display_name": body.get("displayName", ""),
+            "create_time": now,
+            "update_time": now,
+            "expire_time": now + _ttl_seconds(body.get("ttl", "3600s")),
+        }
+        return cache_resource(cache_id, caches[cache_id])
+
+    @app.get("/{version}/cachedContents")
+    async def list_caches(version: str):
+        for cache_id in list(caches):
+            live_cache(cache_id)
+        return {"cachedContents": [cache_resource(cache_id, cache) for cache_id, cache in caches.items()]}
+
+    @app.get("/{version}/cachedContents/{cache_id}")
+    async def get_cache(version: str, cache_id: str):
+        cache_id, cache = live_cache(cache_id)
+        if cache is None:
+            return _error(403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)")
+        return cache_resource(cache_id, cache)
+
+    @app.patch("/{version}/cachedContents/{cache_id}")
+    async def update_cache(version: str, cache_id: str, request: Request):
+        cache_id, cache = live_cache(cache_id)
+        if cache is None:
+            return _error(403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)")
+        body = await request.json()
+        cache["update_time"] = time.time()
+        if "ttl" in body:
+            cache["expire_time"] = cache["update_time"] + _ttl_seconds(body["ttl"])
+        return cache_resource(cache_id, cache)
+
+    @app.delete("/{version}/cachedContents/{cache_id}")
+    async def delete_cache(version: str, cache_id: str):
+        if caches.pop(cache_id, None) is None:
+            return _error(403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)")
+        return {}
+
+    @app.post("/upload/{version}/files")
+    async def start_upload(version: str, request: Request):
+        session_id = uuid.uuid4().hex
+        upload_sessions[session_id] = {
+            "received": 0,
+            "mime_type": request.headers.get("x-goog-upload-header-content-type", "application/octet-stream"),
+        }
+        upload_url = str(request.base_url) + f"upload-sessions/{session_id}"
+        return JSONResponse({}, headers={"x-goog-upload-url": upload_url, "x-goog-upload-status": "active"})
+
+    @app.post("/upload-sessions/{session_id}")
+    async def upload_chunk(session_id: str, request: Request):
+        session = upload_sessions[session_id]
+        async for chunk in request.stream():
+            session["received"] += len(chunk)
+        if "finalize" not in request.headers.get("x-goog-upload-command", ""):
+            return JSONResponse({}, headers={"x-goog-upload-status": "active"})
+        del upload_sessions[session_id]
+        files[session_id] = {"size": session["received"], "mime_type": session["mime_type"]}
+        file = {
+            "name": f"files/{session_id}",
+            "uri": str(request.base_url) + f"v1beta/files/{session_id}",
+            "mimeType": session["mime_type"],
+            "sizeBytes": str(session["received"]),
+            "state": "ACTIVE",
+        }
+        return JSONResponse({"file": file}, headers={"x-goog-upload-status": "final"})
+
+    @app.delete("/{version}/files/{file_id}")
+    async def delete_file(version: str, file_id: str):
+        if files.pop(file_id, None) is None:
+            return _error(404, "NOT_FOUND", f"File {file_id} does not exist.")
+        return {}
+
+    @app.get("/stats")
+    async def stats():
+        return {
+            "files": len(files),
+            "caches": len(caches),
+            "calls": backend.calls,
+            "rate_limited": backend.rate_limited,
+            "in_flight": backend.in_flight,
+            "peak_in_flight": backend.peak_in_flight,
+        }
+
+    return app
+
+
+def _model_values(pairs):
+    """``["gemini-1.5-flash-8b=0.5"]`` -> ``{"gemini-1.5-flash-8b": 0.5}``"""
+    return {model: float(value) for model, _, value in (pair.partition("=") for pair in pairs)}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=1.0, help="Median seconds per call.")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="Lognormal spread of the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with a 429.")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="429 any call beyond this many at once.")
+    parser.add_argument(
+        "--latency-per-kprompt-token", type=float, default=0.0, help="Extra seconds per 1000 prompt tokens."
+    )
+    parser.add_argument("--cache-min-tokens", type=int, default=0, help="Refuse smaller context caches.")
+    parser.add_argument(
+        "--model-latency-scale", action="append", default=[], metavar="MODEL=SCALE", help="Latency multiplier of a model."
+    )
+    parser.add_argument(
+        "--model-incomplete-rate",
+        action="append",
+        default=[],
+        metavar="MODEL=RATE",
+        help="Fraction of a model's answers that leave out the experience sections.",
+    )
+    args = parser.parse_args()
+
+    backend = FakeBackend(
+        latency=args.latency,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        max_in_flight=args.max_in_flight,
+        latency_per_kprompt_token=args.latency_per_kprompt_token,
+        cache_min_tokens=args.cache_min_tokens,
+        model_latency_scale=_model_values(args.model_latency_scale),
+        model_incomplete_rate=_model_values(args.model_incomplete_rate),
+    )
+    uvicorn.run(create_app(backend), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
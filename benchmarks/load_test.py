@@ -0,0 +1,228 @@
+"""Reproducible end-to-end load test against a local fake Gemini server.
+
+Starts ``benchmarks.fake_gemini_server`` and the API (``uvicorn main:app`` in a
+separate process, talking to the fake through ``GEMINI_BASE_URL``), then sweeps
+concurrency levels over a synthetic PDF/DOCX corpus. Every level reports
+throughput, p50/p95/p99 latency and a per-stage breakdown taken from the
+``Server-Timing`` header; the full run, tagged with the git commit, is written
+as JSON so runs before and after a change can be diffed.
+
+    python -m benchmarks.load_test --concurrency 1,4,16 --requests 40 --output results.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import FakeBackend
+from benchmarks.fake_gemini_server import create_app
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_fake_gemini(backend):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(backend), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def start_api(fake_url, args, workdir, extra_env=None):
+    """Run ``uvicorn main:app`` against the fake server, or against the real API when ``fake_url`` is None."""
+    port = free_port()
+    env = dict(
+        os.environ,
+        EXTRACTION_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+        JOB_QUEUE_PATH=os.path.join(workdir, "jobs.sqlite3"),
+        REVISION_INDEX_PATH=os.path.join(workdir, "revisions.sqlite3"),
+        RESUME_STORE_PATH=os.path.join(workdir, "resumes.sqlite3"),
+    )
+    if fake_url:
+        env.update(GEMINI_API_KEY="load-test-fake-key", GEMINI_BASE_URL=fake_url)
+    if args.mode:
+        env["EXTRACTION_MODE"] = args.mode
+    env.update(extra_env or {})
+    # The API logs every request; keep them out of the results output
+    log_path = os.path.join(workdir, "api.log")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=open(log_path, "w"),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}, see {log_path}")
+        try:
+            httpx.get(f"{base_url}/cache/stats", timeout=1.0)
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API server did not start within 60 seconds")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_server_timing(header):
+    stages = {}
+    for metric in filter(None, (item.strip() for item in (header or "").split(","))):
+        name, _, params = metric.partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                stages[name.strip()] = float(value)
+    return stages
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return {}
+    ordered = sorted(samples_ms)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(ordered[-1], 1)}
+
+
+async def run_level(base_url, corpus, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as http:
+
+        async def one(filename, payload):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await http.post("/extract_resume_details/", files={"file": (filename, payload)})
+                    status = response.status_code
+                    stages = parse_server_timing(response.headers.get("server-timing"))
+                except httpx.HTTPError as e:
+                    status, stages = type(e).__name__, {}
+                results.append({
+                    "kind": filename.rsplit(".", 1)[-1],
+                    "status": status,
+                    "latency_ms": (time.perf_counter() - start) * 1000,
+                    "stages": stages,
+                })
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(filename, payload) for filename, payload in corpus))
+        elapsed = time.perf_counter() - started
+
+    succeeded = [r for r in results if r["status"] == 200]
+    stage_names = sorted({name for r in succeeded for name in r["stages"]})
+    return {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "errors": sorted({str(r["status"]) for r in results if r["status"] != 200}),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(succeeded) / elapsed, 2),
+        "latency": percentiles([r["latency_ms"] for r in succeeded]),
+        "latency_by_kind": {
+            kind: percentiles([r["latency_ms"] for r in succeeded if r["kind"] == kind])
+            for kind in sorted({r["kind"] for r in succeeded})
+        },
+        "stages": {
+            name: dict(
+                mean_ms=round(sum(r["stages"].get(name, 0.0) for r in succeeded) / len(succeeded), 1),
+                **percentiles([r["stages"][name] for r in succeeded if name in r["stages"]]),
+            )
+            for name in stage_names
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma separated concurrency levels to sweep.")
+    parser.add_argument("--requests", type=int, default=24, help="Requests per concurrency level.")
+    parser.add_argument("--kinds", default="pdf,docx")
+    parser.add_argument("--mode", default=None, help="EXTRACTION_MODE for the API under test.")
+    parser.add_argument("--latency", type=float, default=1.0, help="Median fake Gemini seconds per call.")
+    parser.add_argument("--latency-sigma", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="Write the full results as JSON here.")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    kinds = tuple(args.kinds.split(","))
+    backend = FakeBackend(latency=args.latency, latency_sigma=args.latency_sigma, error_rate=args.error_rate)
+    fake_server, fake_url = start_fake_gemini(backend)
+    # The synthetic resumes are near-duplicates of each other and their education, certifications and
+    # skills are easy to fill locally; both shortcuts are off so every request runs the full LLM pipeline
+    full_pipeline = {"REVISION_REUSE": "False", "LOCAL_EXTRACTION": "False"}
+    api, base_url = start_api(fake_url, args, tempfile.mkdtemp(), extra_env=full_pipeline)
+
+    try:
+        # Warm up connection pools and converter processes before anything is measured
+        asyncio.run(run_level(base_url, list(build_corpus(1, kinds, seed=args.seed - 1)), 1))
+        sweep = []
+        for index, concurrency in enumerate(levels):
+            # Fresh documents per level, so neither the cache nor request coalescing hides the LLM calls;
+            # revision reuse and local extraction are turned off above for the same reason
+            per_kind = -(-args.requests // len(kinds))
+            corpus = list(build_corpus(per_kind, kinds, seed=args.seed + 10_000 * (index + 1)))[:args.requests]
+            calls_before = backend.calls
+            level = asyncio.run(run_level(base_url, corpus, concurrency))
+            level["llm_calls"] = backend.calls - calls_before
+            sweep.append(level)
+            print(json.dumps({k: level[k] for k in ("concurrency", "throughput_rps", "latency", "errors")}))
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+        fake_server.should_exit = True
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "fake_gemini": {"peak_in_flight": backend.peak_in_flight, "rate_limited": backend.rate_limited},
+        "sweep": sweep,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
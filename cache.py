@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def document_digest(file_bytes):
+    """Identity of an uploaded document: the SHA-256 of its bytes."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def build_cache_key(file_bytes, prompt_version, model_name, mode="both", extractor_version=""):
+    """Content-addressed key: upload bytes + prompt/schema version + model + extraction mode.
+
+    ``extractor_version`` identifies the local extraction rules, when they fill any sections.
+    """
+    digest = hashlib.sha256()
+    components = [document_digest(file_bytes), prompt_version, model_name, mode]
+    # Left out when empty so keys written without local extraction stay valid
+    if extractor_version:
+        components.append(extractor_version)
+    for component in components:
+        digest.update(component.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Two-tier result cache: an in-process LRU in front of a SQLite file.
+
+    The SQLite tier is shared by every uvicorn worker pointing at the same path.
+    Rows older than ``disk_ttl_seconds`` are deleted whenever a result is stored.
+    """
+
+    def __init__(self, db_path, max_entries=256, ttl_seconds=3600, disk_ttl_seconds=7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "stores": 0,
+        }
+        self._init_db()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _init_db(self):
+        with self._connection() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS extraction_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            # Lets every store prune expired rows without scanning the table
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS extraction_cache_created_at ON extraction_cache (created_at)"
+            )
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _memory_get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key, value, stored_at=None):
+        with self._lock:
+            self._memory[key] = (stored_at or time.time(), value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        value = self._memory_get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        row = self._connection().execute(
+            "SELECT value, created_at FROM extraction_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None and time.time() - row[1] <= self.disk_ttl_seconds:
+            value = json.loads(row[0])
+            self._memory_set(key, value)
+            self._count("disk_hits")
+            return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        now = time.time()
+        self._memory_set(key, value, now)
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now),
+            )
+            expired = connection.execute(
+                "DELETE FROM extraction_cache WHERE created_at < ?", (now - self.disk_ttl_seconds,)
+            ).rowcount
+        if expired:
+            logger.info(f"Pruned {expired} expired extraction cache entries")
+        self._count("stores")
+
+    def record_refresh(self):
+        self._count("refreshes")
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._memory)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        counters["hit_ratio"] = (
+            round((counters["memory_hits"] + counters["disk_hits"]) / lookups, 4) if lookups else 0.0
+        )
+        return counters
@@ -0,0 +1,38 @@
+import re
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*'?\d{{2,4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+# "Jan 2020 - Present", "2018 – 2021", "03/2019 to 11/2022": how job, project and study periods are written
+DATE_RANGE = re.compile(rf"\b{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now|today)\b", re.IGNORECASE)
+
+_EDUCATION = re.compile(
+    r"\b(?:bachelor|master|doctor(?:ate)?|ph\.?\s?d|mba|university|college|institute of technology)\b", re.IGNORECASE
+)
+_SKILLS_HEADING = re.compile(r"^\W*(?:technical\s+|core\s+|key\s+)?skills\b", re.IGNORECASE | re.MULTILINE)
+_CERTIFICATIONS_HEADING = re.compile(r"^\W*(?:licenses?\s*(?:&|and)\s*)?certifications?\b", re.IGNORECASE | re.MULTILINE)
+
+
+def incomplete_sections(resume, source_text=None):
+    """ResumeSchema fields that came back empty although the source evidently has them.
+
+    ``resume`` is a validated ResumeSchema dict. The checks only flag what the
+    text makes obvious: more date ranges than education entries means there
+    are jobs or projects, a degree or university means education, and a skills
+    or certifications heading means that section. Without the source text (a
+    raw PDF sent to the model) only an extraction with no experience and no
+    education at all is flagged.
+    """
+    has_experience = bool(resume.get("work_experience") or resume.get("project_experience"))
+    if not source_text:
+        return [] if has_experience or resume.get("education") else ["work_experience"]
+
+    missing = []
+    if not has_experience and len(DATE_RANGE.findall(source_text)) > len(resume.get("education") or []):
+        missing.append("work_experience")
+    if not resume.get("education") and _EDUCATION.search(source_text):
+        missing.append("education")
+    if not resume.get("credits") and _SKILLS_HEADING.search(source_text):
+        missing.append("credits")
+    if not resume.get("certifications") and _CERTIFICATIONS_HEADING.search(source_text):
+        missing.append("certifications")
+    return missing
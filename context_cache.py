@@ -0,0 +1,209 @@
+import asyncio
+import datetime
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# A cache closer than this to expiring is not handed out; the call could outlive it
+MIN_REMAINING_SECONDS = 60
+
+
+class ContextCache:
+    """Keeps the static prompt prefixes registered as Gemini cached content.
+
+    Each prompt gets one cached content per model and prompt version, found
+    again by its display name so workers and instances share it, and a changed
+    prompt text gets a new one. Calls reference the cache instead of resending
+    the prompt. While it is being created, when it is smaller than the model's
+    minimum for cached content (``min_tokens``, estimated with
+    ``count_tokens``) or when the backend refuses to cache it, ``lookup``
+    returns ``None`` and the caller sends the prompt inline.
+
+    The TTL is only renewed while the cache is in use, so an idle service lets
+    it expire instead of paying to store it.
+    """
+
+    def __init__(
+        self,
+        get_client,
+        prompt_names,
+        is_transient,
+        ttl_seconds=3600,
+        renew_seconds=900,
+        retry_seconds=300,
+        enabled=True,
+        min_tokens=0,
+        count_tokens=lambda part: 0,
+    ):
+        self._get_client = get_client
+        self.prompt_names = tuple(prompt_names)
+        self._is_transient = is_transient
+        self.ttl_seconds = ttl_seconds
+        self.renew_seconds = renew_seconds
+        self.retry_seconds = retry_seconds
+        self.enabled = enabled
+        self.min_tokens = min_tokens
+        self._count_tokens = count_tokens
+        # (model, prompt name, version) -> {"name": cached content name, "expires_at": monotonic deadline}
+        self._entries = {}
+        # Below the minimum size or refused by the backend; not retried for this version
+        self._unavailable = {}
+        self._retry_at = {}
+        self._tasks = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "created": 0,
+            "reused": 0,
+            "renewed": 0,
+            "invalidated": 0,
+            "errors": 0,
+            "below_minimum": 0,
+        }
+
+    @staticmethod
+    def display_name(model, name, version):
+        return f"resume-extractor/{model}/{name}/{version[:16]}"
+
+    def lookup(self, model, name, part, version):
+        """Name of the cached content holding prompt ``name`` for ``model``, or ``None`` to send it inline.
+
+        Never waits on the backend: a missing cache is created, and one close to
+        expiring is renewed, in the background.
+        """
+        if not self.enabled or name not in self.prompt_names:
+            return None
+        key = (model, name, version)
+        entry = self._entries.get(key)
+        remaining = entry["expires_at"] - time.monotonic() if entry else 0
+        if remaining > MIN_REMAINING_SECONDS:
+            if remaining < self.renew_seconds:
+                self._start(key, lambda: self._renew(key, entry["name"]))
+            self._counters["hits"] += 1
+            return entry["name"]
+        self._counters["misses"] += 1
+        if (
+            key not in self._unavailable
+            and not self._below_minimum(key, part)
+            and self._retry_at.get(key, 0) <= time.monotonic()
+        ):
+            self._start(key, lambda: self._create(key, part))
+        return None
+
+    async def prepare(self, model, name, part, version):
+        """Create or find the cache for ``name`` and wait for it; used by the startup warm-up."""
+        if not self.enabled or name not in self.prompt_names:
+            return None
+        key = (model, name, version)
+        if key not in self._entries and key not in self._unavailable and not self._below_minimum(key, part):
+            self._start(key, lambda: self._create(key, part))
+        task = self._tasks.get(key)
+        if task is not None:
+            await asyncio.shield(task)
+        entry = self._entries.get(key)
+        return entry["name"] if entry else None
+
+    def invalidate(self, model, name, version, cache_name):
+        """Forget a cache the backend no longer knows; the next lookup creates a new one."""
+        key = (model, name, version)
+        entry = self._entries.get(key)
+        if entry is not None and entry["name"] == cache_name:
+            del self._entries[key]
+            self._counters["invalidated"] += 1
+
+    @staticmethod
+    def is_cache_error(exc):
+        """Whether a call failed because its cached content is gone (expired, deleted or not visible)."""
+        return getattr(exc, "code", None) in (400, 403, 404) and "cachedcontent" in str(exc).lower().replace(" ", "")
+
+    def _below_minimum(self, key, part):
+        # Checked before asking the backend, which would only refuse it
+        tokens = self._count_tokens(part)
+        if tokens >= self.min_tokens:
+            return False
+        model, name, _ = key
+        self._unavailable[key] = f"about {tokens} tokens, below the {self.min_tokens} token minimum for cached content"
+        self._counters["below_minimum"] += 1
+        logger.info(f"Not caching the {name} prompt for {model}: {self._unavailable[key]}; sending it inline")
+        return True
+
+    def _start(self, key, factory):
+        # One background create or renew per prompt at a time
+        if key in self._tasks:
+            return
+        task = asyncio.create_task(factory())
+        self._tasks[key] = task
+        task.add_done_callback(lambda done, key=key: self._tasks.pop(key, None))
+
+    def _expires_at(self, cached):
+        expire_time = getattr(cached, "expire_time", None)
+        if expire_time is None:
+            return time.monotonic() + self.ttl_seconds
+        remaining = (expire_time - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return time.monotonic() + remaining
+
+    async def _find(self, client, display_name):
+        async for cached in await client.aio.caches.list():
+            if cached.display_name == display_name:
+                return cached
+        return None
+
+    async def _create(self, key, part):
+        model, name, version = key
+        display_name = self.display_name(model, name, version)
+        try:
+            client = self._get_client()
+            cached = await self._find(client, display_name)
+            if cached is not None:
+                # Shared with other workers; extended so it outlives this process's first calls
+                cached = await client.aio.caches.update(name=cached.name, config={"ttl": f"{self.ttl_seconds}s"})
+                self._counters["reused"] += 1
+            else:
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config={"contents": [part], "display_name": display_name, "ttl": f"{self.ttl_seconds}s"},
+                )
+                self._counters["created"] += 1
+        except Exception as e:
+            self._counters["errors"] += 1
+            if self._is_transient(e):
+                self._retry_at[key] = time.monotonic() + self.retry_seconds
+                logger.warning(f"Could not cache the {name} prompt for {model}, retrying in {self.retry_seconds}s: {e}")
+            else:
+                self._unavailable[key] = str(e)
+                logger.warning(f"Context caching is unavailable for the {name} prompt on {model}; sending it inline: {e}")
+            return
+        self._entries[key] = {"name": cached.name, "expires_at": self._expires_at(cached)}
+        logger.info(f"Prompt {name} cached as {cached.name} ({display_name})")
+
+    async def _renew(self, key, cache_name):
+        try:
+            cached = await self._get_client().aio.caches.update(name=cache_name, config={"ttl": f"{self.ttl_seconds}s"})
+        except Exception as e:
+            self._counters["errors"] += 1
+            logger.warning(f"Could not renew context cache {cache_name}: {e}")
+            if not self._is_transient(e):
+                self.invalidate(*key, cache_name)
+            return
+        entry = self._entries.get(key)
+        if entry is not None and entry["name"] == cache_name:
+            entry["expires_at"] = self._expires_at(cached)
+            self._counters["renewed"] += 1
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "prompts": list(self.prompt_names),
+            **self._counters,
+            "caches": {
+                f"{model}/{name}": {
+                    "cache": entry["name"],
+                    "version": version[:12],
+                    "expires_in_seconds": round(entry["expires_at"] - now),
+                }
+                for (model, name, version), entry in self._entries.items()
+            },
+            "unavailable": {f"{model}/{name}": reason for (model, name, _), reason in self._unavailable.items()},
+        }
@@ -0,0 +1,125 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DOCX_MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# One warm converter per process; MarkItDown builds its converter registry on construction
+_markitdown = None
+_process_pool = None
+_process_count = 0
+
+# pdfminer emits "(cid:123)" for glyphs it cannot map back to unicode
+_CID_PATTERN = re.compile(r"\(cid:\d+\)")
+_BLANK_LINE_RUN = re.compile(r"\n{3,}")
+
+
+def _compact_layout_text(text):
+    """Trim the padding ``layout=True`` adds while keeping column alignment."""
+    lines = [line.rstrip() for line in text.splitlines()]
+    indents = [len(line) - len(line.lstrip(" ")) for line in lines if line.strip()]
+    common_indent = min(indents) if indents else 0
+    text = "\n".join(line[common_indent:] for line in lines)
+    return _BLANK_LINE_RUN.sub("\n\n", text).strip()
+
+
+def pdf_to_text(file_bytes, min_chars_per_page=200, max_cid_ratio=0.1):
+    """Extract a layout-preserving text layer from a PDF.
+
+    Returns ``None`` when the PDF has no usable text layer (scanned pages,
+    unmappable fonts), in which case the caller should send the raw bytes.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        page_count = len(pdf.pages)
+        pages = [page.extract_text(layout=True) or "" for page in pdf.pages]
+
+    text = "\n\n".join(_compact_layout_text(page) for page in pages)
+    visible_chars = len(re.sub(r"\s", "", text))
+    cid_chars = sum(len(match) for match in _CID_PATTERN.findall(text))
+
+    if page_count == 0 or visible_chars < min_chars_per_page * page_count:
+        logger.info(f"PDF text layer too sparse ({visible_chars} chars over {page_count} pages)")
+        return None
+    if cid_chars / visible_chars > max_cid_ratio:
+        logger.info(f"PDF text layer has unmapped glyphs ({cid_chars} of {visible_chars} chars)")
+        return None
+
+    logger.info(f"PDF text layer extracted: {visible_chars} chars over {page_count} pages")
+    return _CID_PATTERN.sub("", text)
+
+
+def _get_markitdown():
+    global _markitdown
+    if _markitdown is None:
+        # Imported here: markitdown and its converter stack are the slowest part of a cold start
+        from markitdown import MarkItDown
+
+        _markitdown = MarkItDown()
+    return _markitdown
+
+
+def docx_to_text_markitdown(file_bytes):
+    """Convert DOCX bytes to markdown text entirely in memory."""
+    from markitdown import StreamInfo
+
+    logger.info(f"Converting DOCX upload ({len(file_bytes)} bytes) to text using markitdown")
+    result = _get_markitdown().convert_stream(
+        io.BytesIO(file_bytes),
+        stream_info=StreamInfo(extension=".docx", mimetype=DOCX_MIMETYPE),
+    )
+    logger.info(f"DOCX conversion to text completed.")
+    return result.text_content
+
+
+def warm_up():
+    """Import the converter stacks ahead of the first upload."""
+    import pdfplumber  # noqa: F401
+
+    _get_markitdown()
+    return True
+
+
+def start_process_pool(max_workers):
+    """Start the conversion pool; ``max_workers=0`` keeps conversions on the thread pool."""
+    global _process_pool, _process_count
+    if max_workers and _process_pool is None:
+        # Spawned rather than forked: workers start lazily, and forking while another thread holds an
+        # import lock (the warm-up imports the Gemini SDK on the thread pool) deadlocks the child
+        _process_pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_get_markitdown,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _process_count = max_workers
+        logger.info(f"Started document conversion pool with {max_workers} process(es)")
+    return _process_pool
+
+
+async def warm_up_pool():
+    """Start every pool process and load its converters, or warm up this process when there is no pool."""
+    loop = asyncio.get_running_loop()
+    if _process_pool is None:
+        await loop.run_in_executor(None, warm_up)
+        return
+    # Idle workers pick these up one each, so every process is forked and initialised before the first upload
+    await asyncio.gather(*(loop.run_in_executor(_process_pool, warm_up) for _ in range(_process_count)))
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+async def run_conversion(func, *args):
+    """Run a CPU-bound conversion off the event loop, in the process pool when available."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_pool, func, *args)
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+
+from lazy_imports import LazyModule
+from resume_store import education_level
+
+pa = LazyModule("pyarrow")
+pq = LazyModule("pyarrow.parquet")
+ipc = LazyModule("pyarrow.ipc")
+
+logger = logging.getLogger(__name__)
+
+# Normalized tables a stored ResumeSchema record flattens into. Every row carries the record's
+# resume_id; rows of a list keep their position in it, and child rows the position of their parent.
+TABLES = {
+    "resumes": [
+        ("resume_id", "int64"),
+        ("document", "string"),
+        ("filename", "string"),
+        ("updated_at", "float64"),
+        ("professional_summary", "string"),
+    ],
+    "professional_experience": [("resume_id", "int64"), ("position", "int32"), ("text", "string")],
+    "awards": [("resume_id", "int64"), ("position", "int32"), ("award", "string")],
+    "certifications": [("resume_id", "int64"), ("position", "int32"), ("certification", "string")],
+    "education": [("resume_id", "int64"), ("position", "int32"), ("degree", "string"), ("level", "string")],
+    "skills": [
+        ("resume_id", "int64"),
+        ("category_position", "int32"),
+        ("category", "string"),
+        ("position", "int32"),
+        ("skill", "string"),
+    ],
+    "work_experience": [
+        ("resume_id", "int64"),
+        ("position", "int32"),
+        ("client", "string"),
+        ("project", "string"),
+        ("role", "string"),
+        ("location", "string"),
+        ("duration", "string"),
+    ],
+    "work_experience_description": [
+        ("resume_id", "int64"),
+        ("experience_position", "int32"),
+        ("position", "int32"),
+        ("text", "string"),
+    ],
+    "project_experience": [
+        ("resume_id", "int64"),
+        ("position", "int32"),
+        ("project", "string"),
+        ("role", "string"),
+        ("location", "string"),
+        ("duration", "string"),
+    ],
+    "project_experience_tools": [
+        ("resume_id", "int64"),
+        ("project_position", "int32"),
+        ("position", "int32"),
+        ("tool", "string"),
+    ],
+    "project_experience_description": [
+        ("resume_id", "int64"),
+        ("project_position", "int32"),
+        ("position", "int32"),
+        ("text", "string"),
+    ],
+    "project_experience_responsibilities": [
+        ("resume_id", "int64"),
+        ("project_position", "int32"),
+        ("position", "int32"),
+        ("text", "string"),
+    ],
+}
+
+EXPORT_FORMATS = ("parquet", "arrow", "ndjson")
+FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "ndjson": ".ndjson"}
+
+
+def _items(values):
+    return enumerate(values or [])
+
+
+def _resume_rows(resume, record):
+    yield resume["id"], resume["document"], resume["filename"], resume["updated_at"], record.get("professional_summary")
+
+
+def _list_rows(field):
+    def rows(resume, record):
+        return ((resume["id"], i, value) for i, value in _items(record.get(field)))
+
+    return rows
+
+
+def _certification_rows(resume, record):
+    return ((resume["id"], i, entry.get("certification")) for i, entry in _items(record.get("certifications")))
+
+
+def _education_rows(resume, record):
+    for i, entry in _items(record.get("education")):
+        yield resume["id"], i, entry.get("degree"), education_level(entry.get("degree") or "")
+
+
+def _skill_rows(resume, record):
+    for c, group in _items(record.get("credits")):
+        for i, skill in _items(group.get("items")):
+            yield resume["id"], c, group.get("category"), i, skill
+
+
+def _work_rows(resume, record):
+    for e, job in _items(record.get("work_experience")):
+        yield resume["id"], e, job.get("client"), job.get("Project"), job.get("role"), job.get("location"), job.get("duration")
+
+
+def _project_rows(resume, record):
+    for p, project in _items(record.get("project_experience")):
+        yield resume["id"], p, project.get("Project"), project.get("role"), project.get("location"), project.get("duration")
+
+
+def _child_rows(parent_field, field):
+    def rows(resume, record):
+        for parent, entry in _items(record.get(parent_field)):
+            for i, value in _items(entry.get(field)):
+                yield resume["id"], parent, i, value
+
+    return rows
+
+
+# How each table's rows are drawn from a stored resume (as ``ResumeStore.get`` returns it) and its record
+ROWS = {
+    "resumes": _resume_rows,
+    "professional_experience": _list_rows("professional_experience"),
+    "awards": _list_rows("awards"),
+    "certifications": _certification_rows,
+    "education": _education_rows,
+    "skills": _skill_rows,
+    "work_experience": _work_rows,
+    "work_experience_description": _child_rows("work_experience", "description"),
+    "project_experience": _project_rows,
+    "project_experience_tools": _child_rows("project_experience", "tools"),
+    "project_experience_description": _child_rows("project_experience", "description"),
+    "project_experience_responsibilities": _child_rows("project_experience", "responsibilities"),
+}
+
+
+def iter_table_chunks(resumes, chunk_size=1000, tables=TABLES):
+    """Rows per table for each ``chunk_size`` resumes of ``resumes``; only one chunk is held at a time."""
+    chunk, count = {table: [] for table in tables}, 0
+    for resume in resumes:
+        for table in tables:
+            chunk[table].extend(ROWS[table](resume, resume["record"]))
+        count += 1
+        if count == chunk_size:
+            yield chunk
+            chunk, count = {table: [] for table in tables}, 0
+    if count:
+        yield chunk
+
+
+def arrow_schema(table):
+    return pa.schema([(column, getattr(pa, kind)()) for column, kind in TABLES[table]])
+
+
+def record_batch(table, rows):
+    """The rows of ``table`` as an Arrow record batch, built column by column."""
+    schema = arrow_schema(table)
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+    )
+
+
+def write_tables(resumes, directory, export_format="parquet", chunk_size=1000):
+    """Write every table as one Parquet or Arrow IPC file in ``directory``; returns the row count per table.
+
+    Each chunk of resumes becomes one row group (Parquet) or record batch
+    (Arrow) of every table, so memory is bounded by ``chunk_size``, not by
+    the number of resumes. Tables without rows are still written, with
+    their schema.
+    """
+    if export_format not in ("parquet", "arrow"):
+        raise ValueError(f"Unsupported table format: {export_format}")
+    os.makedirs(directory, exist_ok=True)
+    writers, counts = {}, {table: 0 for table in TABLES}
+    try:
+        for table in TABLES:
+            path = os.path.join(directory, table + FILE_EXTENSIONS[export_format])
+            if export_format == "parquet":
+                writers[table] = pq.ParquetWriter(path, arrow_schema(table), compression="zstd")
+            else:
+                writers[table] = ipc.new_file(path, arrow_schema(table))
+        for chunk in iter_table_chunks(resumes, chunk_size):
+            for table, rows in chunk.items():
+                if rows:
+                    writers[table].write_batch(record_batch(table, rows))
+                    counts[table] += len(rows)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    logger.info(f"Exported {counts['resumes']} resumes as {export_format} to {directory}")
+    return counts
+
+
+def iter_ndjson(resumes, table="resumes", chunk_size=1000):
+    """``table`` as newline-delimited JSON, one object per row, yielded as one bytes block per chunk."""
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    columns = [column for column, _ in TABLES[table]]
+    for chunk in iter_table_chunks(resumes, chunk_size, (table,)):
+        if chunk[table]:
+            yield "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in chunk[table]).encode("utf-8")
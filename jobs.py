@@ -0,0 +1,294 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobQueue:
+    """Persistent SQLite job queue drained by a pool of asyncio workers.
+
+    Workers claim jobs under a lease, renewed while the job runs; a job whose
+    lease expires (its worker crashed or was killed) is put back on the queue
+    by the next poll, so several uvicorn workers can share one queue file
+    safely. A job that has lost its worker ``max_attempts`` times is failed
+    rather than claimed again.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        handler,
+        is_transient=lambda exc: False,
+        max_depth=100,
+        max_attempts=3,
+        lease_seconds=300,
+        retry_backoff_seconds=5.0,
+        poll_interval=0.5,
+    ):
+        self.db_path = db_path
+        self.handler = handler
+        self.is_transient = is_transient
+        self.max_depth = max_depth
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._workers = []
+        self._wakeup = None
+        self._loop = None
+        self._init_db()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _init_db(self):
+        connection = self._connection()
+        connection.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                payload BLOB,
+                options TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_expires_at REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS jobs_status_available ON jobs (status, available_at)")
+
+    def depth(self):
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchone()
+        return row[0]
+
+    def enqueue(self, filename, payload, options=None):
+        connection = self._connection()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            depth = connection.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+            if depth >= self.max_depth:
+                raise QueueFullError(f"Job queue is full ({depth} pending jobs).")
+            connection.execute(
+                """INSERT INTO jobs (id, status, filename, payload, options, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, QUEUED, filename, payload, json.dumps(options or {}), now, now, now),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        logger.info(f"Enqueued job {job_id} for file: {filename}")
+        if self._wakeup is not None:
+            # Called from the threadpool; asyncio.Event is only safe to set from its own loop
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return job_id
+
+    def get(self, job_id):
+        row = self._connection().execute(
+            """SELECT id, status, filename, result, error, attempts, created_at, updated_at
+            FROM jobs WHERE id = ?""",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "filename": row["filename"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def reclaim_expired(self):
+        """Return jobs whose worker lease has expired to the queue (crash recovery).
+
+        A job that has already used up its attempts is failed instead, so one
+        that keeps crashing its worker is not run forever.
+        """
+        connection = self._connection()
+        now = time.time()
+        failed = connection.execute(
+            """UPDATE jobs SET status = ?, error = ?, payload = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE status = ? AND lease_expires_at < ? AND attempts >= ?""",
+            (FAILED, f"The job's worker was lost {self.max_attempts} time(s).", now, RUNNING, now, self.max_attempts),
+        ).rowcount
+        if failed:
+            logger.error(f"Failed {failed} job(s) whose worker was lost on every attempt")
+        cursor = connection.execute(
+            """UPDATE jobs SET status = ?, lease_expires_at = NULL, available_at = ?, updated_at = ?
+            WHERE status = ? AND lease_expires_at < ?""",
+            (QUEUED, now, now, RUNNING, now),
+        )
+        if cursor.rowcount:
+            logger.warning(f"Re-claimed {cursor.rowcount} in-flight job(s) with expired leases")
+        return cursor.rowcount
+
+    def _renew_lease(self, job_id):
+        self._connection().execute(
+            "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (time.time() + self.lease_seconds, time.time(), job_id, RUNNING),
+        )
+
+    def _claim(self):
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                """SELECT id, filename, payload, options, attempts FROM jobs
+                WHERE status = ? AND available_at <= ? AND attempts < ?
+                ORDER BY created_at LIMIT 1""",
+                (QUEUED, now, self.max_attempts),
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    """UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires_at = ?, updated_at = ?
+                    WHERE id = ?""",
+                    (RUNNING, now + self.lease_seconds, now, row["id"]),
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "filename": row["filename"],
+            "payload": row["payload"],
+            "options": json.loads(row["options"]),
+            "attempts": row["attempts"] + 1,
+        }
+
+    def _complete(self, job_id, result):
+        self._connection().execute(
+            """UPDATE jobs SET status = ?, result = ?, error = NULL, payload = NULL,
+            lease_expires_at = NULL, updated_at = ? WHERE id = ?""",
+            (SUCCEEDED, json.dumps(result), time.time(), job_id),
+        )
+
+    def _release(self, job_id):
+        """Hand a job back to the queue without counting the attempt against it."""
+        now = time.time()
+        self._connection().execute(
+            """UPDATE jobs SET status = ?, error = ?, attempts = MAX(attempts - 1, 0), available_at = ?,
+            lease_expires_at = NULL, updated_at = ? WHERE id = ?""",
+            (QUEUED, "Worker stopped before the job finished.", now, now, job_id),
+        )
+
+    def _fail(self, job_id, error, retry_at=None):
+        now = time.time()
+        if retry_at is not None:
+            self._connection().execute(
+                """UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_expires_at = NULL,
+                updated_at = ? WHERE id = ?""",
+                (QUEUED, error, retry_at, now, job_id),
+            )
+        else:
+            self._connection().execute(
+                """UPDATE jobs SET status = ?, error = ?, payload = NULL, lease_expires_at = NULL,
+                updated_at = ? WHERE id = ?""",
+                (FAILED, error, now, job_id),
+            )
+
+    async def _keep_lease(self, job_id):
+        # Renewed well before it runs out, so a slow extraction is never taken for a lost one
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await run_in_threadpool(self._renew_lease, job_id)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not renew the lease of job {job_id}: {e}")
+
+    async def _process(self, job):
+        heartbeat = asyncio.create_task(self._keep_lease(job["job_id"]))
+        try:
+            result = await self.handler(job)
+        except asyncio.CancelledError:
+            # Graceful shutdown: hand the job straight back instead of waiting out the lease
+            self._release(job["job_id"])
+            raise
+        except Exception as e:
+            transient = self.is_transient(e)
+            if transient and job["attempts"] < self.max_attempts:
+                delay = self.retry_backoff_seconds * 2 ** (job["attempts"] - 1)
+                logger.warning(
+                    f"Job {job['job_id']} failed with a transient error (attempt {job['attempts']}), "
+                    f"retrying in {delay:.1f}s: {e}"
+                )
+                await run_in_threadpool(self._fail, job["job_id"], f"{type(e).__name__}: {e}", time.time() + delay)
+            else:
+                logger.error(f"Job {job['job_id']} failed: {e}", exc_info=True)
+                await run_in_threadpool(self._fail, job["job_id"], f"{type(e).__name__}: {e}")
+            return
+        finally:
+            heartbeat.cancel()
+        await run_in_threadpool(self._complete, job["job_id"], result)
+        logger.info(f"Job {job['job_id']} completed for file: {job['filename']}")
+
+    async def _worker_loop(self, worker_index):
+        while True:
+            try:
+                await run_in_threadpool(self.reclaim_expired)
+                job = await run_in_threadpool(self._claim)
+            except sqlite3.Error as e:
+                logger.error(f"Job worker {worker_index} could not poll the queue: {e}", exc_info=True)
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process(job)
+
+    async def start(self, num_workers):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        recovered = await run_in_threadpool(self.reclaim_expired)
+        self._workers = [asyncio.create_task(self._worker_loop(i)) for i in range(num_workers)]
+        logger.info(f"Started {num_workers} job worker(s); {recovered} job(s) recovered")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -0,0 +1,153 @@
+import json
+import re
+
+from pydantic import ValidationError
+
+_CODE_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*\n?|\n?\s*```\s*$")
+
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def repair_json(text):
+    """Best-effort fix of the JSON defects LLMs commonly produce.
+
+    Handles Markdown code fences, prose before or after the JSON value, trailing
+    commas, raw newlines inside strings and output truncated mid-way (an open
+    string is closed, a half-written key or literal is dropped and the open
+    arrays/objects are closed). Returns ``None`` if there is no JSON value at all.
+    """
+    text = _CODE_FENCE.sub("", text)
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return None
+
+    out = []
+    stack = []
+    in_string = escaped = string_is_key = False
+    expect_key = False
+    # Length of ``out`` at the last point where closing the open containers gives valid JSON
+    safe_len = 0
+
+    for char in text[min(starts):]:
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(char)
+            elif char == "\\":
+                escaped = True
+                out.append(char)
+            elif char == '"':
+                in_string = False
+                out.append(char)
+                if not string_is_key:
+                    safe_len = len(out)
+            else:
+                out.append(_STRING_ESCAPES.get(char, char))
+            continue
+
+        if char == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1] == "{" and expect_key
+            if string_is_key:
+                expect_key = False
+            out.append(char)
+        elif char in "{[":
+            stack.append(char)
+            expect_key = char == "{"
+            out.append(char)
+            safe_len = len(out)
+        elif char in "}]":
+            _strip_trailing_comma(out)
+            if not stack:
+                break
+            opener = stack.pop()
+            out.append("}" if opener == "{" else "]")
+            safe_len = len(out)
+            if not stack:
+                break
+        elif char == ",":
+            _strip_trailing_whitespace(out)
+            if out and out[-1] not in "{[,":
+                safe_len = len(out)
+                out.append(char)
+            expect_key = bool(stack) and stack[-1] == "{"
+        else:
+            out.append(char)
+
+    if stack:
+        # Truncated: keep a partial string value, drop anything else that is incomplete
+        if in_string and not string_is_key:
+            if escaped:
+                out.pop()
+            out.append('"')
+            safe_len = len(out)
+        del out[safe_len:]
+        _strip_trailing_comma(out)
+        out.extend("}" if opener == "{" else "]" for opener in reversed(stack))
+    return "".join(out)
+
+
+def _strip_trailing_whitespace(out):
+    while out and out[-1].isspace():
+        out.pop()
+
+
+def _strip_trailing_comma(out):
+    _strip_trailing_whitespace(out)
+    if out and out[-1] == ",":
+        out.pop()
+        _strip_trailing_whitespace(out)
+
+
+def loads_with_repair(text):
+    """Return ``(value, repaired)``; raises ``ValueError`` if even the repaired text is not JSON."""
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as e:
+        error = e
+    repaired = repair_json(text or "")
+    if repaired is None:
+        raise ValueError(f"No JSON value found: {error}")
+    try:
+        return json.loads(repaired), True
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{error} (repair failed: {e})")
+
+
+def validate_partial(model, data):
+    """Validate ``data`` against ``model`` field by field.
+
+    Returns ``(validated, valid_data, failed_fields)``: ``validated`` is the
+    JSON-mode dump when everything passes, otherwise ``None``; ``valid_data``
+    keeps only the top-level fields that passed. Fields the model left out
+    entirely are retried as ``null`` first, since nullable fields are often
+    omitted rather than sent as null.
+    """
+    if not isinstance(data, dict):
+        return None, {}, set(model.model_fields)
+    data = {name: value for name, value in data.items() if name in model.model_fields}
+    for attempt in range(2):
+        try:
+            return model.model_validate(data).model_dump(mode="json"), data, set()
+        except ValidationError as e:
+            errors = e.errors()
+        if attempt == 0 and any(error["type"] == "missing" for error in errors):
+            data = _fill_missing(data, errors)
+            continue
+        break
+    failed = {str(error["loc"][0]) for error in errors if error["loc"]}
+    return None, {name: value for name, value in data.items() if name not in failed}, failed
+
+
+def _fill_missing(data, errors):
+    data = json.loads(json.dumps(data))
+    for error in errors:
+        if error["type"] != "missing":
+            continue
+        *parents, name = error["loc"]
+        target = data
+        for key in parents:
+            target = target[key]
+        if isinstance(target, dict):
+            target[name] = None
+    return data
@@ -0,0 +1,19 @@
+import importlib
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Keeps heavy SDKs out of ``import main`` so a scaled-to-zero instance binds its
+    port sooner; the startup warm-up (or the first request) pays for the import.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        # sys.modules makes every access after the first a dictionary lookup
+        return getattr(importlib.import_module(self._name), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
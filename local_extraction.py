@@ -0,0 +1,364 @@
+import hashlib
+import json
+import logging
+import pathlib
+import re
+from collections import deque
+
+from completeness import DATE_RANGE
+
+logger = logging.getLogger(__name__)
+
+SKILLS_TAXONOMY_PATH = pathlib.Path(__file__).parent / "taxonomy" / "skills.json"
+
+# Bump when the rules below change what gets extracted; part of the extraction cache key
+RULES_VERSION = "1"
+
+# Section headings as written in resumes, normalized, mapped to the ResumeSchema field they hold
+SECTION_HEADINGS = {
+    "education": "education",
+    "academic background": "education",
+    "academic qualifications": "education",
+    "educational qualifications": "education",
+    "education and training": "education",
+    "certifications": "certifications",
+    "certification": "certifications",
+    "certificates": "certifications",
+    "licenses and certifications": "certifications",
+    "licenses & certifications": "certifications",
+    "professional certifications": "certifications",
+    "skills": "credits",
+    "technical skills": "credits",
+    "key skills": "credits",
+    "core skills": "credits",
+    "skills and tools": "credits",
+    "skills & tools": "credits",
+    "core competencies": "credits",
+    "technologies": "credits",
+    "tools and technologies": "credits",
+    "tools & technologies": "credits",
+    "technical proficiencies": "credits",
+    "summary": "professional_summary",
+    "professional summary": "professional_summary",
+    "profile": "professional_summary",
+    "objective": "professional_summary",
+    "about me": "professional_summary",
+    "experience": "work_experience",
+    "work experience": "work_experience",
+    "professional experience": "work_experience",
+    "employment history": "work_experience",
+    "work history": "work_experience",
+    "projects": "project_experience",
+    "project experience": "project_experience",
+    "key projects": "project_experience",
+    "awards": "awards",
+    "honors": "awards",
+    "honors and awards": "awards",
+    "awards and honors": "awards",
+    "achievements": "awards",
+    "accomplishments": "awards",
+}
+
+_HEADING_MARKUP = re.compile(r"^[#*_=\-\s]+|[#*_=:\-\s]+$")
+# Headings of sections not in the table above (INTERESTS, ## Volunteering, **Languages**) end the current section
+_OTHER_HEADING = re.compile(r"^(?:#{1,6}\s+\S.*|\*\*[^*]+\*\*:?|[A-Z][A-Z&/ ]{4,40}:?|[A-Z][\w&/ ]{0,40}:)$")
+_BULLET = re.compile(r"^\s*(?:[-*•·▪◦–]|\d+[.)])\s+")
+_ITEM_SEPARATORS = re.compile(r"\s*[,;|•·]\s*|\s+/\s+")
+
+_DEGREE = re.compile(
+    r"\b(?:bachelor|master|associate(?:'s)? degree|associate of|doctor of|doctorate|diploma|high school)\b",
+    re.IGNORECASE,
+)
+# Abbreviations only count in capitals, so "MS" is a degree but "ms" is not
+_DEGREE_ABBREVIATION = re.compile(r"\b(?:[BM]\.?\s?(?:S|Sc|A|E|Eng|Tech|Com)|M\.?Phil|MBA|Ph\.?\s?D)\b")
+_INSTITUTION = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+
+# Entries beyond these limits are more than a plain list, so the section is left to the model
+MAX_ENTRY_WORDS = 25
+MAX_CERTIFICATION_WORDS = 15
+MAX_SKILL_WORDS = 6
+MAX_EDUCATION_LINES = 4
+MIN_RECOGNIZED_SKILLS = 0.6
+
+
+class AhoCorasick:
+    """Finds every occurrence of a set of patterns in one pass over the text.
+
+    ``patterns`` maps each (lowercase) pattern to the value reported for it.
+    Matches must start and end at word boundaries, and overlapping matches
+    resolve to the leftmost, then longest, one, so "C++" wins over "C".
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, value in patterns.items():
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = child
+            self._out[node].append((len(pattern), value))
+
+        # Breadth-first, so every failure link points at a node whose own link is already set
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text):
+        """``(start, end, value)`` for each non-overlapping match, in order."""
+        lowered = text.lower()
+        matches = []
+        node = 0
+        for index, char in enumerate(lowered):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, value in self._out[node]:
+                start, end = index - length + 1, index + 1
+                if _at_boundary(lowered, start, end):
+                    matches.append((start, end, value))
+
+        selected, covered_until = [], 0
+        for start, end, value in sorted(matches, key=lambda match: (match[0], match[0] - match[1])):
+            if start >= covered_until:
+                selected.append((start, end, value))
+                covered_until = end
+        return selected
+
+
+def _at_boundary(text, start, end):
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not (before.isalnum() or (after.isalnum() and text[end - 1].isalnum()))
+
+
+def load_skill_matcher(path=SKILLS_TAXONOMY_PATH):
+    """Compile the skills taxonomy into a matcher reporting ``(skill, category)``; returns it and a content hash."""
+    raw = pathlib.Path(path).read_bytes()
+    taxonomy = json.loads(raw)
+    patterns = {}
+    for category, skills in taxonomy["categories"].items():
+        for skill in skills:
+            patterns.setdefault(skill.lower(), (skill, category))
+    for alias, skill in taxonomy.get("aliases", {}).items():
+        patterns.setdefault(alias.lower(), patterns[skill.lower()])
+    return AhoCorasick(patterns), hashlib.sha256(raw).hexdigest()
+
+
+def canonical_skill(matcher, name):
+    """The taxonomy spelling of a skill ("k8s" is "Kubernetes"), or the name as written when it is not one."""
+    name = name.strip()
+    matches = matcher.find(name)
+    if len(matches) == 1 and matches[0][:2] == (0, len(name)):
+        return matches[0][2][0]
+    return name
+
+
+def _clean(line):
+    return _BULLET.sub("", line).strip().rstrip(".").strip()
+
+
+def _heading(line):
+    """The ResumeSchema field a heading line opens, and any content written after it on the same line.
+
+    ``False`` for a heading of some other section, ``None`` for a line that is not a heading.
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60:
+        return None, None
+    label, colon, rest = stripped.partition(":")
+    normalized = " ".join(_HEADING_MARKUP.sub("", label).lower().split())
+    field = SECTION_HEADINGS.get(normalized)
+    if field is None:
+        return (False, None) if _OTHER_HEADING.match(stripped) and len(stripped.split()) <= 4 else (None, None)
+    # "Skills: Python, SQL" is a heading with its content inline; "Education" alone is just a heading
+    return field, rest.strip() if colon else ""
+
+
+def split_sections(text, other=None, header=None):
+    """Lines of the converted resume text grouped under the ResumeSchema field their heading names.
+
+    Lines outside those sections (the header, sections with other headings)
+    are dropped, or grouped under ``other`` when it is given; the lines before
+    the first heading go under ``header`` instead when that is given too.
+    """
+    sections = {}
+    first = header if header is not None else other
+    current = sections.setdefault(first, []) if first is not None else None
+    for line in text.splitlines():
+        field, inline = _heading(line)
+        if field is False:
+            current = sections.setdefault(other, []) if other is not None else None
+            if current is not None:
+                current.append(line.strip())
+        elif field is not None:
+            current = sections.setdefault(field, [])
+            if inline:
+                current.append(inline)
+        elif current is not None and line.strip():
+            current.append(line.strip())
+    return sections
+
+
+def _too_long(line, max_words=MAX_ENTRY_WORDS):
+    return len(line.split()) > max_words
+
+
+def _is_degree(line):
+    return bool(_DEGREE.search(line) or _DEGREE_ABBREVIATION.search(line))
+
+
+def extract_education(lines):
+    """One Education entry per degree, with its institution and dates; ``None`` unless every line fits."""
+    lines = [_clean(line) for line in lines if _clean(line)]
+    if not lines or any(_too_long(line) for line in lines):
+        return None
+    # Either every entry starts with the degree or every entry starts with the institution
+    degree_first = _is_degree(lines[0])
+    entries = []
+    for line in lines:
+        degree = _is_degree(line)
+        if degree_first:
+            starts_entry = degree
+        else:
+            # An institution line opens the next entry once the current one has its degree
+            starts_entry = bool(_INSTITUTION.search(line)) and (
+                not entries or any(_is_degree(existing) for existing in entries[-1])
+            )
+        if starts_entry:
+            entries.append([line])
+        elif entries and (degree or _INSTITUTION.search(line) or _YEAR.search(line) or DATE_RANGE.search(line)):
+            entries[-1].append(line)
+        else:
+            return None
+    if any(len(entry) > MAX_EDUCATION_LINES or not any(_is_degree(line) for line in entry) for entry in entries):
+        return None
+    # Degree, institution, then dates, as in "Bachelor of Science in Computer Science, Arizona State University, 2015"
+    return [
+        {"degree": ", ".join(sorted(entry, key=lambda line: 0 if _is_degree(line) else 1 if _INSTITUTION.search(line) else 2))}
+        for entry in entries
+    ]
+
+
+def extract_certifications(lines):
+    lines = [_clean(line) for line in lines if _clean(line)]
+    if not lines or any(_too_long(line, MAX_CERTIFICATION_WORDS) for line in lines):
+        return None
+    return [{"certification": line} for line in lines]
+
+
+def extract_credits(lines, matcher):
+    """Skill groups as the resume labels them ("Languages: Python, SQL"), or by taxonomy category.
+
+    ``None`` when too few of the listed items are known skills, since the
+    section is then probably prose or something other than a skills list.
+    """
+    groups, unlabelled = [], []
+    items_seen = recognized = 0
+    for line in lines:
+        line = _clean(line)
+        label, colon, rest = line.partition(":")
+        labelled = bool(colon) and rest.strip() and len(label.split()) <= 5
+        items = [_clean(item) for item in _ITEM_SEPARATORS.split(rest if labelled else line) if _clean(item)]
+        if any(_too_long(item, MAX_SKILL_WORDS) for item in items):
+            return None
+        matched = [bool(matcher.find(item)) for item in items]
+        items_seen += len(items)
+        recognized += sum(matched)
+        if labelled:
+            groups.append({"category": label.strip(), "items": items})
+        else:
+            unlabelled += [(item, matcher.find(item)) for item in items]
+    if items_seen < 2 or recognized / items_seen < MIN_RECOGNIZED_SKILLS:
+        return None
+
+    by_category = {}
+    for item, matches in unlabelled:
+        category = matches[0][2][1] if matches else "Other"
+        by_category.setdefault(category, []).append(item)
+    groups += [{"category": category, "items": items} for category, items in by_category.items()]
+    return groups
+
+
+class LocalExtractor:
+    """Fills plainly listed ResumeSchema sections from the converted text, without the LLM.
+
+    Only ``sections`` are attempted, and each only when its content fits the
+    expected shape exactly (a list of degrees, certifications or skills);
+    anything less certain is left to the model.
+    """
+
+    EXTRACTORS = {
+        "education": lambda extractor, lines: extract_education(lines),
+        "certifications": lambda extractor, lines: extract_certifications(lines),
+        "credits": lambda extractor, lines: extract_credits(lines, extractor.skill_matcher),
+    }
+
+    def __init__(self, sections=("education", "certifications", "credits"), enabled=True):
+        unknown = set(sections) - set(self.EXTRACTORS)
+        if unknown:
+            raise ValueError(f"No local extractor for sections: {', '.join(sorted(unknown))}")
+        self.sections = tuple(sections)
+        self.enabled = enabled and bool(self.sections)
+        self._skill_matcher = None
+        self._taxonomy_hash = None
+        self._counters = {section: {"filled": 0, "left_to_model": 0} for section in self.sections}
+        self._documents = 0
+
+    @property
+    def skill_matcher(self):
+        if self._skill_matcher is None:
+            self._skill_matcher, self._taxonomy_hash = load_skill_matcher()
+        return self._skill_matcher
+
+    @property
+    def version(self):
+        """Identifies the rules, taxonomy and sections in cache keys; empty when local extraction is off."""
+        if not self.enabled:
+            return ""
+        self.skill_matcher
+        return f"local-{RULES_VERSION}-{','.join(self.sections)}-{self._taxonomy_hash[:12]}"
+
+    def extract(self, text):
+        """``{field: value}`` for every section confidently extracted from ``text``; values are ResumeSchema-shaped."""
+        if not self.enabled or not text:
+            return {}
+        self._documents += 1
+        found = split_sections(text)
+        extracted = {}
+        for section in self.sections:
+            value = self.EXTRACTORS[section](self, found[section]) if found.get(section) else None
+            if value:
+                extracted[section] = value
+                self._counters[section]["filled"] += 1
+            else:
+                self._counters[section]["left_to_model"] += 1
+        return extracted
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "documents": self._documents,
+            "sections": {
+                section: {
+                    **counts,
+                    "fill_rate": round(counts["filled"] / self._documents, 3) if self._documents else 0.0,
+                }
+                for section, counts in self._counters.items()
+            },
+        }
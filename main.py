@@ -1,125 +1,1448 @@
+import asyncio
+import io
 import json
 import os
 import pathlib
+import shutil
 import tempfile
+import time
 import logging
+import zipfile
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import List, Optional
 
-from decouple import config
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
-from google import genai
-from google.genai import types
-from markitdown import MarkItDown
+from decouple import Csv, config
+from fastapi import APIRouter, FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
 
+from cache import ExtractionCache, build_cache_key, document_digest
+from completeness import incomplete_sections
+from context_cache import ContextCache
+from export import EXPORT_FORMATS, TABLES, iter_ndjson, write_tables
+import converters
+from converters import docx_to_text_markitdown, pdf_to_text
+from jobs import JobQueue, QueueFullError
+from json_repair import loads_with_repair, validate_partial
+from lazy_imports import LazyModule
+from local_extraction import LocalExtractor
+from model_cascade import ModelCascade
+from metrics import JSON_POSTPROCESS, LLM_CALLS, LLM_TOKENS, REQUEST_DURATION, REQUESTS, registry
 from prompt_manager import prompt_manager
+from prompt_registry import RESUME_SECTION_SCHEMAS, partial_resume_schema, prompt_registry
+from resume_store import EDUCATION_LEVELS, ResumeStore
+from revisions import RevisionIndex
 from schemas import ResumeSchema
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+from scheduler import LLMScheduler, Priority, current_priority, estimate_tokens
+from singleflight import SingleFlight
+from stream_parser import TopLevelSectionParser
+from timing import server_timing_header, set_file_type, set_outcome, stage, start_request_timing
+from uploads import (
+    MULTIPART_OVERHEAD_BYTES,
+    BodySizeLimitMiddleware,
+    UploadSniffMiddleware,
+    read_upload,
+    set_spool_threshold,
+    verify_format,
+)
 
-app = FastAPI(title="Resume Details Extractor API")
+# The Gemini SDK takes longer to import than the rest of the app together, so it is loaded on first
+# use (normally by the startup warm-up) rather than at import time
+genai = LazyModule("google.genai")
+genai_errors = LazyModule("google.genai.errors")
+types = LazyModule("google.genai.types")
+httpx = LazyModule("httpx")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    converters.start_process_pool(CONVERTER_PROCESSES)
+    await job_queue.start(JOB_WORKERS)
+    # In the background, so the port opens (and health checks pass) while the warm-up runs
+    warm_up_task = asyncio.create_task(warm_up()) if WARMUP_ON_STARTUP else None
+    yield
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    await job_queue.stop()
+    converters.shutdown_process_pool()
+
+
+router = APIRouter()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(module)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Default prompt that enforces the resume details schema
-RESUME_DETAILS_EXTRACTOR = prompt_manager.get_resume_extractor_prompt()
 
-# Formatter prompt for plain JSON structuring
-RESUME_DETAILS_FORMATTER = prompt_manager.get_resume_formatter_prompt()
+class ExtractionMode(str, Enum):
+    SCHEMA = "schema"
+    FORMATTER = "formatter"
+    BOTH = "both"
+    COMBINED = "combined"
+    SHARDED = "sharded"
 
 
 GOOGLE_API_KEY = os.environ.get("GEMINI_API_KEY")
-if not GOOGLE_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set")
-    
-client = genai.Client(api_key=GOOGLE_API_KEY)
 
+# GEMINI_BASE_URL points the client at another endpoint, e.g. the local fake server in benchmarks/
+GEMINI_BASE_URL = config("GEMINI_BASE_URL", default="")
 
-def docx_to_text_markitdown(docx_path):
-    logger.info(f"Converting DOCX file: {docx_path} to text using markitdown")
-    converter = MarkItDown()
-    result = converter.convert(docx_path)
-    logger.info(f"DOCX conversion to text completed.")
-    return result.text_content
+# Built by get_client() on first use; benchmarks assign a fake client here directly
+client = None
 
 
-@app.post("/extract_resume_details/")
-async def extract_resume_details(file: UploadFile = File(...)):
-    logger.info(f"Received request to extract resume details for file: {file.filename}")
+def get_client():
+    global client
+    if client is None:
+        if not GOOGLE_API_KEY:
+            raise ValueError("GEMINI_API_KEY environment variable not set")
+        client = genai.Client(
+            api_key=GOOGLE_API_KEY,
+            http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None,
+        )
+    return client
+
+
+def compiled_prompt(name, omit=frozenset()):
+    """The prompt Part and generation config for ``name``, compiled on first use and shared afterwards.
+
+    ``omit`` names sections filled without the model, which the call leaves out.
+    """
+    if omit:
+        return prompt_registry.compile_without(get_client(), name, omit)
+    return prompt_registry.compile(get_client())[name]
+
+
+# Model tiers, cheapest first: every extraction starts on the first and moves on only when its output
+# fails the checks. A single model turns the cascade off.
+GEMINI_MODELS = config("GEMINI_MODELS", default="gemini-1.5-flash-8b,gemini-1.5-flash", cast=Csv())
+
+# Looked up when called: is_transient_error is defined further down with the rest of the LLM error handling
+model_cascade = ModelCascade(GEMINI_MODELS, is_transient=lambda exc: is_transient_error(exc))
+
+# Each ResumeSchema field and the shard that can re-extract it on its own
+RESUME_FIELD_SHARDS = {
+    field: section for section, schema_model in RESUME_SECTION_SCHEMAS.items() for field in schema_model.model_fields
+}
+
+# Schema output with more invalid sections than this is failed rather than patched up section by section
+SCHEMA_REASK_MAX_SECTIONS = config("SCHEMA_REASK_MAX_SECTIONS", default=3, cast=int)
+
+# Plainly listed sections are filled from the converted text without the LLM, and left out of its calls
+local_extractor = LocalExtractor(
+    sections=config("LOCAL_EXTRACTION_SECTIONS", default="education,certifications,credits", cast=Csv()),
+    enabled=config("LOCAL_EXTRACTION", default=True, cast=bool),
+)
+
+DEFAULT_EXTRACTION_MODE = config("EXTRACTION_MODE", default=ExtractionMode.BOTH.value, cast=ExtractionMode)
+
+extraction_cache = ExtractionCache(
+    db_path=config("EXTRACTION_CACHE_PATH", default="extraction_cache.sqlite3"),
+    max_entries=config("EXTRACTION_CACHE_MAX_ENTRIES", default=256, cast=int),
+    ttl_seconds=config("EXTRACTION_CACHE_TTL_SECONDS", default=3600, cast=int),
+    disk_ttl_seconds=config("EXTRACTION_CACHE_DISK_TTL_SECONDS", default=7 * 24 * 3600, cast=int),
+)
+
+# Revised uploads of an already extracted resume only send their changed sections to the model
+revision_index = RevisionIndex(
+    db_path=config("REVISION_INDEX_PATH", default="revision_index.sqlite3"),
+    min_similarity=config("REVISION_MIN_SIMILARITY", default=0.7, cast=float),
+    ttl_seconds=config("REVISION_TTL_SECONDS", default=7 * 24 * 3600, cast=int),
+    enabled=config("REVISION_REUSE", default=True, cast=bool),
+)
+
+# Every extracted resume is kept and searchable (skills, keywords, roles, clients, education) without the LLM
+resume_store = ResumeStore(
+    db_path=config("RESUME_STORE_PATH", default="resume_store.sqlite3"),
+    get_skill_matcher=lambda: local_extractor.skill_matcher,
+    enabled=config("RESUME_STORE_ENABLED", default=True, cast=bool),
+)
+
+# Resumes flattened and written per chunk by /resumes/export; memory grows with this, not with the store
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=1000, cast=int)
+
+LLM_OUTPUT_TOKEN_ESTIMATE = config("LLM_OUTPUT_TOKEN_ESTIMATE", default=2048, cast=int)
+
+# Concurrent identical uploads share one in-flight extraction
+extraction_flights = SingleFlight()
+
+BATCH_DEFAULT_CONCURRENCY = config("BATCH_DEFAULT_CONCURRENCY", default=4, cast=int)
+BATCH_MAX_CONCURRENCY = config("BATCH_MAX_CONCURRENCY", default=16, cast=int)
+MAX_UPLOAD_BYTES = config("MAX_UPLOAD_BYTES", default=20 * 1024 * 1024, cast=int)
+BATCH_MAX_UPLOAD_BYTES = config("BATCH_MAX_UPLOAD_BYTES", default=200 * 1024 * 1024, cast=int)
+BATCH_MAX_ENTRY_BYTES = config("BATCH_MAX_ENTRY_BYTES", default=MAX_UPLOAD_BYTES, cast=int)
+
+# Uploads above this size are parsed straight into a temporary file rather than held in memory
+set_spool_threshold(config("UPLOAD_SPOOL_THRESHOLD_BYTES", default=1024 * 1024, cast=int))
+
+def request_outcome(status_code):
+    if status_code < 400:
+        return "success"
+    if status_code == 429:
+        return "rate_limited"
+    if status_code == 504:
+        return "timeout"
+    return "client_error" if status_code < 500 else "server_error"
+
+
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    timing = start_request_timing()
+
+    def observe(status_code):
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", "unmatched")
+        outcome = timing.outcome or request_outcome(status_code)
+        REQUESTS.inc(endpoint=endpoint, file_type=timing.file_type, outcome=outcome)
+        REQUEST_DURATION.observe(
+            time.perf_counter() - start, endpoint=endpoint, file_type=timing.file_type, outcome=outcome
+        )
+
     try:
-        file_extension = pathlib.Path(file.filename).suffix.lower()
+        response = await call_next(request)
+    except Exception:
+        observe(500)
+        raise
+    if request.url.path == "/metrics":
+        return response
+
+    # For streamed endpoints this only covers the stages that ran before the first byte
+    if timing.stages:
+        response.headers["Server-Timing"] = server_timing_header(timing.stages)
+
+    # The request is only finished once the last chunk of the (possibly streamed) body is sent
+    body_iterator = response.body_iterator
+
+    async def observe_when_sent():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            observe(response.status_code)
 
-        if file_extension == ".pdf":
-            file_bytes = await file.read()
-            resume_part = types.Part.from_bytes(
-                data=file_bytes, mime_type="application/pdf"
+    response.body_iterator = observe_when_sent()
+    return response
+
+
+JOB_WORKERS = config("JOB_WORKERS", default=2, cast=int)
+
+PDF_TEXT_EXTRACTION = config("PDF_TEXT_EXTRACTION", default=True, cast=bool)
+PDF_MIN_CHARS_PER_PAGE = config("PDF_MIN_CHARS_PER_PAGE", default=200, cast=int)
+
+# Raw PDFs above this go through the Files API once instead of inline in every call
+LLM_INLINE_MAX_BYTES = config("LLM_INLINE_MAX_BYTES", default=4 * 1024 * 1024, cast=int)
+
+# 0 runs conversions on the thread pool instead of separate processes
+CONVERTER_PROCESSES = config("CONVERTER_PROCESSES", default=min(4, os.cpu_count() or 1), cast=int)
+
+WARMUP_ON_STARTUP = config("WARMUP_ON_STARTUP", default=True, cast=bool)
+
+# Prompts kept on the Gemini side as cached content and referenced by name instead of resent per call
+CONTEXT_CACHE_ENABLED = config("CONTEXT_CACHE_ENABLED", default=True, cast=bool)
+CONTEXT_CACHE_PROMPTS = config("CONTEXT_CACHE_PROMPTS", default="schema,formatter,combined", cast=Csv())
+CONTEXT_CACHE_TTL_SECONDS = config("CONTEXT_CACHE_TTL_SECONDS", default=3600, cast=int)
+CONTEXT_CACHE_RENEW_SECONDS = config("CONTEXT_CACHE_RENEW_SECONDS", default=900, cast=int)
+CONTEXT_CACHE_RETRY_SECONDS = config("CONTEXT_CACHE_RETRY_SECONDS", default=300, cast=int)
+# Gemini refuses cached content smaller than this; 32768 tokens on the gemini-1.5 models
+CONTEXT_CACHE_MIN_TOKENS = config("CONTEXT_CACHE_MIN_TOKENS", default=32768, cast=int)
+
+
+def is_transient_error(exc):
+    """Errors worth retrying later: timeouts, dropped connections, rate limits, 5xx and an open circuit."""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError, httpx.TransportError, CircuitOpenError)):
+        return True
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in (408, 429, 500, 502, 503, 504)
+    return False
+
+
+def is_retryable_llm_error(exc):
+    # An open circuit must fail fast, not be retried in-process; queued jobs still retry it later
+    return is_transient_error(exc) and not isinstance(exc, CircuitOpenError)
+
+
+def llm_error_to_http(exc):
+    """Surface Gemini quota and availability errors (after retries) instead of an opaque 500."""
+    if exc.code == 429:
+        return HTTPException(
+            status_code=429,
+            detail="The language model is rate limited; please retry shortly.",
+            headers={"Retry-After": "30"},
+        )
+    if exc.code in (500, 502, 503, 504):
+        return HTTPException(status_code=503, detail=f"The language model is unavailable: {exc.message}")
+    return HTTPException(status_code=500, detail=f"Internal Server Error: {exc}")
+
+
+def decode_json_text(text, label):
+    """Decode model output, repairing common LLM JSON defects locally before giving up with an error blob."""
+    output = label.split()[0].lower()
+    try:
+        with stage("json_decode"):
+            structured, repaired = loads_with_repair(text)
+    except ValueError as e:
+        JSON_POSTPROCESS.inc(output=output, path="failed")
+        logger.error(f"{label} response JSON decoding error: {e}")
+        return {
+            "error": f"{label} response decoding failed: {e}",
+            "raw": text,
+        }
+    if repaired:
+        JSON_POSTPROCESS.inc(output=output, path="repaired")
+        logger.warning(f"{label} response JSON was malformed and has been repaired locally.")
+    else:
+        JSON_POSTPROCESS.inc(output=output, path="valid")
+        logger.debug(f"{label} response JSON decoded successfully.")
+    return structured
+
+
+def decode_json_response(response, label):
+    return decode_json_text(response.text, label)
+
+
+llm_scheduler = LLMScheduler(
+    requests_per_minute=config("LLM_REQUESTS_PER_MINUTE", default=1000, cast=int),
+    tokens_per_minute=config("LLM_TOKENS_PER_MINUTE", default=4_000_000, cast=int),
+    max_concurrency=config("LLM_MAX_CONCURRENCY", default=16, cast=int),
+    max_retries=config("LLM_MAX_RETRIES", default=4, cast=int),
+    base_backoff_seconds=config("LLM_BASE_BACKOFF_SECONDS", default=1.0, cast=float),
+    max_backoff_seconds=config("LLM_MAX_BACKOFF_SECONDS", default=30.0, cast=float),
+    is_retryable=is_retryable_llm_error,
+)
+
+llm_resilience = ResilientCaller(
+    breaker=CircuitBreaker(
+        failure_threshold=config("LLM_CIRCUIT_FAILURE_THRESHOLD", default=5, cast=int),
+        reset_timeout=config("LLM_CIRCUIT_RESET_SECONDS", default=30.0, cast=float),
+    ),
+    deadline_seconds=config("LLM_CALL_DEADLINE_SECONDS", default=90.0, cast=float),
+    hedge_percentile=config("LLM_HEDGE_PERCENTILE", default=0.95, cast=float),
+    hedge_min_delay=config("LLM_HEDGE_MIN_DELAY_SECONDS", default=2.0, cast=float),
+    hedging_enabled=config("LLM_HEDGING", default=True, cast=bool),
+    is_failure=is_retryable_llm_error,
+)
+
+context_cache = ContextCache(
+    get_client=get_client,
+    prompt_names=CONTEXT_CACHE_PROMPTS,
+    is_transient=is_transient_error,
+    ttl_seconds=CONTEXT_CACHE_TTL_SECONDS,
+    renew_seconds=CONTEXT_CACHE_RENEW_SECONDS,
+    retry_seconds=CONTEXT_CACHE_RETRY_SECONDS,
+    enabled=CONTEXT_CACHE_ENABLED,
+    min_tokens=CONTEXT_CACHE_MIN_TOKENS,
+    count_tokens=lambda part: estimate_tokens([part]),
+)
+
+
+def record_llm_usage(call, response, model):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for token_type, count in (
+        ("prompt", usage.prompt_token_count),
+        # The part of the prompt served from a context cache, billed at the reduced rate
+        ("cached", usage.cached_content_token_count),
+        ("output", usage.candidates_token_count),
+        ("total", usage.total_token_count),
+    ):
+        if count:
+            LLM_TOKENS.inc(count, call=call, type=token_type, model=model)
+
+
+async def llm_generate(contents, generation_config, call):
+    """Every non-streaming Gemini call goes through the scheduler's rate limits, priority and retries,
+    and each attempt gets a deadline, a hedged duplicate past the latency percentile and the circuit breaker.
+    The hedged duplicate waits for a scheduler slot of its own, so it counts against the concurrency and rate limits."""
+    model = model_cascade.current()
+    estimated_tokens = estimate_tokens(contents) + LLM_OUTPUT_TOKEN_ESTIMATE
+
+    def generate():
+        return get_client().aio.models.generate_content(model=model, contents=contents, config=generation_config)
+
+    try:
+        with stage(f"llm_{call}"):
+            response = await llm_scheduler.submit(
+                lambda: llm_resilience.call(
+                    generate,
+                    key=f"{call}/{model}",
+                    hedge_factory=lambda: llm_scheduler.run_once(generate, estimated_tokens),
+                ),
+                estimated_tokens,
             )
-            logger.debug(f"File type detected: PDF")
-        elif file_extension == ".docx":
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp_file:
-                tmp_file.write(await file.read())
-                logger.debug(f"Saving uploaded DOCX to temporary file: {tmp_file.name}")
-                docx_path = tmp_file.name
-            resume_text = docx_to_text_markitdown(docx_path)
-            resume_part = types.Part.from_text(text=resume_text)
-            os.unlink(docx_path)
+    except Exception:
+        LLM_CALLS.inc(call=call, outcome="error", model=model)
+        raise
+    LLM_CALLS.inc(call=call, outcome="success", model=model)
+    record_llm_usage(call, response, model)
+    return response
+
+
+async def generate_prompt_json(resume_part, name, omit=frozenset()):
+    prompt = compiled_prompt(name, omit)
+    notes = [prompt.note] if prompt.note is not None else []
+    model = model_cascade.current()
+    cache_name = context_cache.lookup(model, name, prompt.part, prompt_registry.version)
+    if cache_name is not None:
+        try:
+            # The prompt is already on the server as the cached prefix; only the resume is sent after it
+            return await llm_generate([resume_part, *notes], {**prompt.config, "cached_content": cache_name}, name)
+        except genai_errors.APIError as e:
+            if not context_cache.is_cache_error(e):
+                raise
+            context_cache.invalidate(model, name, prompt_registry.version, cache_name)
+            logger.warning(f"Context cache {cache_name} is gone; sending the {name} prompt inline: {e}")
+    # Prompt first, as the cached path sees it
+    return await llm_generate([prompt.part, resume_part, *notes], prompt.config, name)
+
+
+async def _prepend_chunk(first, stream):
+    if first is not None:
+        yield first
+    async for chunk in stream:
+        yield chunk
+
+
+async def open_schema_stream(resume_part, model, omit=frozenset()):
+    """Start the streamed schema call, against the cached prompt when there is one.
+
+    A cache that has disappeared fails before the first chunk, so the call can
+    still be restarted with the prompt inline.
+    """
+    prompt = compiled_prompt("schema", omit)
+    notes = [prompt.note] if prompt.note is not None else []
+    cache_name = context_cache.lookup(model, "schema", prompt.part, prompt_registry.version)
+    if cache_name is not None:
+        stream = await get_client().aio.models.generate_content_stream(
+            model=model, contents=[resume_part, *notes], config={**prompt.config, "cached_content": cache_name}
+        )
+        try:
+            first = await anext(stream, None)
+        except genai_errors.APIError as e:
+            if not context_cache.is_cache_error(e):
+                raise
+            context_cache.invalidate(model, "schema", prompt_registry.version, cache_name)
+            logger.warning(f"Context cache {cache_name} is gone; sending the schema prompt inline: {e}")
         else:
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported file format. Please upload a PDF or DOCX file.",
-            )
+            return _prepend_chunk(first, stream)
+    return await get_client().aio.models.generate_content_stream(
+        model=model, contents=[prompt.part, resume_part, *notes], config=prompt.config
+    )
+
+
+def generate_schema_json(resume_part, omit=frozenset()):
+    # Approach 1: Schema-Enforced structured JSON
+    return generate_prompt_json(resume_part, "schema", omit)
+
+
+def generate_formatter_json(resume_part, omit=frozenset()):
+    # Approach 2: Formatter-Based structured JSON (plain formatting)
+    return generate_prompt_json(resume_part, "formatter", omit)
+
+
+def generate_combined_json(resume_part, omit=frozenset()):
+    # Both representations from a single call, sharing one copy of the resume input
+    return generate_prompt_json(resume_part, "combined", omit)
+
+
+def generate_section_json(resume_part, section):
+    # Targeted prompt and sub-schema for one section of the sharded mode
+    return generate_prompt_json(resume_part, section)
+
+
+async def extract_sharded(resume_part, sections=None):
+    """Extract each ResumeSchema section with its own small call, in parallel, and merge the results."""
+    sections = sections or list(RESUME_SECTION_SCHEMAS)
+    responses = await asyncio.gather(*(generate_section_json(resume_part, section) for section in sections))
+    logger.debug(f"Section responses generated for: {', '.join(sections)}")
+
+    merged, errors = {}, []
+    for section, response in zip(sections, responses):
+        decoded = decode_json_response(response, f"Section {section}")
+        if "error" in decoded:
+            errors.append(decoded["error"])
+            continue
+        try:
+            merged.update(RESUME_SECTION_SCHEMAS[section].model_validate(decoded).model_dump(mode="json"))
+        except ValidationError as e:
+            logger.error(f"Section {section} response failed validation: {e}")
+            errors.append(f"Section {section} response validation failed: {e}")
+    if errors:
+        return {"error": "; ".join(errors), "raw": merged}
+    if set(sections) != set(RESUME_SECTION_SCHEMAS):
+        return merged
+    # Every section is present, so this only restores the ResumeSchema field order
+    return ResumeSchema.model_validate(merged).model_dump(mode="json")
+
+
+def merge_prefilled(structured, prefilled):
+    """Add the sections filled without the model to a validated extraction, in ResumeSchema field order."""
+    if not prefilled or "error" in structured:
+        return structured
+    return {
+        field: prefilled[field] if field in prefilled else structured[field] for field in ResumeSchema.model_fields
+    }
+
+
+async def finalize_resume(resume_part, output, prefilled=None):
+    """Turn schema output (raw text, or an already decoded value) into a validated ResumeSchema dict.
+
+    Malformed JSON is repaired locally; sections that are still invalid are
+    re-extracted on their own rather than re-running the whole resume.
+    ``prefilled`` holds the sections filled without the model, which the
+    output leaves out.
+    """
+    prefilled = prefilled or {}
+    repaired = False
+    if isinstance(output, str):
+        schema_model = partial_resume_schema(frozenset(prefilled)) if prefilled else ResumeSchema
+        with stage("json_decode"):
+            try:
+                # Parses and validates in one pass with pydantic-core's JSON parser
+                validated = schema_model.model_validate_json(output).model_dump(mode="json")
+            except ValidationError:
+                validated = None
+        if validated is not None:
+            JSON_POSTPROCESS.inc(output="schema", path="valid")
+            return merge_prefilled(validated, prefilled)
+        try:
+            structured, repaired = loads_with_repair(output)
+        except ValueError as e:
+            logger.error(f"Schema response JSON could not be repaired: {e}")
+            structured = {}
+    else:
+        structured = output
+    if prefilled and isinstance(structured, dict):
+        structured = {**structured, **prefilled}
+
+    validated, valid_data, failed_fields = validate_partial(ResumeSchema, structured)
+    if validated is not None:
+        # Valid JSON that only needed omitted fields filled as null was not repaired
+        JSON_POSTPROCESS.inc(output="schema", path="repaired" if repaired else "valid")
+        return validated
+
+    sections = sorted({RESUME_FIELD_SHARDS[field] for field in failed_fields})
+    if len(sections) > SCHEMA_REASK_MAX_SECTIONS:
+        JSON_POSTPROCESS.inc(output="schema", path="failed")
+        logger.error(f"Schema response is invalid in {len(sections)} sections; not re-asking for each of them.")
+        return {"error": f"Schema response is invalid in sections: {', '.join(sections)}", "raw": output}
+
+    logger.warning(f"Re-asking the model for invalid schema sections: {', '.join(sections)}")
+    reasked = await extract_sharded(resume_part, sections=sections)
+    if "error" in reasked:
+        JSON_POSTPROCESS.inc(output="schema", path="failed")
+        return {"error": reasked["error"], "raw": output}
+    JSON_POSTPROCESS.inc(output="schema", path="reasked")
+    return ResumeSchema.model_validate({**valid_data, **reasked}).model_dump(mode="json")
+
+
+def schema_problems(schema_structured, source_text):
+    """Why a schema extraction should go to a stronger model; empty when it is good enough to keep."""
+    if "error" in schema_structured:
+        return ["invalid"]
+    return [f"missing_{section}" for section in incomplete_sections(schema_structured, source_text)]
+
+
+def formatter_problems(formatter_structured):
+    if "error" in formatter_structured:
+        return ["invalid"]
+    return [] if formatter_structured else ["empty"]
 
-        # Approach 1: Schema-Enforced structured JSON
-        schema_response = client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=[resume_part, RESUME_DETAILS_EXTRACTOR],
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": ResumeSchema,
-            },
+
+def with_prefilled_sections(formatter_structured, prefilled):
+    """The formatter output with the sections filled without the model, which it was told to leave out."""
+    if not prefilled or "error" in formatter_structured or not isinstance(formatter_structured, dict):
+        return formatter_structured
+    return {
+        **formatter_structured,
+        **{key: value for key, value in prefilled.items() if key not in formatter_structured},
+    }
+
+
+async def extract_schema(resume_part, prefilled=None):
+    prefilled = prefilled or {}
+    if prefilled.keys() >= ResumeSchema.model_fields.keys():
+        # Every section is known already, e.g. a revision that only changed the contact details
+        return merge_prefilled({}, prefilled)
+    response = await generate_schema_json(resume_part, frozenset(prefilled))
+    return await finalize_resume(resume_part, response.text, prefilled)
+
+
+async def extract_formatter(resume_part, prefilled=None):
+    response = await generate_formatter_json(resume_part, frozenset(prefilled or ()))
+    return with_prefilled_sections(decode_json_response(response, "Formatter"), prefilled)
+
+
+async def extract_combined(resume_part, schema_prefilled=None, formatter_prefilled=None):
+    # One call writes both representations, so it can only leave out what both already have
+    omit = frozenset(schema_prefilled or ()) & frozenset(formatter_prefilled or ())
+    combined = decode_json_response(await generate_combined_json(resume_part, omit), "Combined")
+    logger.debug(f"Combined JSON response generated.")
+    if "error" in combined:
+        return combined, combined
+    schema_structured = await finalize_resume(resume_part, combined.get("schema_structured", {}), schema_prefilled)
+    return schema_structured, with_prefilled_sections(combined.get("formatter_structured", {}), formatter_prefilled)
+
+
+async def skip_representation(prefilled=None):
+    """A representation that needs no call: not asked for, or complete without the model."""
+    return prefilled or {}
+
+
+def prefilled_sections(source_text, reused=None):
+    """The sections each representation gets without the model.
+
+    They are filled by the local extractor, or carried over unchanged from an
+    earlier revision of the same resume (``reused``, see ``RevisionIndex.reusable``).
+    Returns the schema and formatter dicts, and whether the formatter output
+    is complete without a call.
+    """
+    with stage("local_extract"):
+        local = local_extractor.extract(source_text)
+    if reused is None:
+        return local, local, False
+    formatter_complete = set(reused["changed"]["formatter_structured"]) <= local.keys()
+    return (
+        {**reused["schema_structured"], **local},
+        {**reused["formatter_structured"], **local},
+        formatter_complete,
+    )
+
+
+async def extract_from_part(resume_part, mode=ExtractionMode.BOTH, reused=None):
+    """Run the LLM calls ``mode`` needs concurrently; a skipped representation comes back as ``{}``.
+
+    Each representation starts on the cheapest model tier and is escalated on
+    its own when it fails its checks, so a bad schema output does not redo a
+    good formatter one. Sections filled without the model (see
+    ``prefilled_sections``) are left out of every call.
+    """
+    source_text = resume_part.text
+    schema_prefilled, formatter_prefilled, formatter_complete = prefilled_sections(source_text, reused)
+
+    def check_schema(schema_structured):
+        return schema_problems(schema_structured, source_text)
+
+    if mode == ExtractionMode.COMBINED:
+        return await model_cascade.run(
+            "combined",
+            lambda: extract_combined(resume_part, schema_prefilled, formatter_prefilled),
+            lambda result: [f"schema_{problem}" for problem in check_schema(result[0])]
+            + [f"formatter_{problem}" for problem in formatter_problems(result[1])],
         )
-        logger.debug(f"Schema-enforced JSON response generated.")
 
-        # Approach 2: Formatter-Based structured JSON (plain formatting)
-        formatter_response = client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=[resume_part, RESUME_DETAILS_FORMATTER],
-            config={"response_mime_type": "application/json"},
+    if mode == ExtractionMode.SHARDED:
+        sections = [
+            section for section, schema_model in RESUME_SECTION_SCHEMAS.items()
+            if not set(schema_model.model_fields) <= set(schema_prefilled)
+        ]
+
+        async def extract_remaining_shards():
+            if not sections:
+                return merge_prefilled({}, schema_prefilled)
+            return merge_prefilled(await extract_sharded(resume_part, sections), schema_prefilled)
+
+        return await model_cascade.run("sharded", extract_remaining_shards, check_schema), {}
+
+    schema_call = (
+        model_cascade.run("schema", lambda: extract_schema(resume_part, schema_prefilled), check_schema)
+        if mode in (ExtractionMode.SCHEMA, ExtractionMode.BOTH)
+        else skip_representation()
+    )
+    if mode not in (ExtractionMode.FORMATTER, ExtractionMode.BOTH):
+        formatter_call = skip_representation()
+    elif formatter_complete:
+        formatter_call = skip_representation(formatter_prefilled)
+    else:
+        formatter_call = model_cascade.run(
+            "formatter", lambda: extract_formatter(resume_part, formatter_prefilled), formatter_problems
         )
+    schema_structured, formatter_structured = await asyncio.gather(schema_call, formatter_call)
+    logger.debug(f"JSON responses generated for extraction mode: {mode.value}")
+    return schema_structured, formatter_structured
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+
+def raise_unsupported_format():
+    raise HTTPException(
+        status_code=400,
+        detail="Unsupported file format. Please upload a PDF or DOCX file.",
+    )
+
 
-        logger.debug(f"Formatter-based JSON response generated.")
+def ensure_supported_format(filename):
+    # Checked before the cache lookup so a cached result is never served for an unsupported upload
+    if pathlib.Path(filename).suffix.lower() not in SUPPORTED_EXTENSIONS:
+        raise_unsupported_format()
+
+
+async def read_resume_upload(file):
+    """Reject unsupported, mislabelled or oversized uploads from their size and first bytes, then read them once."""
+    ensure_supported_format(file.filename)
+    with stage("upload_read"):
+        return await run_in_threadpool(read_upload, file, pathlib.Path(file.filename).suffix.lower(), MAX_UPLOAD_BYTES)
+
+
+async def upload_resume_file(file_bytes, mime_type):
+    # Inline bytes are base64-encoded and re-serialised by the SDK for every call, several copies each,
+    # while an uploaded file is streamed once in chunks and referenced by URI from every call.
+    with stage("file_upload"):
+        uploaded = await get_client().aio.files.upload(file=io.BytesIO(file_bytes), config={"mime_type": mime_type})
+    logger.info(f"Uploaded {len(file_bytes)} byte {mime_type} file as {uploaded.name}")
+    return types.Part.from_uri(file_uri=uploaded.uri, mime_type=mime_type)
+
+
+async def release_resume_part(resume_part):
+    """Delete the Files API copy of an upload once every call that references it has finished."""
+    if resume_part is None or resume_part.file_data is None:
+        return
+    name = "files/" + resume_part.file_data.file_uri.rsplit("/", 1)[-1]
+    try:
+        await get_client().aio.files.delete(name=name)
+    except Exception as e:
+        # Uploaded files expire on their own after 48 hours
+        logger.warning(f"Could not delete uploaded file {name}: {e}")
+
+
+async def build_resume_part(filename, file_bytes):
+    file_extension = pathlib.Path(filename).suffix.lower()
+
+    if file_extension == ".pdf":
+        logger.debug(f"File type detected: PDF")
+        if PDF_TEXT_EXTRACTION:
+            try:
+                resume_text = await converters.run_conversion(pdf_to_text, file_bytes, PDF_MIN_CHARS_PER_PAGE)
+            except Exception as e:
+                logger.warning(f"Local PDF text extraction failed, sending raw PDF: {e}")
+                resume_text = None
+            if resume_text:
+                return types.Part.from_text(text=resume_text)
+        if len(file_bytes) > LLM_INLINE_MAX_BYTES:
+            return await upload_resume_file(file_bytes, "application/pdf")
+        return types.Part.from_bytes(data=file_bytes, mime_type="application/pdf")
+    elif file_extension == ".docx":
+        logger.debug(f"File type detected: DOCX")
+        resume_text = await converters.run_conversion(docx_to_text_markitdown, file_bytes)
+        return types.Part.from_text(text=resume_text)
+    else:
+        raise_unsupported_format()
+
+
+def revision_context(mode):
+    """Stored revisions are only reused by the prompts, models, mode and local rules that extracted them."""
+    return "/".join((prompt_registry.version, model_cascade.key, mode.value, local_extractor.version))
+
+
+async def find_reusable(resume_part, mode):
+    """The unchanged sections of an earlier revision of this resume, or ``None`` (see ``RevisionIndex.reusable``)."""
+    if not revision_index.enabled or not resume_part.text:
+        return None
+    with stage("revision_lookup"):
+        return await run_in_threadpool(revision_index.reusable, resume_part.text, revision_context(mode))
+
+
+async def remember_revision(resume_part, mode, result):
+    if revision_index.enabled and resume_part.text:
+        await run_in_threadpool(revision_index.add, resume_part.text, revision_context(mode), result)
+
+
+def reused_result(reused):
+    return {"schema_structured": reused["schema_structured"], "formatter_structured": reused["formatter_structured"]}
+
+
+async def save_result(cache_key, document, filename, result):
+    """Cache a successful extraction and keep its ResumeSchema record in the resume store."""
+    await run_in_threadpool(extraction_cache.set, cache_key, result)
+    if resume_store.enabled and result["schema_structured"]:
+        await run_in_threadpool(resume_store.add, document, filename, result["schema_structured"])
+
+
+async def extract_resume(filename, file_bytes, refresh=False, mode=None):
+    """Extract the JSON representations ``mode`` asks for, serving repeats from the cache."""
+    ensure_supported_format(filename)
+    mode = mode or DEFAULT_EXTRACTION_MODE
+    cache_key = build_cache_key(
+        file_bytes, prompt_registry.version, model_cascade.key, mode.value, local_extractor.version
+    )
+
+    if refresh:
+        extraction_cache.record_refresh()
+    else:
+        with stage("cache_lookup"):
+            cached = await run_in_threadpool(extraction_cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"Serving cached extraction for file: {filename}")
+            set_outcome("cache_hit")
+            return cached
+
+    async def run_extraction():
+        with stage("convert"):
+            resume_part = await build_resume_part(filename, file_bytes)
+        try:
+            reused = None if refresh else await find_reusable(resume_part, mode)
+            if reused is not None and reused["unchanged"]:
+                # A new file with the same text as an earlier one (re-exported, say)
+                set_outcome("revision_hit")
+                result = reused_result(reused)
+            else:
+                # Wall time of all the concurrent calls; json_decode is reported separately and nested inside it
+                with stage("llm"):
+                    schema_structured, formatter_structured = await extract_from_part(resume_part, mode, reused)
+                result = {
+                    "schema_structured": schema_structured,
+                    "formatter_structured": formatter_structured,
+                }
+        finally:
+            await release_resume_part(resume_part)
+
+        # Decoding failures are not cached so the next upload gets a fresh attempt
+        if "error" not in result["schema_structured"] and "error" not in result["formatter_structured"]:
+            await save_result(cache_key, document_digest(file_bytes), filename, result)
+            if reused is None or not reused["unchanged"]:
+                await remember_revision(resume_part, mode, result)
+        return result
+
+    return await extraction_flights.do(cache_key, run_extraction)
+
+
+class UndecodedResultError(Exception):
+    """An extraction finished but the model's output for one of its parts could not be decoded."""
+
+
+async def run_extraction_job(job):
+    current_priority.set(Priority.BATCH)
+    start_request_timing()
+    set_file_type(job["filename"])
+    options = job["options"]
+    mode = ExtractionMode(options["mode"]) if options.get("mode") else None
+    result = await extract_resume(job["filename"], job["payload"], refresh=options.get("refresh", False), mode=mode)
+    for part in ("schema_structured", "formatter_structured"):
+        if "error" in result[part]:
+            raise UndecodedResultError(f"{part}: {result[part]['error']}")
+    return result
+
+
+job_queue = JobQueue(
+    db_path=config("JOB_QUEUE_PATH", default="job_queue.sqlite3"),
+    handler=run_extraction_job,
+    # Undecodable output is not cached, so another attempt asks the model again
+    is_transient=lambda exc: is_transient_error(exc) or isinstance(exc, UndecodedResultError),
+    max_depth=config("JOB_QUEUE_MAX_DEPTH", default=100, cast=int),
+    max_attempts=config("JOB_MAX_ATTEMPTS", default=3, cast=int),
+    lease_seconds=config("JOB_LEASE_SECONDS", default=300, cast=int),
+    retry_backoff_seconds=config("JOB_RETRY_BACKOFF_SECONDS", default=5.0, cast=float),
+)
+
+
+@router.post("/extract_resume_details/")
+async def extract_resume_details(
+    file: UploadFile = File(...),
+    refresh: bool = False,
+    mode: Optional[ExtractionMode] = None,
+):
+    logger.info(f"Received request to extract resume details for file: {file.filename}")
+    set_file_type(file.filename)
+    try:
+        file_bytes = await read_resume_upload(file)
+        result = await extract_resume(file.filename, file_bytes, refresh=refresh, mode=mode)
+        logger.info(f"Resume details extraction completed successfully for file: {file.filename}")
+        with stage("serialize"):
+            response = JSONResponse(content=result, status_code=200)
+        return response
+
+    except HTTPException:
+        raise
+    except genai_errors.APIError as e:
+        raise llm_error_to_http(e)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="The language model did not respond in time.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+
+
+def _take_upload(upload):
+    # FastAPI closes form uploads once the endpoint returns, before a streaming
+    # response body is produced, so the batch takes over the already spooled
+    # file and leaves an empty one behind for FastAPI to close.
+    spooled = upload.file
+    upload.file = io.BytesIO()
+    spooled.seek(0)
+    return upload.filename, spooled
+
+
+def _read_batch_file(filename, spooled):
+    size = spooled.seek(0, 2)
+    spooled.seek(0)
+    if size > BATCH_MAX_ENTRY_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {BATCH_MAX_ENTRY_BYTES} byte upload limit.")
+    extension = pathlib.Path(filename).suffix.lower()
+    if extension in SUPPORTED_EXTENSIONS:
+        verify_format(spooled, extension)
+    return spooled.read()
+
+
+def _read_zip_entry(archive, info):
+    with archive.open(info) as entry:
+        data = entry.read()
+    extension = pathlib.Path(info.filename).suffix.lower()
+    if extension in SUPPORTED_EXTENSIONS:
+        verify_format(io.BytesIO(data), extension)
+    return data
+
+
+async def iter_batch_entries(spooled_uploads):
+    """Yield ``(filename, bytes)`` one at a time, reading ZIP members lazily."""
+    for filename, spooled in spooled_uploads:
+        if pathlib.Path(filename).suffix.lower() != ".zip":
+            try:
+                payload = await run_in_threadpool(_read_batch_file, filename, spooled)
+            except HTTPException as e:
+                payload = e
+            yield filename, payload
+            continue
 
         try:
-            schema_structured = json.loads(schema_response.text)
-            logger.debug(f"Schema response JSON decoded successfully.")
-        except json.JSONDecodeError as e:
-            schema_structured = {
-                "error": f"Schema response decoding failed: {e}",
-                "raw": schema_response.text,
-            }
-            logger.error(f"Schema response JSON decoding error: {e}", exc_info=True)
+            archive = zipfile.ZipFile(spooled)
+        except zipfile.BadZipFile as e:
+            yield filename, HTTPException(status_code=400, detail=f"Invalid ZIP archive: {e}")
+            continue
+
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                    continue
+                entry_name = f"{filename}/{info.filename}"
+                if info.file_size > BATCH_MAX_ENTRY_BYTES:
+                    yield entry_name, HTTPException(
+                        status_code=413,
+                        detail=f"Archive entry exceeds {BATCH_MAX_ENTRY_BYTES} bytes.",
+                    )
+                    continue
+                try:
+                    payload = await run_in_threadpool(_read_zip_entry, archive, info)
+                except HTTPException as e:
+                    payload = e
+                yield entry_name, payload
 
+
+async def stream_batch_results(spooled_uploads, concurrency, refresh, mode):
+    """Run extractions with at most ``concurrency`` in flight and yield NDJSON lines as they finish."""
+    pending = asyncio.Queue(maxsize=concurrency)
+    finished = asyncio.Queue()
+
+    async def produce():
         try:
-            formatter_structured = json.loads(formatter_response.text)
-            logger.debug(f"Formatter response JSON decoded successfully.")
-        except json.JSONDecodeError as e:
-            formatter_structured = {
-                "error": f"Formatter response decoding failed: {e}",
-                "raw": formatter_response.text,
-            }
-            logger.error(f"Formatter response JSON decoding error: {e}", exc_info=True)
-
-        return JSONResponse(
-            content={
-                "schema_structured": schema_structured,
-                "formatter_structured": formatter_structured,
-            },
-            status_code=200,
+            async for entry in iter_batch_entries(spooled_uploads):
+                await pending.put(entry)
+        except Exception as e:
+            logger.error(f"Batch input could not be read: {e}", exc_info=True)
+            await finished.put({"filename": None, "error": f"Batch input could not be read: {e}"})
+        finally:
+            for _ in range(concurrency):
+                await pending.put(None)
+
+    async def work():
+        while True:
+            entry = await pending.get()
+            if entry is None:
+                return
+            filename, payload = entry
+            try:
+                if isinstance(payload, Exception):
+                    raise payload
+                result = await extract_resume(filename, payload, refresh=refresh, mode=mode)
+                line = {"filename": filename, **result}
+            except HTTPException as e:
+                line = {"filename": filename, "error": e.detail}
+            except Exception as e:
+                logger.error(f"Batch extraction failed for file: {filename}: {e}", exc_info=True)
+                line = {"filename": filename, "error": f"Internal Server Error: {e}"}
+            await finished.put(line)
+
+    async def run():
+        # Worker tasks inherit this context, so batch LLM calls queue behind interactive uploads
+        current_priority.set(Priority.BATCH)
+        workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+        await asyncio.gather(produce(), *workers)
+        await finished.put(None)
+
+    runner = asyncio.create_task(run())
+    try:
+        while True:
+            line = await finished.get()
+            if line is None:
+                break
+            yield json.dumps(line) + "\n"
+        await runner
+    finally:
+        runner.cancel()
+        for _, spooled in spooled_uploads:
+            spooled.close()
+
+
+@router.post("/extract_resume_details/batch/")
+async def extract_resume_details_batch(
+    files: List[UploadFile] = File(...),
+    concurrency: Optional[int] = None,
+    refresh: bool = False,
+    mode: Optional[ExtractionMode] = None,
+):
+    """Accepts many PDF/DOCX files or ZIP archives and streams one NDJSON line per resume."""
+    concurrency = max(1, min(concurrency or BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    logger.info(f"Received batch extraction request with {len(files)} upload(s), concurrency {concurrency}")
+    spooled_uploads = [_take_upload(upload) for upload in files]
+    return StreamingResponse(
+        stream_batch_results(spooled_uploads, concurrency, refresh, mode),
+        media_type="application/x-ndjson",
+    )
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+async def stream_cached_events(cached, start):
+    for section, value in cached["schema_structured"].items():
+        yield sse_event("section", {"section": section, "data": value, "elapsed_ms": _elapsed_ms(start)})
+    yield sse_event("formatter", {"data": cached["formatter_structured"], "elapsed_ms": _elapsed_ms(start)})
+    yield sse_event("done", {"cached": True, "time_to_first_section_ms": None, "total_ms": _elapsed_ms(start)})
+
+
+async def stream_extraction_events(filename, document, resume_part, cache_key, include_formatter, start, reused=None):
+    """Stream the schema-enforced call, emitting each ResumeSchema section as soon as it is complete.
+
+    Sections filled without the model (see ``prefilled_sections``) are emitted
+    first, before the model is called.
+    """
+    schema_prefilled, formatter_prefilled, formatter_complete = prefilled_sections(resume_part.text, reused)
+    omit = frozenset(schema_prefilled)
+    formatter_task = (
+        asyncio.create_task(
+            skip_representation(formatter_prefilled)
+            if formatter_complete
+            else model_cascade.run(
+                "formatter", lambda: extract_formatter(resume_part, formatter_prefilled), formatter_problems
+            )
+        )
+        if include_formatter
+        else None
+    )
+    formatter_structured = {}
+    formatter_sent = not include_formatter
+    parser = TopLevelSectionParser()
+    raw_chunks = []
+    streamed = {}
+    last_chunk = None
+    time_to_first_section = None
+
+    prompt = compiled_prompt("schema", omit)
+    contents = [prompt.part, resume_part] + ([prompt.note] if prompt.note is not None else [])
+    # The stream runs on the first tier; its output is escalated after the stream if it fails the checks
+    model = model_cascade.models[0]
+    attempt_start = time.perf_counter()
+
+    try:
+        for section, value in schema_prefilled.items():
+            streamed[section] = value
+            if time_to_first_section is None:
+                time_to_first_section = _elapsed_ms(start)
+            yield sse_event("section", {"section": section, "data": value, "elapsed_ms": _elapsed_ms(start)})
+        if omit >= ResumeSchema.model_fields.keys():
+            # Nothing is left for the schema call, e.g. a revision that only changed the contact details
+            schema_structured = merge_prefilled({}, schema_prefilled)
+        else:
+            if llm_resilience.breaker.is_open():
+                raise CircuitOpenError("The language model backend is degraded; failing fast.")
+            # The stream holds one scheduler slot for its whole duration; it is not retried mid-way
+            async with llm_scheduler.slot(estimate_tokens(contents) + LLM_OUTPUT_TOKEN_ESTIMATE):
+                stream = await open_schema_stream(resume_part, model, omit)
+                async for chunk in stream:
+                    text = chunk.text or ""
+                    raw_chunks.append(text)
+                    last_chunk = chunk
+                    try:
+                        sections = parser.feed(text)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"Streamed schema section could not be decoded: {e}", exc_info=True)
+                        sections = []
+                    for section, value in sections:
+                        if section in schema_prefilled:
+                            continue
+                        streamed[section] = value
+                        if time_to_first_section is None:
+                            time_to_first_section = _elapsed_ms(start)
+                            logger.info(f"First section streamed after {time_to_first_section} ms for file: {filename}")
+                        yield sse_event("section", {"section": section, "data": value, "elapsed_ms": _elapsed_ms(start)})
+                    if not formatter_sent and formatter_task.done():
+                        formatter_structured = formatter_task.result()
+                        formatter_sent = True
+                        yield sse_event("formatter", {"data": formatter_structured, "elapsed_ms": _elapsed_ms(start)})
+
+            # Usage metadata is cumulative; the final chunk carries the totals
+            LLM_CALLS.inc(call="schema", outcome="success", model=model)
+            record_llm_usage("schema", last_chunk, model)
+
+            raw_text = "".join(raw_chunks)
+            schema_structured = await finalize_resume(resume_part, raw_text, schema_prefilled)
+            problems = schema_problems(schema_structured, resume_part.text)
+            if model_cascade.review(0, "schema", time.perf_counter() - attempt_start, problems):
+                schema_structured = await model_cascade.run(
+                    "schema",
+                    lambda: extract_schema(resume_part, schema_prefilled),
+                    lambda result: schema_problems(result, resume_part.text),
+                    start=1,
+                )
+        if "error" in schema_structured:
+            yield sse_event("error", schema_structured)
+        else:
+            # Sections that were repaired, re-asked or redone on a stronger model after the stream ended
+            for section, value in schema_structured.items():
+                if streamed.get(section, object()) != value:
+                    yield sse_event("section", {"section": section, "data": value, "elapsed_ms": _elapsed_ms(start)})
+
+        if not formatter_sent:
+            formatter_structured = await formatter_task
+            yield sse_event("formatter", {"data": formatter_structured, "elapsed_ms": _elapsed_ms(start)})
+
+        if include_formatter and "error" not in schema_structured and "error" not in formatter_structured:
+            result = {"schema_structured": schema_structured, "formatter_structured": formatter_structured}
+            await save_result(cache_key, document, filename, result)
+            await remember_revision(resume_part, ExtractionMode.BOTH, result)
+
+        yield sse_event(
+            "done",
+            {"cached": False, "time_to_first_section_ms": time_to_first_section, "total_ms": _elapsed_ms(start)},
+        )
+    except genai_errors.APIError as e:
+        logger.error(f"Streaming extraction failed for file: {filename}: {e}", exc_info=True)
+        LLM_CALLS.inc(call="schema", outcome="error", model=model)
+        yield sse_event("error", {"error": llm_error_to_http(e).detail})
+    except CircuitOpenError as e:
+        yield sse_event("error", {"error": str(e)})
+    except Exception as e:
+        logger.error(f"Streaming extraction failed for file: {filename}: {e}", exc_info=True)
+        yield sse_event("error", {"error": f"Internal Server Error: {e}"})
+    finally:
+        if formatter_task is not None and not formatter_task.done():
+            formatter_task.cancel()
+        await release_resume_part(resume_part)
+
+
+@router.post("/extract_resume_details/stream/")
+async def extract_resume_details_stream(
+    file: UploadFile = File(...),
+    refresh: bool = False,
+    include_formatter: bool = True,
+):
+    """Server-Sent Events variant: ``section`` events per ResumeSchema section, then ``formatter`` and ``done``."""
+    start = time.perf_counter()
+    logger.info(f"Received streaming extraction request for file: {file.filename}")
+    set_file_type(file.filename)
+    file_bytes = await read_resume_upload(file)
+    mode = ExtractionMode.BOTH if include_formatter else ExtractionMode.SCHEMA
+    cache_key = build_cache_key(
+        file_bytes, prompt_registry.version, model_cascade.key, mode.value, local_extractor.version
+    )
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if refresh:
+        extraction_cache.record_refresh()
+    else:
+        with stage("cache_lookup"):
+            cached = await run_in_threadpool(extraction_cache.get, cache_key)
+        if cached is not None:
+            set_outcome("cache_hit")
+            return StreamingResponse(stream_cached_events(cached, start), media_type="text/event-stream", headers=headers)
+
+    with stage("convert"):
+        resume_part = await build_resume_part(file.filename, file_bytes)
+    reused = None if refresh else await find_reusable(resume_part, mode)
+    if reused is not None and reused["unchanged"]:
+        set_outcome("revision_hit")
+        await release_resume_part(resume_part)
+        result = reused_result(reused)
+        await save_result(cache_key, document_digest(file_bytes), file.filename, result)
+        return StreamingResponse(stream_cached_events(result, start), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(
+        stream_extraction_events(
+            file.filename, document_digest(file_bytes), resume_part, cache_key, include_formatter, start, reused
+        ),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
+@router.post("/jobs/", status_code=202)
+async def submit_extraction_job(
+    file: UploadFile = File(...),
+    refresh: bool = False,
+    mode: Optional[ExtractionMode] = None,
+):
+    """Queues an extraction and returns its job ID immediately; poll ``GET /jobs/{job_id}``."""
+    set_file_type(file.filename)
+    file_bytes = await read_resume_upload(file)
+    try:
+        job_id = await run_in_threadpool(
+            job_queue.enqueue,
+            file.filename,
+            file_bytes,
+            {"refresh": refresh, "mode": mode.value if mode else None},
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/{job_id}")
+async def get_extraction_job(job_id: str):
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/prompts/stats")
+async def prompt_stats():
+    """Prompt template version, whether compaction is on, and each prompt's size before and after it."""
+    return {
+        "prompt_version": prompt_manager.version,
+        "compaction": prompt_manager.compaction,
+        "registry_version": prompt_registry.version,
+        "prompts": prompt_manager.token_report(),
+    }
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return extraction_cache.stats()
+
+
+@router.get("/context_cache/stats")
+async def context_cache_stats():
+    """Prompts held as Gemini cached content, when each expires, and the ones the backend refused."""
+    return context_cache.stats()
+
+
+@router.get("/cascade/stats")
+async def cascade_stats():
+    """Per model tier: attempts, how many were accepted or escalated (and why), and mean latency."""
+    return model_cascade.stats()
+
+
+@router.get("/local_extraction/stats")
+async def local_extraction_stats():
+    """How often each section was filled locally rather than left to the model."""
+    return local_extractor.stats()
+
+
+@router.get("/revisions/stats")
+async def revision_stats():
+    """How often an upload was a revision of a stored resume, and how many sections were reused rather than re-extracted."""
+    return await run_in_threadpool(revision_index.stats)
+
+
+@router.get("/resumes/search")
+async def search_resumes(
+    q: Optional[str] = Query(default=None, description="Keywords, all required; a trailing * matches a prefix."),
+    skills: List[str] = Query(default=[], description="Skills from the credits, in any spelling the taxonomy knows."),
+    match: str = Query(default="all", pattern="^(all|any)$", description="Whether every skill or any of them must match."),
+    role: Optional[str] = Query(default=None, description="Phrase in a job or project role."),
+    client: Optional[str] = Query(default=None, description="Phrase in a job's client or company."),
+    education: Optional[str] = Query(default=None, description="Education level."),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+):
+    """Stored resumes matching every given filter, most matched skills first, then by full-text relevance."""
+    if not resume_store.enabled:
+        raise HTTPException(status_code=404, detail="The resume store is disabled.")
+    if education is not None and education not in (*EDUCATION_LEVELS, "other"):
+        raise HTTPException(
+            status_code=400, detail=f"Unknown education level {education!r}; use one of {', '.join(EDUCATION_LEVELS)}, other."
         )
-        logger.info(f"Resume details extraction and JSON response completed successfully for file: {file.filename}")
+    start = time.perf_counter()
+    results = await run_in_threadpool(
+        resume_store.search, q, skills, match == "all", role, client, education, limit, offset
+    )
+    results["took_ms"] = _elapsed_ms(start)
+    return results
 
 
+def build_export_archive(export_format, updated_since):
+    """Zip of one Parquet or Arrow file per table, written chunk by chunk to a temporary directory."""
+    directory = tempfile.mkdtemp(prefix="resume_export_")
+    try:
+        tables = os.path.join(directory, "tables")
+        write_tables(resume_store.iter_records(EXPORT_CHUNK_SIZE, updated_since), tables, export_format, EXPORT_CHUNK_SIZE)
+        archive = os.path.join(directory, f"resumes_{export_format}.zip")
+        # The files are compressed already
+        with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_STORED) as zf:
+            for name in sorted(os.listdir(tables)):
+                zf.write(os.path.join(tables, name), name)
+        shutil.rmtree(tables)
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    return directory, archive
+
+
+@router.get("/resumes/export")
+async def export_resumes(
+    format: str = Query(default="parquet", description=f"One of {', '.join(EXPORT_FORMATS)}."),
+    table: str = Query(default="resumes", description="Table to stream as NDJSON; the file formats hold all of them."),
+    updated_since: Optional[float] = Query(default=None, description="Only records stored at or after this Unix time."),
+):
+    """Stored resumes as normalized tables (see ``export.TABLES``): a zip of Parquet or Arrow files, or one table as NDJSON."""
+    if not resume_store.enabled:
+        raise HTTPException(status_code=404, detail="The resume store is disabled.")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format {format!r}; use one of {', '.join(EXPORT_FORMATS)}.")
+    if table not in TABLES:
+        raise HTTPException(status_code=400, detail=f"Unknown table {table!r}; use one of {', '.join(TABLES)}.")
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_ndjson(resume_store.iter_records(EXPORT_CHUNK_SIZE, updated_since), table, EXPORT_CHUNK_SIZE),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{table}.ndjson"'},
+        )
+    directory, archive = await run_in_threadpool(build_export_archive, format, updated_since)
+    return FileResponse(
+        archive,
+        media_type="application/zip",
+        filename=os.path.basename(archive),
+        background=BackgroundTask(shutil.rmtree, directory, ignore_errors=True),
+    )
+
+
+@router.get("/resumes/stats")
+async def resume_store_stats():
+    return await run_in_threadpool(resume_store.stats)
+
+
+@router.get("/resumes/{resume_id}")
+async def get_resume(resume_id: int):
+    resume = await run_in_threadpool(resume_store.get, resume_id) if resume_store.enabled else None
+    if resume is None:
+        raise HTTPException(status_code=404, detail=f"Resume {resume_id} not found.")
+    return resume
+
+
+@router.get("/scheduler/stats")
+async def scheduler_stats():
+    return llm_scheduler.stats()
+
+
+@router.get("/resilience/stats")
+async def resilience_stats():
+    return llm_resilience.stats()
+
+
+@router.get("/coalescing/stats")
+async def coalescing_stats():
+    return extraction_flights.stats()
+
+
+@router.get("/postprocess/stats")
+async def postprocess_stats():
+    """How often model output was valid as returned, repaired locally, completed by re-asking or failed."""
+    stats = {}
+    for (output, path), count in JSON_POSTPROCESS.snapshot().items():
+        stats.setdefault(output, {"valid": 0, "repaired": 0, "reasked": 0, "failed": 0})[path] = int(count)
+    for counts in stats.values():
+        total = sum(counts.values())
+        counts["saved_ratio"] = round((counts["repaired"] + counts["reasked"]) / total, 3) if total else 0.0
+    return stats
+
+
+async def run_warm_up_step(name, step):
+    try:
+        with stage(name):
+            await step()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+        logger.warning(f"Startup {name} failed: {e}")
+
+
+async def warm_up():
+    """Pay the one-off costs of a cold instance before the first upload does.
+
+    Imports the Gemini SDK and compiles the prompt registry, opens a connection to
+    the Gemini API in the client's pool, registers the static prompts as cached
+    content, and starts the converter processes and builds the skills matcher alongside. A failed step is logged and left to the first request to retry.
+    """
+    start = time.perf_counter()
+
+    async def warm_up_gemini():
+        await run_warm_up_step(
+            "warm_up_prompts", lambda: run_in_threadpool(lambda: prompt_registry.compile(get_client()))
+        )
+        # A metadata lookup costs no tokens; httpx keeps the connection alive for 5 s, which covers
+        # the request that woke a scaled-to-zero instance
+        await run_warm_up_step(
+            "warm_up_connection", lambda: get_client().aio.models.get(model=model_cascade.models[0])
+        )
+        await run_warm_up_step(
+            "warm_up_context_cache",
+            lambda: asyncio.gather(
+                *(
+                    context_cache.prepare(model, name, compiled_prompt(name).part, prompt_registry.version)
+                    for model in model_cascade.models
+                    for name in context_cache.prompt_names
+                )
+            ),
+        )
+
+    async def warm_up_local_extraction():
+        # Builds the skills automaton
+        if local_extractor.enabled:
+            await run_in_threadpool(lambda: local_extractor.skill_matcher)
+
+    await asyncio.gather(
+        run_warm_up_step("warm_up_converters", converters.warm_up_pool),
+        run_warm_up_step("warm_up_local_extraction", warm_up_local_extraction),
+        warm_up_gemini(),
+    )
+    logger.info(f"Startup warm-up finished in {_elapsed_ms(start)} ms")
+
+
+def create_app():
+    app = FastAPI(title="Resume Details Extractor API", lifespan=lifespan)
+    # Oversized bodies are refused from their Content-Length, before the multipart parser reads them.
+    # Registered before the metrics middleware so it runs inside it: rejections are counted, and a 413
+    # raised mid-body reaches the exception handlers instead of the metrics middleware's task group.
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        max_body_bytes=MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+        path_limits={"/extract_resume_details/batch/": BATCH_MAX_UPLOAD_BYTES},
+    )
+    # A mislabelled single-file upload is refused from its first bytes, before the rest is spooled
+    app.add_middleware(
+        UploadSniffMiddleware,
+        paths=("/extract_resume_details/", "/extract_resume_details/stream/", "/jobs/"),
+        extensions=SUPPORTED_EXTENSIONS,
+    )
+    app.middleware("http")(record_request_metrics)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
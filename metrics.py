@@ -0,0 +1,155 @@
+import bisect
+import threading
+
+# Latency buckets in seconds, from fast cache hits up to slow multi-call extractions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        """Current values keyed by label value tuples, for the JSON stats endpoints."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """A minimal Prometheus text-format registry; thread-safe because the thread pool records too."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "resume_http_requests_total",
+    "HTTP requests by endpoint, uploaded file type and outcome.",
+    ("endpoint", "file_type", "outcome"),
+)
+REQUEST_DURATION = registry.histogram(
+    "resume_http_request_duration_seconds",
+    "End-to-end request latency by endpoint, uploaded file type and outcome.",
+    ("endpoint", "file_type", "outcome"),
+)
+STAGE_DURATION = registry.histogram(
+    "resume_stage_duration_seconds",
+    "Time spent in each extraction stage (upload read, conversion, each LLM call, JSON decoding, serialization).",
+    ("stage", "file_type"),
+)
+LLM_TOKENS = registry.counter(
+    "resume_llm_tokens_total",
+    "Gemini token usage from response usage metadata, by call, token type and model.",
+    ("call", "type", "model"),
+)
+LLM_CALLS = registry.counter(
+    "resume_llm_calls_total",
+    "Gemini calls by call, outcome and model, after the scheduler's retries.",
+    ("call", "outcome", "model"),
+)
+MODEL_ATTEMPTS = registry.counter(
+    "resume_model_attempts_total",
+    "Extraction attempts by model tier, call and outcome: accepted, escalated to the next tier, "
+    "error, or exhausted (the last tier's output kept although it failed the checks).",
+    ("model", "call", "outcome"),
+)
+MODEL_ATTEMPT_DURATION = registry.histogram(
+    "resume_model_attempt_duration_seconds",
+    "Wall time of one extraction attempt by model tier and call, re-asks included.",
+    ("model", "call"),
+)
+MODEL_ESCALATIONS = registry.counter(
+    "resume_model_escalations_total",
+    "Checks that sent an output on to a stronger model, by the tier that produced it, call and reason.",
+    ("model", "call", "reason"),
+)
+JSON_POSTPROCESS = registry.counter(
+    "resume_json_postprocess_total",
+    "How each model output was turned into JSON: valid as returned, repaired locally, "
+    "completed by re-asking for failed sections, or failed.",
+    ("output", "path"),
+)
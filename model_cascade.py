@@ -0,0 +1,106 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from metrics import MODEL_ATTEMPT_DURATION, MODEL_ATTEMPTS, MODEL_ESCALATIONS
+
+logger = logging.getLogger(__name__)
+
+# The model tier the current extraction attempt runs on; every LLM call made inside it reads this
+current_model = ContextVar("llm_model", default=None)
+
+
+class ModelCascade:
+    """Runs each extraction on the cheapest model tier first, escalating only when its output fails the checks.
+
+    ``models`` is ordered cheapest first. The last tier's output is kept
+    whatever the checks say, since there is nothing stronger left to ask.
+    Errors ``is_transient`` accepts (rate limits, timeouts, an open circuit)
+    are raised from the tier they happened on: a stronger model would only
+    add another failing call while the backend is struggling.
+    """
+
+    def __init__(self, models, is_transient=lambda exc: False):
+        if not models:
+            raise ValueError("At least one model is required")
+        self.models = tuple(models)
+        self.is_transient = is_transient
+        self._tiers = {
+            model: {"attempts": 0, "accepted": 0, "escalated": 0, "exhausted": 0, "errors": 0, "seconds": 0.0}
+            for model in self.models
+        }
+        self._reasons = {model: {} for model in self.models}
+
+    @property
+    def key(self):
+        """Identifies the tier list in cache keys, so a changed cascade does not serve results of the old one."""
+        return ",".join(self.models)
+
+    def current(self):
+        return current_model.get() or self.models[0]
+
+    async def run(self, call, attempt, check, start=0):
+        """Return ``attempt()``'s result from the first tier, from ``start`` on, whose output passes ``check``.
+
+        ``check(result)`` returns the names of the problems it found, empty when
+        the result is good enough to keep. An attempt that raises a
+        non-transient error is escalated as well, except on the last tier.
+        """
+        for index in range(start, len(self.models)):
+            model = self.models[index]
+            last = index == len(self.models) - 1
+            token = current_model.set(model)
+            attempt_start = time.perf_counter()
+            try:
+                result = await attempt()
+            except Exception as e:
+                self.record(model, call, "error", time.perf_counter() - attempt_start)
+                if last or self.is_transient(e):
+                    raise
+                logger.warning(f"{call} on {model} failed, escalating to {self.models[index + 1]}: {e}")
+                continue
+            finally:
+                current_model.reset(token)
+            if not self.review(index, call, time.perf_counter() - attempt_start, check(result)):
+                return result
+
+    def review(self, index, call, seconds, problems):
+        """Record a finished attempt on tier ``index``; ``True`` when its output should go to the next tier.
+
+        Also used by callers that run a tier themselves, like the streamed schema call.
+        """
+        model = self.models[index]
+        if not problems:
+            self.record(model, call, "accepted", seconds)
+            return False
+        if index == len(self.models) - 1:
+            self.record(model, call, "exhausted", seconds)
+            logger.warning(f"{call} output from {model} still fails the checks ({', '.join(problems)}); keeping it")
+            return False
+        self.record(model, call, "escalated", seconds, problems)
+        logger.info(f"Escalating {call} from {model} to {self.models[index + 1]}: {', '.join(problems)}")
+        return True
+
+    def record(self, model, call, outcome, seconds, reasons=()):
+        """Count one attempt under ``outcome``, with the check failures that escalated it."""
+        MODEL_ATTEMPTS.inc(model=model, call=call, outcome=outcome)
+        MODEL_ATTEMPT_DURATION.observe(seconds, model=model, call=call)
+        tier = self._tiers[model]
+        tier["attempts"] += 1
+        tier["errors" if outcome == "error" else outcome] += 1
+        tier["seconds"] += seconds
+        for reason in reasons:
+            MODEL_ESCALATIONS.inc(model=model, call=call, reason=reason)
+            self._reasons[model][reason] = self._reasons[model].get(reason, 0) + 1
+
+    def stats(self):
+        tiers = {}
+        for model, tier in self._tiers.items():
+            attempts = tier["attempts"]
+            tiers[model] = {
+                **{key: value for key, value in tier.items() if key != "seconds"},
+                "escalation_rate": round((tier["escalated"] + tier["errors"]) / attempts, 3) if attempts else 0.0,
+                "mean_ms": round(tier["seconds"] / attempts * 1000, 1) if attempts else 0.0,
+                "escalation_reasons": dict(self._reasons[model]),
+            }
+        return {"models": list(self.models), "tiers": tiers}
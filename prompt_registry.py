@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import json
+import logging
+import threading
+
+from pydantic import create_model
+
+from lazy_imports import LazyModule
+from prompt_manager import prompt_manager
+from schemas import (
+    Awards,
+    Certifications,
+    CreditSections,
+    Educations,
+    Experiences,
+    ProjectExperiences,
+    ResumeSchema,
+    Summary,
+)
+
+logger = logging.getLogger(__name__)
+
+_transformers = LazyModule("google.genai._transformers")
+
+# Sub-schema per section for the sharded mode; merged back into a ResumeSchema
+RESUME_SECTION_SCHEMAS = {
+    "summary": Summary,
+    "work_experience": Experiences,
+    "project_experience": ProjectExperiences,
+    "education": Educations,
+    "certifications": Certifications,
+    "awards": Awards,
+    "credits": CreditSections,
+}
+
+
+class CompiledPrompt:
+    """A prompt Part and the generation config it is always sent with.
+
+    ``note`` is an extra Part sent after the resume, if any.
+    """
+
+    def __init__(self, part, config, note=None):
+        self.part = part
+        self.config = config
+        self.note = note
+
+
+@functools.lru_cache(maxsize=None)
+def partial_resume_schema(omit):
+    """ResumeSchema without the ``omit`` fields, for a call whose other sections are already filled."""
+    fields = {name: (info.annotation, info) for name, info in ResumeSchema.model_fields.items() if name not in omit}
+    return create_model("PartialResumeSchema", **fields)
+
+
+def compile_response_schema(api_client, schema_model):
+    """Convert a pydantic model to a Gemini ``Schema`` once.
+
+    Handed the pydantic class, the SDK regenerates and post-processes its JSON
+    schema on every call. Clients without an ``_api_client`` (the benchmark
+    fakes) and SDK versions where the conversion fails get the class itself.
+    """
+    if api_client is None:
+        return schema_model
+    try:
+        return _transformers.t_schema(api_client, schema_model)
+    except Exception as e:
+        logger.warning(f"Could not pre-compile the {schema_model.__name__} response schema: {e}")
+        return schema_model
+
+
+class PromptRegistry:
+    """Every prompt Part and response config, built once per process and reused by each LLM call."""
+
+    def __init__(self, manager, section_schemas):
+        self._manager = manager
+        self._section_schemas = section_schemas
+        self._prompts = None
+        self._partial_prompts = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """Hash of the prompt texts and response schemas; part of every cache key."""
+        if self._version is None:
+            digest = hashlib.sha256(self._manager.get_prompt_fingerprint().encode("utf-8"))
+            for schema_model in (ResumeSchema, *self._section_schemas.values()):
+                digest.update(b"\0")
+                digest.update(json.dumps(schema_model.model_json_schema(), sort_keys=True).encode("utf-8"))
+            self._version = digest.hexdigest()
+        return self._version
+
+    def compile(self, client):
+        with self._lock:
+            if self._prompts is None:
+                api_client = getattr(client, "_api_client", None)
+
+                def json_config(schema_model=None):
+                    config = {"response_mime_type": "application/json"}
+                    if schema_model is not None:
+                        config["response_schema"] = compile_response_schema(api_client, schema_model)
+                    return config
+
+                prompts = {
+                    "schema": CompiledPrompt(self._manager.get_resume_extractor_prompt(), json_config(ResumeSchema)),
+                    "formatter": CompiledPrompt(self._manager.get_resume_formatter_prompt(), json_config()),
+                    "combined": CompiledPrompt(self._manager.get_resume_combined_prompt(), json_config()),
+                }
+                for section, schema_model in self._section_schemas.items():
+                    prompts[section] = CompiledPrompt(
+                        self._manager.get_section_prompt(section), json_config(schema_model)
+                    )
+                self._prompts = prompts
+                logger.info(f"Compiled {len(prompts)} prompts, version {self.version[:12]}")
+        return self._prompts
+
+    def compile_without(self, client, name, omit):
+        """Prompt ``name`` for a call that leaves the ``omit`` ResumeSchema fields out.
+
+        The prompt Part is unchanged, so the context cache still serves it; a
+        note after the resume names the omitted sections and the schema call
+        gets a response schema without them.
+        """
+        prompt = self.compile(client)[name]
+        key = (name, omit)
+        with self._lock:
+            if key not in self._partial_prompts:
+                config = prompt.config
+                if name == "schema":
+                    api_client = getattr(client, "_api_client", None)
+                    config = {**config, "response_schema": compile_response_schema(api_client, partial_resume_schema(omit))}
+                note = self._manager.get_omit_sections_prompt(sorted(omit))
+                self._partial_prompts[key] = CompiledPrompt(prompt.part, config, note)
+        return self._partial_prompts[key]
+
+
+prompt_registry = PromptRegistry(prompt_manager, RESUME_SECTION_SCHEMAS)
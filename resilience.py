@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window=200, min_samples=20):
+        self._samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and fails fast for ``reset_timeout`` seconds.
+
+    After the timeout a single trial call is let through (half-open); its
+    outcome closes the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+        self.opened = 0
+
+    def is_open(self):
+        return self.state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def before_call(self):
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError("The language model backend is degraded; failing fast.")
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("Circuit breaker closed after a successful trial call")
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        # A cancelled trial says nothing about the backend; let the next call try again
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+                logger.warning(f"Circuit breaker opened after {self._consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+async def hedged_call(call_factory, hedge_delay=None, on_hedge=None, hedge_factory=None):
+    """Start ``call_factory()``; if it has not finished after ``hedge_delay`` start a duplicate.
+
+    The duplicate comes from ``hedge_factory`` when given (so it can take
+    its own scheduler slot), otherwise from ``call_factory``. The first
+    successful result wins and the other attempt is cancelled. An error is
+    only raised once every attempt has failed.
+    """
+    tasks = {asyncio.create_task(call_factory())}
+    hedged = hedge_delay is None
+    last_error = None
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(
+                tasks, timeout=None if hedged else hedge_delay, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                hedged = True
+                if on_hedge is not None:
+                    on_hedge()
+                tasks.add(asyncio.create_task((hedge_factory or call_factory)()))
+                continue
+            for task in done:
+                tasks.discard(task)
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+            if not hedged:
+                # The primary failed before the hedge point; let the caller's retry policy decide
+                break
+        raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class ResilientCaller:
+    """Per-call deadline, latency-percentile hedging and a circuit breaker around one LLM call.
+
+    Latencies are tracked per ``key`` (the caller passes the call name and
+    model), so a slow call type does not set the hedge delay of a fast one.
+    """
+
+    def __init__(
+        self,
+        breaker,
+        deadline_seconds=None,
+        hedge_percentile=0.95,
+        hedge_min_delay=0.5,
+        hedging_enabled=True,
+        tracker_window=200,
+        tracker_min_samples=20,
+        is_failure=lambda exc: True,
+    ):
+        self.breaker = breaker
+        self.deadline_seconds = deadline_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedging_enabled = hedging_enabled
+        self.tracker_window = tracker_window
+        self.tracker_min_samples = tracker_min_samples
+        self._trackers = {}
+        self.is_failure = is_failure
+        self._counters = {"calls": 0, "hedges": 0, "deadline_exceeded": 0}
+
+    def tracker(self, key=None):
+        if key not in self._trackers:
+            self._trackers[key] = LatencyTracker(self.tracker_window, self.tracker_min_samples)
+        return self._trackers[key]
+
+    def hedge_delay(self, key=None):
+        if not self.hedging_enabled:
+            return None
+        observed = self.tracker(key).percentile(self.hedge_percentile)
+        return None if observed is None else max(self.hedge_min_delay, observed)
+
+    def _count_hedge(self):
+        self._counters["hedges"] += 1
+
+    async def call(self, call_factory, key=None, hedge_factory=None):
+        self.breaker.before_call()
+        self._counters["calls"] += 1
+        start = time.monotonic()
+        try:
+            attempt = hedged_call(
+                call_factory, self.hedge_delay(key), on_hedge=self._count_hedge, hedge_factory=hedge_factory
+            )
+            if self.deadline_seconds:
+                result = await asyncio.wait_for(attempt, self.deadline_seconds)
+            else:
+                result = await attempt
+        except asyncio.CancelledError:
+            self.breaker.release_trial()
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self._counters["deadline_exceeded"] += 1
+            if self.is_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        self.tracker(key).record(time.monotonic() - start)
+        self.breaker.record_success()
+        return result
+
+    def stats(self):
+        hedge_delays = {}
+        for key in self._trackers:
+            hedge_delay = self.hedge_delay(key)
+            hedge_delays[str(key)] = round(hedge_delay, 4) if hedge_delay is not None else None
+        return {
+            **self._counters,
+            "hedge_delay_seconds": hedge_delays,
+            "circuit_state": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            "circuit_rejected": self.breaker.rejected,
+        }
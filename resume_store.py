@@ -0,0 +1,310 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from local_extraction import canonical_skill
+
+# Highest level first: "Master of Science ..., Bachelor of ..." in one entry is a master's
+EDUCATION_LEVELS = {
+    "doctorate": re.compile(r"\b(?:ph\.?\s?d|doctor(?:ate)?|d\.?phil)\b", re.IGNORECASE),
+    "master": re.compile(r"\b(?:master|mba|m\.?\s?(?:s|sc|a|eng|tech|phil|com)\b)", re.IGNORECASE),
+    "bachelor": re.compile(r"\b(?:bachelor|b\.?\s?(?:s|sc|a|e|eng|tech|com)\b)", re.IGNORECASE),
+    "associate": re.compile(r"\bassociate\b", re.IGNORECASE),
+    "diploma": re.compile(r"\b(?:diploma|high school|certificate)\b", re.IGNORECASE),
+}
+
+# Columns of the full-text index and their bm25 weights: a hit in the skills or a job title says
+# more about a candidate than one somewhere in a job description
+FTS_COLUMNS = {
+    "summary": 1.0,
+    "skills": 4.0,
+    "roles": 3.0,
+    "clients": 2.0,
+    "experience": 1.0,
+    "education": 1.5,
+    "certifications": 2.0,
+    "awards": 1.0,
+}
+
+_QUERY_TERM = re.compile(r'[^\s"]+\*?')
+
+
+def education_level(degree):
+    for level, pattern in EDUCATION_LEVELS.items():
+        if pattern.search(degree):
+            return level
+    return "other"
+
+
+def _phrase(text):
+    # FTS5 string literal: the text is tokenized as a phrase and no query syntax inside it applies
+    return '"' + text.replace('"', '""') + '"'
+
+
+def match_expression(keywords=None, role=None, client=None):
+    """FTS5 query for free-text keywords (all required; a trailing ``*`` matches a prefix) and role/client phrases."""
+    terms = []
+    for term in _QUERY_TERM.findall(keywords or ""):
+        terms.append(_phrase(term[:-1]) + "*" if term.endswith("*") and len(term) > 1 else _phrase(term))
+    if role:
+        terms.append(f"roles : {_phrase(role)}")
+    if client:
+        terms.append(f"clients : {_phrase(client)}")
+    return " AND ".join(terms)
+
+
+class ResumeStore:
+    """Extracted ResumeSchema records kept in SQLite and searchable without the LLM.
+
+    Each record is indexed three ways: an FTS5 table with one column per kind
+    of content (ranked with bm25), a table of its skills in their taxonomy
+    spelling, and a table of its education levels. One record per uploaded
+    document, replaced when the document is extracted again. The SQLite file
+    is shared by every uvicorn worker pointing at the same path.
+    """
+
+    def __init__(self, db_path, get_skill_matcher=None, enabled=True):
+        self.db_path = db_path
+        self.enabled = enabled
+        self._get_skill_matcher = get_skill_matcher
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {"stores": 0, "searches": 0}
+        if enabled:
+            self._init_db()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _init_db(self):
+        with self._connection() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS resumes (
+                    id INTEGER PRIMARY KEY,
+                    document TEXT NOT NULL UNIQUE,
+                    filename TEXT NOT NULL,
+                    record TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            # "+" and "#" are part of a token, so "C++" and "C#" are not just "C"
+            connection.execute(
+                f"""CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+                    {", ".join(FTS_COLUMNS)}, tokenize="unicode61 tokenchars '+#'"
+                )"""
+            )
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS resume_skills (
+                    resume_id INTEGER NOT NULL,
+                    skill TEXT NOT NULL,
+                    PRIMARY KEY (skill, resume_id)
+                ) WITHOUT ROWID"""
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS resume_skills_by_resume ON resume_skills (resume_id)")
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS resume_education (
+                    resume_id INTEGER NOT NULL,
+                    level TEXT NOT NULL,
+                    PRIMARY KEY (level, resume_id)
+                ) WITHOUT ROWID"""
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS resume_education_by_resume ON resume_education (resume_id)"
+            )
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def normalize_skill(self, name):
+        """Index and query form of a skill: its taxonomy spelling, lowercased."""
+        if self._get_skill_matcher is not None:
+            name = canonical_skill(self._get_skill_matcher(), name)
+        return " ".join(name.lower().split())
+
+    def _index_rows(self, record):
+        skills = [item for group in record.get("credits") or [] for item in group.get("items") or []]
+        jobs = record.get("work_experience") or []
+        projects = record.get("project_experience") or []
+        degrees = [entry.get("degree") or "" for entry in record.get("education") or []]
+        experience = [
+            line
+            for entry in jobs + projects
+            for line in [entry.get("Project") or "", *(entry.get("description") or []), *(entry.get("responsibilities") or []), *(entry.get("tools") or [])]
+        ]
+        text = {
+            "summary": " ".join([record.get("professional_summary") or "", *(record.get("professional_experience") or [])]),
+            "skills": " ; ".join(skills),
+            "roles": " ; ".join(entry.get("role") or "" for entry in jobs + projects),
+            "clients": " ; ".join(entry.get("client") or "" for entry in jobs),
+            "experience": " ".join(experience),
+            "education": " ; ".join(degrees),
+            "certifications": " ; ".join(entry.get("certification") or "" for entry in record.get("certifications") or []),
+            "awards": " ; ".join(record.get("awards") or []),
+        }
+        return (
+            [text[column] for column in FTS_COLUMNS],
+            {self.normalize_skill(skill) for skill in skills if skill.strip()},
+            {education_level(degree) for degree in degrees if degree.strip()},
+        )
+
+    def add(self, document, filename, record):
+        """Store (or replace) the ResumeSchema ``record`` extracted from ``document`` (the upload's content hash)."""
+        fts_row, skills, levels = self._index_rows(record)
+        with self._connection() as connection:
+            existing = connection.execute("SELECT id FROM resumes WHERE document = ?", (document,)).fetchone()
+            if existing is None:
+                resume_id = connection.execute(
+                    "INSERT INTO resumes (document, filename, record, updated_at) VALUES (?, ?, ?, ?)",
+                    (document, filename, json.dumps(record), time.time()),
+                ).lastrowid
+            else:
+                resume_id = existing[0]
+                connection.execute(
+                    "UPDATE resumes SET filename = ?, record = ?, updated_at = ? WHERE id = ?",
+                    (filename, json.dumps(record), time.time(), resume_id),
+                )
+                for table in ("resume_skills", "resume_education"):
+                    connection.execute(f"DELETE FROM {table} WHERE resume_id = ?", (resume_id,))
+                connection.execute("DELETE FROM resume_fts WHERE rowid = ?", (resume_id,))
+            connection.execute(
+                f"INSERT INTO resume_fts (rowid, {', '.join(FTS_COLUMNS)}) VALUES (?{', ?' * len(FTS_COLUMNS)})",
+                (resume_id, *fts_row),
+            )
+            connection.executemany(
+                "INSERT INTO resume_skills (resume_id, skill) VALUES (?, ?)", [(resume_id, skill) for skill in skills]
+            )
+            connection.executemany(
+                "INSERT INTO resume_education (resume_id, level) VALUES (?, ?)", [(resume_id, level) for level in levels]
+            )
+        self._count("stores")
+        return resume_id
+
+    def get(self, resume_id):
+        row = self._connection().execute(
+            "SELECT id, document, filename, record, updated_at FROM resumes WHERE id = ?", (resume_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "document": row[1], "filename": row[2], "updated_at": row[4], "record": json.loads(row[3])}
+
+    def iter_records(self, chunk_size=1000, updated_since=None):
+        """Every stored record (as ``get`` returns them) in id order, read ``chunk_size`` at a time."""
+        last_id = 0
+        while True:
+            # A fresh connection lookup per chunk: a streaming response resumes the generator on any worker thread
+            rows = self._connection().execute(
+                """SELECT id, document, filename, record, updated_at FROM resumes
+                   WHERE id > ? AND updated_at >= ? ORDER BY id LIMIT ?""",
+                (last_id, updated_since or 0, chunk_size),
+            ).fetchall()
+            for row in rows:
+                yield {"id": row[0], "document": row[1], "filename": row[2], "updated_at": row[4], "record": json.loads(row[3])}
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    def search(self, keywords=None, skills=(), match_all_skills=True, role=None, client=None, education=None, limit=20, offset=0):
+        """One page of stored resumes matching every given filter, best first, and the total number matching.
+
+        ``keywords``, ``role`` and ``client`` go through the full-text index and
+        rank by bm25; ``skills`` must all be present (or any of them, ranked by
+        how many, with ``match_all_skills=False``); ``education`` is a level
+        from ``EDUCATION_LEVELS`` or "other". Ties, and everything without a
+        ranked filter, go most recently added first.
+        """
+        self._count("searches")
+        skills = sorted({self.normalize_skill(skill) for skill in skills if skill.strip()})
+        expression = match_expression(keywords, role, client)
+        # Each filter is a subquery of matching ids and what they rank by, if anything
+        sources, params, columns, order = [], [], [], []
+        if skills:
+            having = "HAVING COUNT(*) = ?" if match_all_skills else ""
+            marks = ", ".join("?" * len(skills))
+            source = f"SELECT resume_id AS id{{}} FROM resume_skills WHERE skill IN ({marks}) GROUP BY resume_id {having}"
+            sources.append((source.format(", COUNT(*) AS matched"), source.format("")))
+            params += [*skills, *([len(skills)] if match_all_skills else [])]
+            columns.append("matched")
+            order.append("matched DESC")
+        if expression:
+            weights = ", ".join(str(weight) for weight in FTS_COLUMNS.values())
+            source = "SELECT rowid AS id{} FROM resume_fts WHERE resume_fts MATCH ?"
+            sources.append((source.format(f", bm25(resume_fts, {weights}) AS rank"), source.format("")))
+            params.append(expression)
+            columns.append("rank")
+            order.append("rank")
+        if education:
+            source = "SELECT resume_id AS id FROM resume_education WHERE level = ?"
+            sources.append((source, source))
+            params.append(education)
+        if not sources:
+            sources.append(("SELECT id FROM resumes",) * 2)
+        order.append("id DESC")
+
+        def query(ranked, selected):
+            # Joined filters are materialized: otherwise SQLite runs the full-text query once per joined row.
+            # The count leaves out the ranks, which cost more than the matching itself for common terms.
+            parts = [ranked_source if ranked else ids_source for ranked_source, ids_source in sources]
+            if len(parts) == 1:
+                return f"SELECT {selected} FROM ({parts[0]})"
+            return (
+                "WITH "
+                + ", ".join(f"filter_{index} AS MATERIALIZED ({part})" for index, part in enumerate(parts))
+                + f" SELECT {selected} FROM filter_0"
+                + "".join(f" JOIN filter_{index} USING (id)" for index in range(1, len(parts)))
+            )
+
+        connection = self._connection()
+        total = connection.execute(query(False, "COUNT(*)"), params).fetchone()[0]
+        page = connection.execute(
+            f"{query(True, ', '.join(['id', *columns]))} ORDER BY {', '.join(order)} LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        ).fetchall()
+        records = {}
+        if page:
+            records = {
+                row[0]: row[1:]
+                for row in connection.execute(
+                    f"SELECT id, filename, updated_at, record FROM resumes WHERE id IN ({', '.join('?' * len(page))})",
+                    [row[0] for row in page],
+                )
+            }
+        results = []
+        for resume_id, *ranks in page:
+            filename, updated_at, record = records[resume_id]
+            ranks = dict(zip(columns, ranks))
+            record = json.loads(record)
+            jobs = record.get("work_experience") or []
+            results.append(
+                {
+                    "id": resume_id,
+                    "filename": filename,
+                    "updated_at": updated_at,
+                    # bm25 is lower for better matches; negated so higher is better
+                    "score": round(-ranks["rank"], 4) if "rank" in ranks else None,
+                    "matched_skills": ranks.get("matched"),
+                    "summary": record.get("professional_summary"),
+                    "roles": [f"{job.get('role')} at {job.get('client')}" for job in jobs[:3]],
+                }
+            )
+        return {"total": total, "limit": limit, "offset": offset, "results": results}
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters["enabled"] = self.enabled
+        if self.enabled:
+            connection = self._connection()
+            counters["resumes"] = connection.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            counters["distinct_skills"] = connection.execute(
+                "SELECT COUNT(DISTINCT skill) FROM resume_skills"
+            ).fetchone()[0]
+        return counters
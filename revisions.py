@@ -0,0 +1,284 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+from lazy_imports import LazyModule
+from local_extraction import split_sections
+from schemas import ResumeSchema
+
+np = LazyModule("numpy")
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# List markers and emphasis, which differ between the PDF and DOCX converters for the same text
+_MARKUP = re.compile(r"^[-*•·▪◦–#>\s]+|\*\*|__")
+# Text outside any recognized section: the header with the name and contact details, and the
+# sections under unrecognized headings
+HEADER = "header"
+OTHER = "other"
+# A longer "header" is a resume without headings, whose every section is in it
+MAX_HEADER_LINES = 6
+# Sections a ResumeSchema field is drawn from besides its own: the highlights come from the summary
+# and the jobs, awards are often listed under the jobs
+EXTRA_SOURCES = {
+    "professional_experience": ("professional_summary", "work_experience", "project_experience"),
+    "awards": ("work_experience",),
+}
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _shingle_hashes(text, shingle_words):
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_words:
+        words += [""] * (shingle_words - len(words))
+    shingles = {" ".join(words[i : i + shingle_words]) for i in range(len(words) - shingle_words + 1)}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles],
+        dtype=np.uint64,
+    )
+
+
+def _sections(text):
+    sections = split_sections(text, other=OTHER, header=HEADER)
+    if len(sections[HEADER]) > MAX_HEADER_LINES:
+        sections.setdefault(OTHER, []).extend(sections.pop(HEADER))
+    return {name: [" ".join(_MARKUP.sub("", line).split()) for line in lines] for name, lines in sections.items() if lines}
+
+
+def changed_fields(previous_text, text):
+    """What has to be extracted again for ``text``, given the extraction of ``previous_text``.
+
+    Returns the changed ResumeSchema fields, and whether the text outside the
+    recognized sections changed. A field is changed when any section it is
+    drawn from is; a field with no section of its own in either revision was
+    drawn from the text under unrecognized headings.
+    """
+    previous, current = _sections(previous_text), _sections(text)
+    present = previous.keys() | current.keys()
+    changed = {name for name in present if previous.get(name) != current.get(name)}
+    fields = set()
+    for field in ResumeSchema.model_fields:
+        sources = {field, *EXTRA_SOURCES.get(field, ())}
+        if not sources & present:
+            sources.add(OTHER)
+        if sources & changed:
+            fields.add(field)
+    return fields, bool({HEADER, OTHER} & changed)
+
+
+class RevisionIndex:
+    """Earlier extractions of converted resume text, found again from a revised copy of the same resume.
+
+    Each stored text gets a MinHash signature over its word shingles, split
+    into LSH bands in SQLite, so a lookup only compares against texts that
+    share a band; the best candidate at or above ``min_similarity`` (estimated
+    Jaccard similarity) is the predecessor. Entries are scoped by ``context``,
+    which identifies the prompts, models and mode that produced them, so a
+    result is only reused by the same pipeline. The SQLite file is shared by
+    every uvicorn worker pointing at the same path.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        num_perm=128,
+        bands=16,
+        shingle_words=5,
+        min_similarity=0.7,
+        ttl_seconds=7 * 24 * 3600,
+        enabled=True,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.db_path = db_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_words = shingle_words
+        self.min_similarity = min_similarity
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._permutations = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {
+            "lookups": 0,
+            "matches": 0,
+            "misses": 0,
+            "unchanged": 0,
+            "sections_reused": 0,
+            "sections_extracted": 0,
+            "stores": 0,
+        }
+        if enabled:
+            self._init_db()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _init_db(self):
+        with self._connection() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS revisions (
+                    id INTEGER PRIMARY KEY,
+                    context TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS revision_bands (
+                    context TEXT NOT NULL,
+                    band INTEGER NOT NULL,
+                    bucket BLOB NOT NULL,
+                    revision_id INTEGER NOT NULL
+                )"""
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS revision_bands_lookup ON revision_bands (context, band, bucket)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS revisions_created_at ON revisions (created_at)")
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def signature(self, text):
+        """MinHash signature of ``text``: per permutation, the smallest permuted shingle hash."""
+        if self._permutations is None:
+            # Fixed seed: signatures stored by one process are compared by all the others
+            rng = np.random.default_rng(1)
+            self._permutations = (
+                rng.integers(1, 1 << 31, self.num_perm, dtype=np.uint64),
+                rng.integers(0, 1 << 31, self.num_perm, dtype=np.uint64),
+            )
+        a, b = self._permutations
+        hashes = _shingle_hashes(text, self.shingle_words)
+        # 31-bit coefficients times 32-bit hashes stay below 2**64
+        return ((np.outer(hashes, a) + b) % _MERSENNE_PRIME).min(axis=0)
+
+    def _buckets(self, signature):
+        rows = self.num_perm // self.bands
+        return [
+            hashlib.blake2b(signature[band * rows : (band + 1) * rows].tobytes(), digest_size=8).digest()
+            for band in range(self.bands)
+        ]
+
+    def find(self, text, context, limit=5):
+        """``(text, result, similarity)`` of the stored revisions at or above ``min_similarity``, most similar first."""
+        signature = self.signature(text)
+        connection = self._connection()
+        candidates = set()
+        for band, bucket in enumerate(self._buckets(signature)):
+            candidates.update(
+                row[0]
+                for row in connection.execute(
+                    "SELECT revision_id FROM revision_bands WHERE context = ? AND band = ? AND bucket = ?",
+                    (context, band, bucket),
+                )
+            )
+        matches = []
+        for revision_id in candidates:
+            row = connection.execute(
+                "SELECT text, result, signature, created_at FROM revisions WHERE id = ?", (revision_id,)
+            ).fetchone()
+            if row is None or time.time() - row[3] > self.ttl_seconds:
+                continue
+            similarity = float(np.mean(np.frombuffer(row[2], dtype=np.uint64) == signature))
+            if similarity >= self.min_similarity:
+                matches.append((similarity, row[3], row[0], row[1]))
+        # Newest first among equally similar ones
+        matches.sort(reverse=True)
+        return [(previous_text, json.loads(result), similarity) for similarity, _, previous_text, result in matches[:limit]]
+
+    def add(self, text, context, result):
+        signature = self.signature(text)
+        now = time.time()
+        with self._connection() as connection:
+            revision_id = connection.execute(
+                "INSERT INTO revisions (context, text, result, signature, created_at) VALUES (?, ?, ?, ?, ?)",
+                (context, text, json.dumps(result), signature.tobytes(), now),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO revision_bands (context, band, bucket, revision_id) VALUES (?, ?, ?, ?)",
+                [(context, band, bucket, revision_id) for band, bucket in enumerate(self._buckets(signature))],
+            )
+            expired = [
+                row[0]
+                for row in connection.execute(
+                    "SELECT id FROM revisions WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+            ]
+            if expired:
+                marks = ",".join("?" * len(expired))
+                connection.execute(f"DELETE FROM revision_bands WHERE revision_id IN ({marks})", expired)
+                connection.execute(f"DELETE FROM revisions WHERE id IN ({marks})", expired)
+        self._count("stores")
+
+    def reusable(self, text, context):
+        """The parts of the nearest stored revision's result that still hold for ``text``.
+
+        ``None`` without a near-duplicate. Otherwise a result-shaped dict with
+        the unchanged sections of each representation, ``changed`` with the
+        keys of each that have to be extracted again, and ``unchanged`` set
+        when there are none, so the whole result can be served.
+        """
+        self._count("lookups")
+        matches = self.find(text, context)
+        if not matches:
+            self._count("misses")
+            return None
+        self._count("matches")
+        # Shingles ignore layout, so the PDF and DOCX copies of one resume are equally similar;
+        # the one whose sections changed least is the predecessor
+        (fields, other_changed), previous_text, previous, similarity = min(
+            (
+                (changed_fields(previous_text, text), previous_text, previous, similarity)
+                for previous_text, previous, similarity in matches
+            ),
+            key=lambda match: (len(match[0][0]) + match[0][1], -match[3]),
+        )
+        schema_structured = previous.get("schema_structured") or {}
+        formatter_structured = previous.get("formatter_structured") or {}
+        # Keys the formatter made up itself (contact details, say) come from the text outside the sections
+        formatter_changed = {
+            key for key in formatter_structured if key not in ResumeSchema.model_fields and other_changed
+        } | fields
+        reused = {
+            "schema_structured": {field: value for field, value in schema_structured.items() if field not in fields},
+            "formatter_structured": {
+                key: value for key, value in formatter_structured.items() if key not in formatter_changed
+            },
+            "changed": {"schema_structured": sorted(fields), "formatter_structured": sorted(formatter_changed)},
+            "unchanged": not fields and not other_changed,
+        }
+        self._count("sections_reused", len(ResumeSchema.model_fields) - len(fields))
+        self._count("sections_extracted", len(fields))
+        if reused["unchanged"]:
+            self._count("unchanged")
+        logger.info(
+            f"Revision of a stored resume (similarity {similarity:.2f}); "
+            f"re-extracting {', '.join(sorted(fields)) or 'nothing'}"
+        )
+        return reused
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters["enabled"] = self.enabled
+        counters["match_ratio"] = round(counters["matches"] / counters["lookups"], 4) if counters["lookups"] else 0.0
+        if self.enabled:
+            counters["entries"] = self._connection().execute("SELECT COUNT(*) FROM revisions").fetchone()[0]
+        return counters
@@ -0,0 +1,222 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+# Set by batch-style callers (batch endpoint, job workers, CLI) so their LLM calls queue behind uploads
+current_priority = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+
+class TokenBucket:
+    """Refills continuously at ``rate_per_minute`` up to ``capacity``."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(capacity or rate_per_minute)
+        self.tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    def time_until(self, amount):
+        """Seconds until ``amount`` tokens are available; requests above capacity wait for a full bucket."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def take(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Debit (positive) or refund (negative) tokens once the real usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class LLMScheduler:
+    """Central gate for every LLM call.
+
+    Calls wait in a priority queue until a concurrency slot is free and both the
+    requests-per-minute and tokens-per-minute buckets can cover them; retryable
+    failures are retried with exponential backoff and full jitter.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=1000,
+        tokens_per_minute=4_000_000,
+        max_concurrency=16,
+        max_retries=4,
+        base_backoff_seconds=1.0,
+        max_backoff_seconds=30.0,
+        is_retryable=lambda exc: False,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.is_retryable = is_retryable
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._wakeup_handle = None
+        self._counters = {
+            "requests": 0,
+            "retries": 0,
+            "throttle_events": 0,
+            "rate_limited_responses": 0,
+            "failures": 0,
+        }
+        self._queue_wait = {
+            priority.name.lower(): {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0} for priority in Priority
+        }
+
+    def _dispatch(self):
+        while self._waiters and self._active < self.max_concurrency:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(self.request_bucket.time_until(1), self.token_bucket.time_until(tokens))
+            if wait > 0:
+                if self._wakeup_handle is None:
+                    self._counters["throttle_events"] += 1
+                    self._wakeup_handle = asyncio.get_running_loop().call_later(wait, self._timer_dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.request_bucket.take(1)
+            self.token_bucket.take(tokens)
+            self._active += 1
+            future.set_result(None)
+
+    def _timer_dispatch(self):
+        self._wakeup_handle = None
+        self._dispatch()
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _record_wait(self, priority, seconds):
+        stats = self._queue_wait[priority.name.lower()]
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens=0, priority=None):
+        """Hold one concurrency slot and the rate budget for a single LLM call (or stream)."""
+        priority = current_priority.get() if priority is None else priority
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), estimated_tokens, future))
+        queued_at = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted in the same tick we were cancelled: give the slot and the rate budget back
+            if future.done() and not future.cancelled():
+                self.request_bucket.adjust(-1)
+                self.token_bucket.adjust(-estimated_tokens)
+                self._release()
+            raise
+        self._record_wait(priority, time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def record_usage(self, estimated_tokens, response):
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "total_token_count", None) if usage is not None else None
+        if actual is not None:
+            self.token_bucket.adjust(actual - estimated_tokens)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** attempt))
+
+    async def submit(self, call_factory, estimated_tokens=0, priority=None):
+        """Run ``call_factory()`` under the scheduler, retrying retryable errors."""
+        for attempt in range(self.max_retries + 1):
+            self._counters["requests"] += 1
+            try:
+                async with self.slot(estimated_tokens, priority):
+                    response = await call_factory()
+            except Exception as e:
+                if getattr(e, "code", None) == 429:
+                    self._counters["rate_limited_responses"] += 1
+                if not self.is_retryable(e) or attempt == self.max_retries:
+                    self._counters["failures"] += 1
+                    raise
+                delay = self._backoff(attempt)
+                self._counters["retries"] += 1
+                logger.warning(f"LLM call failed (attempt {attempt + 1}), retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+            self.record_usage(estimated_tokens, response)
+            return response
+
+    async def run_once(self, call_factory, estimated_tokens=0, priority=None):
+        """Run ``call_factory()`` once in its own slot, without retries (e.g. a hedged duplicate)."""
+        self._counters["requests"] += 1
+        try:
+            async with self.slot(estimated_tokens, priority):
+                response = await call_factory()
+        except Exception as e:
+            if getattr(e, "code", None) == 429:
+                self._counters["rate_limited_responses"] += 1
+            self._counters["failures"] += 1
+            raise
+        self.record_usage(estimated_tokens, response)
+        return response
+
+    def stats(self):
+        queue_wait = {}
+        for priority, stats in self._queue_wait.items():
+            mean = stats["total_seconds"] / stats["count"] if stats["count"] else 0.0
+            queue_wait[priority] = {
+                "count": stats["count"],
+                "mean_seconds": round(mean, 4),
+                "max_seconds": round(stats["max_seconds"], 4),
+            }
+        return {
+            **self._counters,
+            "active": self._active,
+            "queued": sum(1 for *_, future in self._waiters if not future.done()),
+            "queue_wait": queue_wait,
+        }
+
+
+def estimate_tokens(contents, chars_per_token=4, pdf_bytes_per_token=200):
+    """Rough input-token estimate used to pre-debit the tokens-per-minute bucket."""
+    total = 0
+    for content in contents:
+        text = content if isinstance(content, str) else getattr(content, "text", None)
+        if text:
+            total += len(text) // chars_per_token
+            continue
+        inline_data = getattr(content, "inline_data", None)
+        if inline_data is not None and inline_data.data:
+            total += len(inline_data.data) // pdf_bytes_per_token
+    return total
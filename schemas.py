@@ -62,6 +62,27 @@ class ProjectExperience(BaseModel):
     )
 
 
+class ProjectExperiences(BaseModel):
+    project_experience: List[ProjectExperience] = Field(
+        description="Project-based work experience including client, role, tools, and responsibilities."
+    )
+
+
+class CreditSections(BaseModel):
+    credits: List[Credits] = Field(
+        description="Grouped skills and tools, each containing a group of skills and competencies relevant to the job."
+    )
+
+
+class Summary(BaseModel):
+    professional_summary: Optional[str] = Field(
+        description="A brief summary or objective statement highlighting key skills, experience, and career goals."
+    )
+    professional_experience: List[str] = Field(
+        description="A brief pointwise summary of professional experience of candidate's career till date."
+    )
+
+
 class SkillSection(BaseModel):
     name: str = Field(
         description="name or title of the skill group and competencies relevant to the job, such as programming languages, data science, tools & technologies, cloud & DevOps, full stack,  or soft skills."
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one shared task.
+
+    Each caller awaits the task through ``asyncio.shield``, so a caller that is
+    cancelled (e.g. the client disconnected) stops waiting without cancelling
+    the work the other callers are still waiting for.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._counters = {"executed": 0, "coalesced": 0}
+
+    def _forget(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the outcome as retrieved even if every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key, factory):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self._counters["executed"] += 1
+        else:
+            self._counters["coalesced"] += 1
+            logger.info(f"Coalescing request onto in-flight extraction {key[:12]}")
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {**self._counters, "in_flight": len(self._in_flight)}
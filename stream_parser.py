@@ -0,0 +1,98 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TopLevelSectionParser:
+    """Incrementally parses a streamed JSON object and reports each top-level member once complete.
+
+    Feed it raw text chunks as they arrive; ``feed`` returns the ``(key, value)``
+    pairs whose values finished in that chunk. Nested objects/arrays are
+    buffered until their closing bracket at depth zero, so a section is only
+    emitted when it can be decoded on its own. A member whose value does not
+    decode is logged and skipped, and parsing carries on with the next key.
+    """
+
+    def __init__(self):
+        self._state = "start"
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key_buffer = []
+        self._value_buffer = []
+        self._key = None
+        self.done = False
+
+    def feed(self, chunk):
+        completed = []
+        for char in chunk:
+            section = self._consume(char)
+            if section is not None:
+                completed.append(section)
+        return completed
+
+    def _consume(self, char):
+        state = self._state
+        if state == "start":
+            if char == "{":
+                self._state = "expect_key"
+        elif state == "expect_key":
+            if char == '"':
+                self._state = "key"
+                self._key_buffer = []
+            elif char == "}":
+                self._state = "end"
+                self.done = True
+        elif state == "key":
+            if self._escaped:
+                self._key_buffer.append(char)
+                self._escaped = False
+            elif char == "\\":
+                self._key_buffer.append(char)
+                self._escaped = True
+            elif char == '"':
+                self._key = json.loads('"' + "".join(self._key_buffer) + '"')
+                self._state = "expect_colon"
+            else:
+                self._key_buffer.append(char)
+        elif state == "expect_colon":
+            if char == ":":
+                self._state = "value"
+                self._value_buffer = []
+                self._depth = 0
+        elif state == "value":
+            return self._consume_value(char)
+        return None
+
+    def _consume_value(self, char):
+        if self._in_string:
+            self._value_buffer.append(char)
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+            return None
+
+        if self._depth == 0 and char in ",}":
+            if char == "}":
+                self._state = "end"
+                self.done = True
+            else:
+                self._state = "expect_key"
+            try:
+                return self._key, json.loads("".join(self._value_buffer))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping streamed section {self._key!r} that could not be decoded: {e}")
+                return None
+
+        if char == '"':
+            self._in_string = True
+        elif char in "[{":
+            self._depth += 1
+        elif char in "]}":
+            self._depth -= 1
+        self._value_buffer.append(char)
+        return None
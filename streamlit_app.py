@@ -4,65 +4,138 @@ import requests
 import streamlit as st
 import logging
 
+from export import TABLES
+
 # Configure logging for streamlit app (optional, might log to streamlit console)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(module)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 st.title("Resume Details Extractor")
 
+# api_url = "https://resumestandardizer-backend.onrender.com/extract_resume_details/"
+api_url = "https://resumeconverter.onrender.com/extract_resume_details/"
+stream_api_url = api_url + "stream/"
+export_api_url = api_url.replace("/extract_resume_details/", "/resumes/export")
+
 logger.info("Streamlit app started.")
 
 uploaded_file = st.file_uploader(
     "Upload your Resume (PDF or DOCX)", type=["pdf", "docx"]
 )
 
+stream_sections = st.checkbox("Show sections as soon as they are extracted", value=True)
+
+with st.sidebar:
+    st.markdown("### 📦 Bulk Export")
+    st.caption("Every resume extracted so far, flattened into tables (resumes, skills, work experience, ...).")
+    st.link_button("Parquet (zip)", f"{export_api_url}?format=parquet")
+    st.link_button("Arrow (zip)", f"{export_api_url}?format=arrow")
+    export_table = st.selectbox("NDJSON table", list(TABLES))
+    st.link_button("NDJSON", f"{export_api_url}?format=ndjson&table={export_table}")
+
+
+def iter_sse_events(response):
+    """Yield ``(event, data)`` pairs from a Server-Sent Events response."""
+    event, data_lines = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data_lines))
+            event, data_lines = None, []
+
+
+def render_download_buttons(schema_json, formatter_json):
+    st.markdown("### 📥 Download Options")
+    colA, colB = st.columns(2)
+    with colA:
+        st.download_button(
+            "Download Schema JSON",
+            data=json.dumps(schema_json, indent=4),
+            file_name="resume_schema.json",
+            mime="application/json",
+        )
+    with colB:
+        st.download_button(
+            "Download Formatter JSON",
+            data=json.dumps(formatter_json, indent=4),
+            file_name="resume_formatter.json",
+            mime="application/json",
+        )
+
+
+def extract_streaming(files):
+    schema_json, formatter_json = {}, {}
+    # One placeholder per section, so a section the API sends again (e.g. after a repair) replaces its first version
+    section_placeholders = {}
+    failed = False
+    status = st.info("Extracting resume sections...")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("✅ Schema-Enforced JSON")
+    with col2:
+        st.subheader("🧩 Formatter-Based JSON")
+        formatter_placeholder = st.empty()
+        formatter_placeholder.caption("Waiting for formatter output...")
+
+    with requests.post(stream_api_url, files=files, stream=True) as response:
+        response.raise_for_status()
+        logger.info(f"Streaming API request started. Status code: {response.status_code}")
+        for event, data in iter_sse_events(response):
+            if event == "section":
+                schema_json[data["section"]] = data["data"]
+                if data["section"] not in section_placeholders:
+                    with col1:
+                        st.markdown(f"**{data['section']}**")
+                        section_placeholders[data["section"]] = st.empty()
+                section_placeholders[data["section"]].json(data["data"], expanded=True)
+            elif event == "formatter":
+                formatter_json = data["data"]
+                formatter_placeholder.json(formatter_json, expanded=True)
+            elif event == "error":
+                failed = True
+                status.error(data.get("error", "Extraction failed."))
+            elif event == "done" and not failed:
+                first_section_ms = data.get("time_to_first_section_ms")
+                timing = f" First section after {first_section_ms / 1000:.1f}s." if first_section_ms else ""
+                status.success(f"Resume processed successfully!{timing}")
+    render_download_buttons(schema_json, formatter_json)
+
+
 if uploaded_file is not None:
     if st.button("Extract Details"):
         files = {"file": uploaded_file}
         logger.info(f"User uploaded file: {uploaded_file.name}. Sending request to API.")
-        # api_url = "https://resumestandardizer-backend.onrender.com/extract_resume_details/"
-        api_url = "https://resumeconverter.onrender.com/extract_resume_details/"
 
         try:
-            response = requests.post(api_url, files=files)
-            response.raise_for_status()
-            logger.info(f"API request successful. Status code: {response.status_code}")
-            logger.debug(f"API response content: {response.text}")
-
-            result = response.json()
-            schema_json = result.get("schema_structured", {})
-            formatter_json = result.get("formatter_structured", {})
-
-            st.success("Resume processed successfully!")
-
-            # Display the structured JSON results in a two-column layout.
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.subheader("✅ Schema-Enforced JSON")
-                st.json(schema_json, expanded=True)
-
-            with col2:
-                st.subheader("🧩 Formatter-Based JSON")
-                st.json(formatter_json, expanded=True)
-
-            # Download buttons for each response
-            st.markdown("### 📥 Download Options")
-            colA, colB = st.columns(2)
-            with colA:
-                st.download_button(
-                    "Download Schema JSON",
-                    data=json.dumps(schema_json, indent=4),
-                    file_name="resume_schema.json",
-                    mime="application/json",
-                )
-            with colB:
-                st.download_button(
-                    "Download Formatter JSON",
-                    data=json.dumps(formatter_json, indent=4),
-                    file_name="resume_formatter.json",
-                    mime="application/json",
-                )
+            if stream_sections:
+                extract_streaming(files)
+            else:
+                response = requests.post(api_url, files=files)
+                response.raise_for_status()
+                logger.info(f"API request successful. Status code: {response.status_code}")
+                logger.debug(f"API response content: {response.text}")
+
+                result = response.json()
+                schema_json = result.get("schema_structured", {})
+                formatter_json = result.get("formatter_structured", {})
+
+                st.success("Resume processed successfully!")
+
+                # Display the structured JSON results in a two-column layout.
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.subheader("✅ Schema-Enforced JSON")
+                    st.json(schema_json, expanded=True)
+
+                with col2:
+                    st.subheader("🧩 Formatter-Based JSON")
+                    st.json(formatter_json, expanded=True)
+
+                render_download_buttons(schema_json, formatter_json)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"API request error: {e}")
@@ -0,0 +1,111 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import cache
+from cache import ExtractionCache, build_cache_key, document_digest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def disk_keys(db_path):
+    with sqlite3.connect(db_path) as connection:
+        return {key for (key,) in connection.execute("SELECT key FROM extraction_cache")}
+
+
+def test_cache_key_covers_every_component():
+    key = build_cache_key(b"resume", "v1", "model")
+    assert key == build_cache_key(b"resume", "v1", "model", "both", "")
+    others = {
+        build_cache_key(b"other", "v1", "model"),
+        build_cache_key(b"resume", "v2", "model"),
+        build_cache_key(b"resume", "v1", "other-model"),
+        build_cache_key(b"resume", "v1", "model", mode="candidate"),
+        build_cache_key(b"resume", "v1", "model", extractor_version="rules-1"),
+    }
+    assert key not in others and len(others) == 5
+    assert len(document_digest(b"resume")) == 64
+
+
+def test_memory_hit(db_path, clock):
+    extraction_cache = ExtractionCache(db_path)
+    assert extraction_cache.get("key") is None
+    extraction_cache.set("key", {"name": "Ada"})
+    assert extraction_cache.get("key") == {"name": "Ada"}
+    stats = extraction_cache.stats()
+    assert (stats["misses"], stats["memory_hits"], stats["disk_hits"], stats["stores"]) == (1, 1, 0, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_disk_hit_is_promoted_to_memory(db_path, clock):
+    ExtractionCache(db_path).set("key", {"name": "Ada"})
+    # Another worker sharing the same file
+    extraction_cache = ExtractionCache(db_path)
+    assert extraction_cache.get("key") == {"name": "Ada"}
+    assert extraction_cache.get("key") == {"name": "Ada"}
+    stats = extraction_cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["memory_entries"]) == (1, 1, 1)
+
+
+def test_memory_entries_expire_but_disk_still_serves_them(db_path, clock):
+    extraction_cache = ExtractionCache(db_path, ttl_seconds=60, disk_ttl_seconds=3600)
+    extraction_cache.set("key", {"name": "Ada"})
+    clock.now += 61
+    assert extraction_cache.get("key") == {"name": "Ada"}
+    assert extraction_cache.stats()["disk_hits"] == 1
+
+
+def test_disk_entries_expire(db_path, clock):
+    ExtractionCache(db_path, disk_ttl_seconds=3600).set("key", {"name": "Ada"})
+    clock.now += 3601
+    extraction_cache = ExtractionCache(db_path, disk_ttl_seconds=3600)
+    assert extraction_cache.get("key") is None
+    assert extraction_cache.stats()["misses"] == 1
+
+
+def test_memory_tier_is_lru_bounded(db_path, clock):
+    extraction_cache = ExtractionCache(db_path, max_entries=2)
+    extraction_cache.set("a", 1)
+    extraction_cache.set("b", 2)
+    extraction_cache.get("a")
+    extraction_cache.set("c", 3)
+    assert extraction_cache.stats()["memory_entries"] == 2
+    # "b" was least recently used, so it now comes from disk
+    assert extraction_cache.get("b") == 2
+    assert extraction_cache.stats()["disk_hits"] == 1
+
+
+def test_storing_prunes_expired_rows(db_path, clock):
+    extraction_cache = ExtractionCache(db_path, disk_ttl_seconds=3600)
+    extraction_cache.set("old", 1)
+    clock.now += 1800
+    extraction_cache.set("recent", 2)
+    clock.now += 1801
+    extraction_cache.set("new", 3)
+    assert disk_keys(db_path) == {"recent", "new"}
+
+
+def test_refreshes_are_counted(db_path):
+    extraction_cache = ExtractionCache(db_path)
+    extraction_cache.record_refresh()
+    assert extraction_cache.stats()["refreshes"] == 1
+    assert extraction_cache.stats()["hit_ratio"] == 0.0
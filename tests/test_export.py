@@ -0,0 +1,104 @@
+import json
+
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import pytest
+
+from export import ROWS, TABLES, iter_ndjson, write_tables
+from resume_store import ResumeStore
+
+RECORDS = [
+    {
+        "professional_summary": "Data engineer.",
+        "professional_experience": ["Built pipelines.", "Led a team."],
+        "awards": ["Employee of the year"],
+        "certifications": [{"certification": "AWS Solutions Architect"}],
+        "education": [{"degree": "Master of Science"}, {"degree": "B.Sc. Physics"}],
+        "credits": [{"category": "Languages", "items": ["Python", "C++"]}, {"category": "Cloud", "items": ["AWS"]}],
+        "work_experience": [
+            {
+                "client": "Acme",
+                "Project": "Lakehouse",
+                "role": "Lead",
+                "location": "Berlin",
+                "duration": "2020-2023",
+                "description": ["Moved batch jobs to streaming."],
+            }
+        ],
+        "project_experience": [
+            {
+                "Project": "Search",
+                "role": "Developer",
+                "location": None,
+                "duration": "2019",
+                "tools": ["Elasticsearch", "Kafka"],
+                "description": ["Indexed resumes."],
+                "responsibilities": ["Ranking"],
+            }
+        ],
+    },
+    # Missing and empty lists still give a resumes row
+    {"professional_summary": None, "credits": [], "education": None},
+]
+
+
+@pytest.fixture
+def resumes(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    for index, record in enumerate(RECORDS):
+        store.add(f"document-{index}", f"resume_{index}.pdf", record)
+    return store
+
+
+def expected_rows(store, table):
+    return [list(row) for resume in store.iter_records() for row in ROWS[table](resume, resume["record"])]
+
+
+def columns(table):
+    return [column for column, _ in TABLES[table]]
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_tables_round_trip(resumes, tmp_path, export_format):
+    directory = tmp_path / export_format
+    # One resume per chunk, so every table is written as several row groups or batches
+    counts = write_tables(resumes.iter_records(), str(directory), export_format, chunk_size=1)
+    for table in TABLES:
+        path = directory / f"{table}.{export_format}"
+        if export_format == "parquet":
+            read = pq.read_table(path)
+        else:
+            with ipc.open_file(path) as reader:
+                read = reader.read_all()
+        assert read.column_names == columns(table)
+        assert [list(row.values()) for row in read.to_pylist()] == expected_rows(resumes, table)
+        assert counts[table] == read.num_rows
+    assert counts["resumes"] == 2
+    assert counts["skills"] == 3
+
+
+def test_ndjson_round_trip(resumes):
+    for table in TABLES:
+        lines = b"".join(iter_ndjson(resumes.iter_records(), table, chunk_size=1)).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [
+            dict(zip(columns(table), row)) for row in expected_rows(resumes, table)
+        ]
+
+
+def test_education_rows_carry_the_level(resumes):
+    rows = expected_rows(resumes, "education")
+    assert [row[2:] for row in rows] == [["Master of Science", "master"], ["B.Sc. Physics", "bachelor"]]
+
+
+def test_empty_store_writes_every_table_with_its_schema(tmp_path):
+    store = ResumeStore(str(tmp_path / "empty.sqlite3"))
+    counts = write_tables(store.iter_records(), str(tmp_path / "out"), "parquet")
+    assert counts == {table: 0 for table in TABLES}
+    assert pq.read_table(tmp_path / "out" / "skills.parquet").column_names == columns("skills")
+
+
+def test_unknown_table_and_format_are_rejected(resumes, tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_ndjson(resumes.iter_records(), "nope"))
+    with pytest.raises(ValueError):
+        write_tables(resumes.iter_records(), str(tmp_path), "csv")
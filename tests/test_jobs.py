@@ -0,0 +1,195 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import jobs
+from jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, QueueFullError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the queue's clock; the event loop keeps the real one
+    monkeypatch.setattr(jobs, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+class Transient(Exception):
+    pass
+
+
+def make_queue(db_path, handler=None, **kwargs):
+    async def succeed(job):
+        return {"filename": job["filename"]}
+
+    kwargs.setdefault("is_transient", lambda exc: isinstance(exc, Transient))
+    return JobQueue(db_path, handler or succeed, **kwargs)
+
+
+def row(db_path, job_id):
+    with sqlite3.connect(db_path) as connection:
+        connection.row_factory = sqlite3.Row
+        return dict(connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+
+def test_enqueue_and_get(db_path, clock):
+    queue = make_queue(db_path)
+    job_id = queue.enqueue("resume.pdf", b"%PDF", {"mode": "both"})
+    job = queue.get(job_id)
+    assert (job["status"], job["filename"], job["attempts"], job["result"]) == (QUEUED, "resume.pdf", 0, None)
+    assert queue.depth() == 1
+    assert queue.get("missing") is None
+
+
+def test_enqueue_refuses_past_max_depth(db_path, clock):
+    queue = make_queue(db_path, max_depth=2)
+    queue.enqueue("a.pdf", b"a")
+    queue.enqueue("b.pdf", b"b")
+    with pytest.raises(QueueFullError):
+        queue.enqueue("c.pdf", b"c")
+    assert queue.depth() == 2
+
+
+def test_claim_takes_the_oldest_job_under_a_lease(db_path, clock):
+    queue = make_queue(db_path, lease_seconds=60)
+    first = queue.enqueue("a.pdf", b"a", {"mode": "both"})
+    clock.now += 1
+    queue.enqueue("b.pdf", b"b")
+    job = queue._claim()
+    assert (job["job_id"], job["payload"], job["options"], job["attempts"]) == (first, b"a", {"mode": "both"}, 1)
+    stored = row(db_path, first)
+    assert (stored["status"], stored["lease_expires_at"]) == (RUNNING, clock.now + 60)
+    assert queue._claim()["filename"] == "b.pdf"
+    assert queue._claim() is None
+
+
+def test_an_expired_lease_is_reclaimed(db_path, clock):
+    queue = make_queue(db_path, lease_seconds=60)
+    job_id = queue.enqueue("a.pdf", b"a")
+    queue._claim()
+    clock.now += 59
+    assert queue.reclaim_expired() == 0
+    # A live worker renews its lease
+    queue._renew_lease(job_id)
+    clock.now += 59
+    assert queue.reclaim_expired() == 0
+    clock.now += 2
+    assert queue.reclaim_expired() == 1
+    assert queue.get(job_id)["status"] == QUEUED
+    assert queue._claim()["attempts"] == 2
+
+
+def test_a_job_that_keeps_losing_its_worker_is_failed(db_path, clock):
+    queue = make_queue(db_path, lease_seconds=60, max_attempts=2)
+    job_id = queue.enqueue("a.pdf", b"a")
+    for _ in range(2):
+        assert queue._claim()["job_id"] == job_id
+        clock.now += 61
+        queue.reclaim_expired()
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert "lost 2 time(s)" in job["error"]
+    assert row(db_path, job_id)["payload"] is None
+    assert queue._claim() is None
+
+
+def test_a_successful_job_stores_its_result(db_path, clock):
+    queue = make_queue(db_path)
+    job_id = queue.enqueue("a.pdf", b"a")
+    asyncio.run(queue._process(queue._claim()))
+    job = queue.get(job_id)
+    assert (job["status"], job["result"], job["error"]) == (SUCCEEDED, {"filename": "a.pdf"}, None)
+    assert row(db_path, job_id)["payload"] is None
+    assert queue.depth() == 0
+
+
+def test_transient_failures_are_retried_with_backoff(db_path, clock):
+    async def flaky(job):
+        raise Transient("backend busy")
+
+    queue = make_queue(db_path, flaky, max_attempts=3, retry_backoff_seconds=5)
+    job_id = queue.enqueue("a.pdf", b"a")
+    for attempt, delay in ((1, 5), (2, 10)):
+        job = queue._claim()
+        assert job["attempts"] == attempt
+        asyncio.run(queue._process(job))
+        assert queue.get(job_id)["status"] == QUEUED
+        assert "backend busy" in queue.get(job_id)["error"]
+        assert row(db_path, job_id)["available_at"] == clock.now + delay
+        # Not claimable until the backoff has passed
+        clock.now += delay - 1
+        assert queue._claim() is None
+        clock.now += 1
+    asyncio.run(queue._process(queue._claim()))
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"]) == (FAILED, 3)
+    assert job["error"] == "Transient: backend busy"
+
+
+def test_other_failures_are_not_retried(db_path, clock):
+    async def broken(job):
+        raise ValueError("not a resume")
+
+    queue = make_queue(db_path, broken)
+    job_id = queue.enqueue("a.pdf", b"a")
+    asyncio.run(queue._process(queue._claim()))
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"], job["error"]) == (FAILED, 1, "ValueError: not a resume")
+
+
+def test_a_cancelled_job_is_released_without_using_an_attempt(db_path, clock):
+    started = None
+
+    async def slow(job):
+        started.set()
+        await asyncio.Event().wait()
+
+    queue = make_queue(db_path, slow)
+    job_id = queue.enqueue("a.pdf", b"a")
+
+    async def scenario():
+        nonlocal started
+        started = asyncio.Event()
+        task = asyncio.create_task(queue._process(queue._claim()))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"]) == (QUEUED, 0)
+    assert row(db_path, job_id)["lease_expires_at"] is None
+    assert queue._claim()["job_id"] == job_id
+
+
+def test_workers_drain_the_queue(db_path):
+    queue = make_queue(db_path, poll_interval=0.01)
+
+    async def scenario():
+        await queue.start(num_workers=2)
+        job_ids = [queue.enqueue(f"{i}.pdf", b"x") for i in range(4)]
+        for _ in range(200):
+            if all(queue.get(job_id)["status"] == SUCCEEDED for job_id in job_ids):
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job_ids
+
+    job_ids = asyncio.run(scenario())
+    assert [queue.get(job_id)["status"] for job_id in job_ids] == [SUCCEEDED] * 4
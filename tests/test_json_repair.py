@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from json_repair import loads_with_repair, repair_json
+
+
+def test_valid_json_is_not_repaired():
+    assert loads_with_repair('{"name": "Ada", "skills": ["Python"]}') == ({"name": "Ada", "skills": ["Python"]}, False)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Cut off inside a string value: the partial value is kept
+        ('{"summary": "Led the migra', {"summary": "Led the migra"}),
+        # Cut off inside a key: the half-written member is dropped
+        ('{"summary": "Done", "educ', {"summary": "Done"}),
+        # Cut off after a key or a colon
+        ('{"summary": "Done", "education"', {"summary": "Done"}),
+        ('{"summary": "Done", "education": ', {"summary": "Done"}),
+        # Cut off inside a literal or a number
+        ('{"summary": "Done", "current": tr', {"summary": "Done"}),
+        ('{"years": 12, "months": 3', {"years": 12}),
+        # Cut off inside nested containers
+        ('{"work": [{"client": "Acme", "description": ["Built', {"work": [{"client": "Acme", "description": ["Built"]}]}),
+        ('{"skills": ["Python", "SQL", ', {"skills": ["Python", "SQL"]}),
+        # Cut off right after an escape character
+        ('{"summary": "C:\\', {"summary": "C:"}),
+    ],
+)
+def test_truncated_objects(text, expected):
+    value, repaired = loads_with_repair(text)
+    assert repaired
+    assert value == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('```json\n{"a": 1}\n```', {"a": 1}),
+        ('Here is the resume:\n{"a": 1}\nLet me know if you need more.', {"a": 1}),
+        ('{"a": [1, 2, ], "b": {"c": 3,},}', {"a": [1, 2], "b": {"c": 3}}),
+        ('{"summary": "line one\nline two\ttabbed"}', {"summary": "line one\nline two\ttabbed"}),
+        ('[{"a": 1}, {"a": 2}] trailing', [{"a": 1}, {"a": 2}]),
+        # Brackets and escaped quotes inside strings do not end the value
+        ('{"quote": "say \\"hi\\", {ok}"} }', {"quote": 'say "hi", {ok}'}),
+    ],
+)
+def test_malformed_objects(text, expected):
+    value, repaired = loads_with_repair(text)
+    assert repaired
+    assert value == expected
+
+
+def test_repaired_text_is_valid_json():
+    repaired = repair_json('{"a": {"b": [1, {"c": "d')
+    assert json.loads(repaired) == {"a": {"b": [1, {"c": "d"}]}}
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "```\n```"])
+def test_no_json_value(text):
+    assert repair_json(text) is None
+    with pytest.raises(ValueError, match="No JSON value found"):
+        loads_with_repair(text)
+
+
+def test_unrepairable_json_raises_value_error():
+    with pytest.raises(ValueError, match="repair failed"):
+        loads_with_repair('{"a": 1 "b": 2}')
@@ -0,0 +1,137 @@
+import pytest
+
+from local_extraction import (
+    AhoCorasick,
+    LocalExtractor,
+    canonical_skill,
+    extract_credits,
+    extract_education,
+    load_skill_matcher,
+    split_sections,
+)
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return load_skill_matcher()[0]
+
+
+def values(matches):
+    return [value for _, _, value in matches]
+
+
+def test_aho_corasick_finds_every_pattern_in_one_pass():
+    automaton = AhoCorasick({"he": "he", "she": "she", "his": "his", "hers": "hers"})
+    assert values(automaton.find("his hers she he")) == ["his", "hers", "she", "he"]
+
+
+def test_aho_corasick_prefers_the_leftmost_longest_match():
+    automaton = AhoCorasick({"machine": "machine", "machine learning": "ml", "learning": "learning"})
+    assert values(automaton.find("Machine Learning and learning")) == ["ml", "learning"]
+
+
+def test_aho_corasick_only_matches_whole_words():
+    automaton = AhoCorasick({"go": "Go", "java": "Java"})
+    assert automaton.find("Google, Javascript, going") == []
+    assert automaton.find("Go/Java") == [(0, 2, "Go"), (3, 7, "Java")]
+
+
+def test_skill_matcher_uses_symbols_and_aliases(matcher):
+    assert values(matcher.find("C++ and C# but not C")) == [
+        ("C++", "Programming Languages"),
+        ("C#", "Programming Languages"),
+        ("C", "Programming Languages"),
+    ]
+    assert values(matcher.find("k8s, golang")) == [("Kubernetes", "Cloud & DevOps"), ("Go", "Programming Languages")]
+
+
+def test_canonical_skill(matcher):
+    assert canonical_skill(matcher, " k8s ") == "Kubernetes"
+    assert canonical_skill(matcher, "reactjs") == "React"
+    # Only a name that is exactly one skill is rewritten
+    assert canonical_skill(matcher, "React Native apps") == "React Native apps"
+    assert canonical_skill(matcher, "Basket weaving") == "Basket weaving"
+
+
+def test_split_sections_groups_lines_under_their_heading():
+    text = "\n".join(
+        [
+            "Jane Doe",
+            "jane@example.com",
+            "## Education",
+            "BSc Computer Science, MIT, 2015",
+            "",
+            "Skills: Python, SQL",
+            "Docker",
+            "INTERESTS",
+            "Chess",
+            "**Certifications**",
+            "- AWS Certified Developer",
+        ]
+    )
+    assert split_sections(text) == {
+        "education": ["BSc Computer Science, MIT, 2015"],
+        "credits": ["Python, SQL", "Docker"],
+        "certifications": ["- AWS Certified Developer"],
+    }
+    sections = split_sections(text, other="other", header="header")
+    assert sections["header"] == ["Jane Doe", "jane@example.com"]
+    assert sections["other"] == ["INTERESTS", "Chess"]
+
+
+def test_split_sections_puts_the_header_under_other_without_a_header_key():
+    assert split_sections("Jane Doe\nEducation\nMIT", other="other") == {"other": ["Jane Doe"], "education": ["MIT"]}
+
+
+def test_a_long_line_is_not_a_heading():
+    text = "Skills\nPython\nExperience building skills for a team of analysts over many years and several roles"
+    assert split_sections(text)["credits"] == [
+        "Python",
+        "Experience building skills for a team of analysts over many years and several roles",
+    ]
+
+
+def test_extract_education():
+    assert extract_education(["Bachelor of Science in Physics", "Stanford University", "2010 - 2014"]) == [
+        {"degree": "Bachelor of Science in Physics, Stanford University, 2010 - 2014"}
+    ]
+    # Institution first, two entries
+    assert extract_education(["Stanford University", "MS Computer Science", "MIT College", "BA History"]) == [
+        {"degree": "MS Computer Science, Stanford University"},
+        {"degree": "BA History, MIT College"},
+    ]
+    assert extract_education(["Led the chess club", "Bachelor of Arts"]) is None
+
+
+def test_extract_credits_labelled_and_by_category(matcher):
+    assert extract_credits(["Languages: Python, Go", "Docker | Kubernetes"], matcher) == [
+        {"category": "Languages", "items": ["Python", "Go"]},
+        {"category": "Cloud & DevOps", "items": ["Docker", "Kubernetes"]},
+    ]
+    # Mostly prose or unknown items: left to the model
+    assert extract_credits(["Basket weaving, pottery, Python"], matcher) is None
+
+
+def test_local_extractor_fills_plain_sections_and_counts():
+    extractor = LocalExtractor()
+    text = "Education\nMBA, Harvard University, 2019\nSkills\nPython, SQL, Docker\nCertifications\nPMP\n"
+    extracted = extractor.extract(text)
+    assert extracted["education"] == [{"degree": "MBA, Harvard University, 2019"}]
+    assert extracted["certifications"] == [{"certification": "PMP"}]
+    assert extracted["credits"] == [
+        {"category": "Programming Languages", "items": ["Python", "SQL"]},
+        {"category": "Cloud & DevOps", "items": ["Docker"]},
+    ]
+    assert extractor.extract("Education\nI studied a lot of things at several places over the years") == {}
+    stats = extractor.stats()
+    assert stats["documents"] == 2
+    assert stats["sections"]["education"] == {"filled": 1, "left_to_model": 1, "fill_rate": 0.5}
+    assert extractor.version.startswith("local-")
+
+
+def test_disabled_extractor_does_nothing():
+    extractor = LocalExtractor(enabled=False)
+    assert extractor.extract("Skills\nPython, SQL") == {}
+    assert extractor.version == ""
+    with pytest.raises(ValueError):
+        LocalExtractor(sections=("awards",))
@@ -0,0 +1,252 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, ResilientCaller, hedged_call
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the resilience module's clock; the event loop keeps the real one
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+class FakeCall:
+    """Coroutine factory that finishes after ``delays[i]`` seconds on its i-th call (or raises ``errors[i]``)."""
+
+    def __init__(self, delays, results=None, errors=None):
+        self.delays = list(delays)
+        self.results = results or [f"result_{i}" for i in range(len(self.delays))]
+        self.errors = errors or [None] * len(self.delays)
+        self.started = 0
+        self.cancelled = 0
+
+    def __call__(self):
+        index = self.started
+        self.started += 1
+        return self._run(index)
+
+    async def _run(self, index):
+        try:
+            await asyncio.sleep(self.delays[index])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.errors[index] is not None:
+            raise self.errors[index]
+        return self.results[index]
+
+
+def test_latency_tracker_needs_min_samples():
+    tracker = LatencyTracker(window=100, min_samples=5)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        tracker.record(seconds)
+    assert tracker.percentile(0.95) is None
+    tracker.record(0.5)
+    assert tracker.percentile(0.95) == 0.5
+    assert tracker.percentile(0.5) == 0.3
+
+
+def test_latency_tracker_keeps_a_sliding_window():
+    tracker = LatencyTracker(window=3, min_samples=1)
+    for seconds in (10.0, 0.1, 0.2, 0.3):
+        tracker.record(seconds)
+    assert tracker.percentile(0.99) == 0.3
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert (breaker.opened, breaker.rejected) == (1, 1)
+
+
+def test_breaker_lets_one_trial_through_after_the_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 29.9
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 0.1
+    assert not breaker.is_open()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Everyone else keeps failing fast while the trial is in flight
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_a_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened == 2
+    # The timeout restarts from the failed trial
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_a_cancelled_trial_lets_the_next_call_try(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.release_trial()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_no_hedge_when_the_primary_is_fast():
+    async def scenario():
+        call = FakeCall([0.0, 0.0])
+        hedges = []
+        assert await hedged_call(call, hedge_delay=0.05, on_hedge=lambda: hedges.append(1)) == "result_0"
+        assert (call.started, hedges) == (1, [])
+
+    asyncio.run(scenario())
+
+
+def test_a_slow_primary_is_hedged_and_the_loser_cancelled():
+    async def scenario():
+        call = FakeCall([1.0, 0.0])
+        hedges = []
+        assert await hedged_call(call, hedge_delay=0.01, on_hedge=lambda: hedges.append(1)) == "result_1"
+        await asyncio.sleep(0)
+        assert (call.started, call.cancelled, hedges) == (2, 1, [1])
+
+    asyncio.run(scenario())
+
+
+def test_the_hedge_comes_from_the_hedge_factory():
+    async def scenario():
+        primary, hedge = FakeCall([1.0]), FakeCall([0.0], results=["hedge"])
+        assert await hedged_call(primary, hedge_delay=0.01, hedge_factory=hedge) == "hedge"
+        assert (primary.started, hedge.started) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_hedged_call_only_fails_once_every_attempt_has():
+    async def scenario():
+        call = FakeCall([0.05, 0.0], errors=[None, ValueError("hedge failed")])
+        assert await hedged_call(call, hedge_delay=0.01) == "result_0"
+        call = FakeCall([0.05, 0.02], errors=[ValueError("primary failed"), ValueError("hedge failed")])
+        # The hedge fails first; the error raised is the last one
+        with pytest.raises(ValueError, match="primary failed"):
+            await hedged_call(call, hedge_delay=0.01)
+        assert call.started == 2
+
+    asyncio.run(scenario())
+
+
+def test_a_primary_failing_before_the_hedge_point_is_not_hedged():
+    async def scenario():
+        call = FakeCall([0.0, 0.0], errors=[ValueError("primary failed"), None])
+        with pytest.raises(ValueError, match="primary failed"):
+            await hedged_call(call, hedge_delay=1.0)
+        assert call.started == 1
+
+    asyncio.run(scenario())
+
+
+def test_resilient_caller_hedges_per_key():
+    async def scenario():
+        caller = ResilientCaller(CircuitBreaker(), hedge_min_delay=0.01, tracker_min_samples=3)
+        # No hedging until a key has enough samples
+        assert caller.hedge_delay("fast") is None
+        for _ in range(3):
+            await caller.call(FakeCall([0.0]), key="fast")
+        assert caller.hedge_delay("fast") == 0.01
+        assert caller.hedge_delay("slow") is None
+        call = FakeCall([0.5, 0.0])
+        assert await caller.call(call, key="fast") == "result_1"
+        await caller.call(FakeCall([0.05]), key="slow")
+        stats = caller.stats()
+        assert (stats["calls"], stats["hedges"]) == (5, 1)
+        assert stats["hedge_delay_seconds"]["slow"] is None
+        assert stats["hedge_delay_seconds"]["fast"] < 0.5
+
+    asyncio.run(scenario())
+
+
+def test_resilient_caller_feeds_the_breaker():
+    async def scenario():
+        caller = ResilientCaller(
+            CircuitBreaker(failure_threshold=2),
+            hedging_enabled=False,
+            is_failure=lambda exc: not isinstance(exc, ValueError),
+        )
+        # Errors that say nothing about the backend do not count towards opening it
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await caller.call(FakeCall([0.0], errors=[ValueError("bad input")]))
+        assert caller.breaker.state == CircuitBreaker.CLOSED
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await caller.call(FakeCall([0.0], errors=[ConnectionError("backend down")]))
+        with pytest.raises(CircuitOpenError):
+            await caller.call(FakeCall([0.0]))
+        stats = caller.stats()
+        assert (stats["circuit_state"], stats["circuit_opened"], stats["circuit_rejected"]) == ("open", 1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_resilient_caller_deadline():
+    async def scenario():
+        caller = ResilientCaller(CircuitBreaker(failure_threshold=1), deadline_seconds=0.01, hedging_enabled=False)
+        call = FakeCall([1.0])
+        with pytest.raises(asyncio.TimeoutError):
+            await caller.call(call)
+        assert call.cancelled == 1
+        assert caller.stats()["deadline_exceeded"] == 1
+        assert caller.breaker.state == CircuitBreaker.OPEN
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_trial_call_releases_the_breaker(clock):
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.now += 30
+        caller = ResilientCaller(breaker, hedging_enabled=False)
+        task = asyncio.create_task(caller.call(FakeCall([1.0])))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert await caller.call(FakeCall([0.0])) == "result_0"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
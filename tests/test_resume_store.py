@@ -0,0 +1,96 @@
+import pytest
+
+from resume_store import ResumeStore, education_level, match_expression
+
+
+def record(summary="", skills=(), role=None, client=None, degree=None):
+    return {
+        "professional_summary": summary,
+        "credits": [{"category": "Skills", "items": list(skills)}],
+        "work_experience": [{"client": client, "role": role, "description": []}] if role or client else [],
+        "education": [{"degree": degree}] if degree else [],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    store.add("python-skill", "python_skill.pdf", record("Backend developer.", skills=["Python", "C++"], degree="MSc Computing"))
+    store.add("python-summary", "python_summary.pdf", record("Wrote some Python scripts once.", skills=["Excel"]))
+    store.add("java", "java.pdf", record("Java developer.", skills=["Java", "C#"], role="Data Engineer", client="Acme Corp"))
+    return store
+
+
+def filenames(result):
+    return [hit["filename"] for hit in result["results"]]
+
+
+@pytest.mark.parametrize("keywords", ["-", "AND", "NEAR(", "*", "OR", "NOT java", '"', "python)", "col:python", "^python"])
+def test_query_syntax_in_keywords_is_matched_literally(store, keywords):
+    # Would be an FTS5 syntax error (or a different query) if the keywords were not quoted
+    result = store.search(keywords=keywords)
+    assert result["total"] == len(result["results"])
+
+
+def test_operators_are_terms_not_syntax(store):
+    assert store.search(keywords="NOT java")["total"] == 0
+    assert filenames(store.search(keywords="AND python")) == []
+    assert store.search(keywords="java")["total"] == 1
+
+
+def test_match_expression_quotes_every_term():
+    assert match_expression("NEAR( -x") == '"NEAR(" AND "-x"'
+    assert match_expression('say "hi"') == '"say" AND "hi"'
+    assert match_expression("*") == '"*"'
+    assert match_expression("pyth*") == '"pyth"*'
+    assert match_expression(role='Lead "Dev"', client="Acme") == 'roles : "Lead ""Dev""" AND clients : "Acme"'
+    assert match_expression() == ""
+
+
+def test_prefix_search(store):
+    assert sorted(filenames(store.search(keywords="pyth*"))) == ["python_skill.pdf", "python_summary.pdf"]
+
+
+def test_bm25_ranks_a_skill_above_a_summary_mention(store):
+    # bm25 needs the term to be rare across the store to give it any weight
+    for index in range(6):
+        store.add(f"filler-{index}", f"filler_{index}.pdf", record("Project manager.", skills=["Scrum"]))
+    result = store.search(keywords="python")
+    assert filenames(result) == ["python_skill.pdf", "python_summary.pdf"]
+    scores = [hit["score"] for hit in result["results"]]
+    assert scores[0] > scores[1]
+
+
+def test_symbols_stay_part_of_a_skill(store):
+    assert filenames(store.search(keywords="c++")) == ["python_skill.pdf"]
+    assert filenames(store.search(keywords="c#")) == ["java.pdf"]
+
+
+def test_role_client_skill_and_education_filters(store):
+    assert filenames(store.search(role="data engineer", client="acme")) == ["java.pdf"]
+    assert filenames(store.search(skills=["python", "c++"])) == ["python_skill.pdf"]
+    assert filenames(store.search(skills=["python", "java"], match_all_skills=False)) == ["java.pdf", "python_skill.pdf"]
+    assert filenames(store.search(education="master")) == ["python_skill.pdf"]
+    assert store.search(keywords="python", education="master")["total"] == 1
+
+
+def test_pagination_and_total(store):
+    page = store.search(limit=2, offset=1)
+    assert page["total"] == 3
+    # Without a ranked filter, most recently added first
+    assert filenames(page) == ["python_summary.pdf", "python_skill.pdf"]
+
+
+def test_replacing_a_document_reindexes_it(store):
+    store.add("java", "java.pdf", record("Now a Rust developer.", skills=["Rust"]))
+    assert store.search(keywords="java")["total"] == 0
+    assert filenames(store.search(skills=["rust"])) == ["java.pdf"]
+    assert store.search()["total"] == 3
+
+
+@pytest.mark.parametrize(
+    "degree, level",
+    [("PhD in Physics", "doctorate"), ("Master of Science, Bachelor of Arts", "master"), ("B.Tech", "bachelor"), ("Bootcamp", "other")],
+)
+def test_education_level(degree, level):
+    assert education_level(degree) == level
@@ -0,0 +1,151 @@
+import pytest
+
+from revisions import RevisionIndex, changed_fields
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 555 0100
+
+Summary
+Backend engineer with eight years of experience building data platforms and APIs for logistics companies.
+
+Experience
+Senior Software Engineer, Acme Logistics, 2019 - Present
+- Designed the shipment tracking service handling forty million events a day
+- Led the migration of the billing system from a monolith to event driven services
+- Mentored five engineers and ran the weekly architecture review
+Software Engineer, Globex, 2015 - 2019
+- Built the internal reporting API used by every regional warehouse team
+- Cut nightly batch runtimes from six hours to forty minutes
+
+Education
+Bachelor of Science in Computer Science, Arizona State University, 2015
+
+Skills
+Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform
+
+Certifications
+AWS Certified Solutions Architect
+"""
+
+CONTEXT = "prompts-v1/model/both"
+
+RESULT = {
+    "schema_structured": {
+        "professional_summary": "Backend engineer",
+        "work_experience": [{"company": "Acme Logistics"}, {"company": "Globex"}],
+        "education": [{"degree": "Bachelor of Science in Computer Science"}],
+        "credits": [{"category": "Skills", "items": ["Python", "Go"]}],
+        "certifications": [{"certification": "AWS Certified Solutions Architect"}],
+    },
+    "formatter_structured": {"name": "Jane Doe", "email": "jane.doe@example.com", "education": "BSc"},
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return RevisionIndex(str(tmp_path / "revisions.sqlite3"))
+
+
+def test_unchanged_text_changes_nothing():
+    assert changed_fields(RESUME, RESUME) == (set(), False)
+
+
+def test_markup_differences_between_converters_are_ignored():
+    docx_copy = RESUME.replace("- Designed", "• Designed").replace("Summary", "**Summary**")
+    assert changed_fields(RESUME, docx_copy) == (set(), False)
+
+
+def test_one_changed_section():
+    revised = RESUME.replace("Python, Go,", "Python, Go, Rust,")
+    assert changed_fields(RESUME, revised) == ({"credits"}, False)
+
+
+def test_a_changed_job_also_changes_the_fields_drawn_from_it():
+    revised = RESUME.replace("five engineers", "seven engineers")
+    assert changed_fields(RESUME, revised) == ({"work_experience", "professional_experience", "awards"}, False)
+
+
+def test_a_header_only_change():
+    revised = RESUME.replace("+1 555 0100", "+1 555 0199")
+    assert changed_fields(RESUME, revised) == (set(), True)
+
+
+def test_fields_without_a_section_are_drawn_from_other_headings():
+    revised = RESUME + "\nVOLUNTEERING\nFood bank driver\n"
+    fields, other_changed = changed_fields(RESUME, revised)
+    assert other_changed
+    # No section of their own in either revision
+    assert "project_experience" in fields
+    assert "education" not in fields
+
+
+def test_reusable_unchanged_text_serves_the_whole_result(index):
+    index.add(RESUME, CONTEXT, RESULT)
+    reused = index.reusable(RESUME, CONTEXT)
+    assert reused["unchanged"]
+    assert reused["schema_structured"] == RESULT["schema_structured"]
+    assert reused["formatter_structured"] == RESULT["formatter_structured"]
+    assert index.stats()["unchanged"] == 1
+
+
+def test_reusable_keeps_the_sections_that_did_not_change(index):
+    index.add(RESUME, CONTEXT, RESULT)
+    reused = index.reusable(RESUME.replace("Python, Go,", "Python, Go, Rust,"), CONTEXT)
+    assert not reused["unchanged"]
+    assert reused["changed"] == {"schema_structured": ["credits"], "formatter_structured": ["credits"]}
+    assert "credits" not in reused["schema_structured"]
+    assert reused["schema_structured"]["education"] == RESULT["schema_structured"]["education"]
+    # The formatter's own keys come from the header, which did not change
+    assert reused["formatter_structured"] == RESULT["formatter_structured"]
+    stats = index.stats()
+    assert (stats["sections_extracted"], stats["sections_reused"]) == (1, 7)
+
+
+def test_reusable_header_change_re_extracts_the_formatters_own_keys(index):
+    index.add(RESUME, CONTEXT, RESULT)
+    reused = index.reusable(RESUME.replace("jane.doe@example.com", "jane@doe.dev"), CONTEXT)
+    assert not reused["unchanged"]
+    assert reused["changed"] == {"schema_structured": [], "formatter_structured": ["email", "name"]}
+    assert reused["schema_structured"] == RESULT["schema_structured"]
+    assert reused["formatter_structured"] == {"education": "BSc"}
+
+
+def test_a_different_resume_is_a_miss(index):
+    index.add(RESUME, CONTEXT, RESULT)
+    other = """John Smith
+john@example.com
+
+Summary
+Registered nurse with a decade of intensive care experience in large teaching hospitals.
+
+Experience
+Charge Nurse, Mercy General Hospital, 2016 - Present
+- Coordinated a team of twelve nurses across the night shift
+"""
+    assert index.reusable(other, CONTEXT) is None
+    assert index.stats()["misses"] == 1
+
+
+def test_a_revision_below_the_similarity_threshold_is_a_miss(tmp_path):
+    revised = RESUME.replace(
+        "- Cut nightly batch runtimes from six hours to forty minutes\n",
+        "- Cut nightly batch runtimes from six hours to forty minutes\n"
+        "- Introduced contract tests for every partner integration we ran\n",
+    )
+    lenient = RevisionIndex(str(tmp_path / "lenient.sqlite3"), min_similarity=0.7)
+    strict = RevisionIndex(str(tmp_path / "strict.sqlite3"), min_similarity=0.95)
+    for index in (lenient, strict):
+        index.add(RESUME, CONTEXT, RESULT)
+    assert lenient.reusable(revised, CONTEXT)["changed"]["schema_structured"] == [
+        "awards",
+        "professional_experience",
+        "work_experience",
+    ]
+    assert strict.reusable(revised, CONTEXT) is None
+    assert strict.stats()["misses"] == 1
+
+
+def test_results_are_scoped_by_context(index):
+    index.add(RESUME, CONTEXT, RESULT)
+    assert index.reusable(RESUME, "prompts-v2/model/both") is None
+    assert index.stats()["match_ratio"] == 0.0
@@ -0,0 +1,236 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import scheduler
+from scheduler import LLMScheduler, Priority, TokenBucket, current_priority, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the scheduler module's clock; the event loop keeps the real one
+    monkeypatch.setattr(scheduler, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_bucket_starts_full_and_refills_at_its_rate(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.time_until(60) == 0.0
+    bucket.take(60)
+    assert bucket.time_until(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.time_until(1) == pytest.approx(0.5)
+    clock.now += 1000
+    # Never refills past capacity
+    bucket.take(0)
+    assert bucket.tokens == 60
+
+
+def test_requests_above_capacity_wait_for_a_full_bucket(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+    bucket.take(5)
+    assert bucket.time_until(100) == pytest.approx(5.0)
+    bucket.take(100)
+    assert bucket.tokens == -5
+
+
+def test_adjust_debits_and_refunds_up_to_capacity(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    bucket.take(30)
+    bucket.adjust(10)
+    assert bucket.tokens == 20
+    bucket.adjust(-100)
+    assert bucket.tokens == 60
+
+
+async def hold_slot(llm_scheduler, ready, release, priority=None, tokens=0):
+    async with llm_scheduler.slot(tokens, priority):
+        ready.set()
+        await release.wait()
+
+
+def test_batch_work_yields_to_interactive():
+    async def scenario():
+        llm_scheduler = LLMScheduler(max_concurrency=1)
+        started, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(hold_slot(llm_scheduler, started, release))
+        await started.wait()
+        order = []
+
+        async def call(name, priority):
+            async with llm_scheduler.slot(priority=priority):
+                order.append(name)
+
+        # Queued first, but behind every interactive call
+        batch = [asyncio.create_task(call(f"batch_{i}", Priority.BATCH)) for i in range(2)]
+        await asyncio.sleep(0)
+        interactive = [asyncio.create_task(call(f"interactive_{i}", Priority.INTERACTIVE)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert llm_scheduler.stats()["queued"] == 4
+        release.set()
+        await asyncio.gather(holder, *batch, *interactive)
+        assert order == ["interactive_0", "interactive_1", "batch_0", "batch_1"]
+        assert llm_scheduler.stats()["queue_wait"]["batch"]["count"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_priority_defaults_to_the_callers_context():
+    async def scenario():
+        llm_scheduler = LLMScheduler(max_concurrency=1)
+
+        async def batch_call():
+            current_priority.set(Priority.BATCH)
+            async with llm_scheduler.slot():
+                pass
+
+        await asyncio.create_task(batch_call())
+        assert llm_scheduler.stats()["queue_wait"]["batch"]["count"] == 1
+        assert llm_scheduler.stats()["queue_wait"]["interactive"]["count"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_is_capped():
+    async def scenario():
+        llm_scheduler = LLMScheduler(max_concurrency=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with llm_scheduler.slot():
+                peak = max(peak, llm_scheduler.stats()["active"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
+        assert llm_scheduler.stats()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_waiter_takes_no_budget_and_does_not_block_the_queue():
+    async def scenario():
+        llm_scheduler = LLMScheduler(requests_per_minute=100, max_concurrency=1)
+        started, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(hold_slot(llm_scheduler, started, release))
+        await started.wait()
+        cancelled = asyncio.create_task(hold_slot(llm_scheduler, asyncio.Event(), asyncio.Event(), tokens=500))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        after_holder = llm_scheduler.request_bucket.tokens
+        next_ready, next_release = asyncio.Event(), asyncio.Event()
+        waiter = asyncio.create_task(hold_slot(llm_scheduler, next_ready, next_release))
+        await asyncio.sleep(0)
+        release.set()
+        await next_ready.wait()
+        # Only the waiter that actually got the slot paid for it
+        assert llm_scheduler.request_bucket.tokens == pytest.approx(after_holder - 1, abs=0.01)
+        next_release.set()
+        await asyncio.gather(holder, waiter)
+        assert (llm_scheduler.stats()["active"], llm_scheduler.stats()["queued"]) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_a_waiter_cancelled_as_it_is_granted_gives_back_its_slot_and_tokens():
+    async def scenario():
+        llm_scheduler = LLMScheduler(requests_per_minute=100, tokens_per_minute=10_000, max_concurrency=1)
+        # The only slot is taken
+        llm_scheduler._active = 1
+        waiter = asyncio.create_task(hold_slot(llm_scheduler, asyncio.Event(), asyncio.Event(), tokens=500))
+        await asyncio.sleep(0)
+        requests_before = llm_scheduler.request_bucket.tokens
+        tokens_before = llm_scheduler.token_bucket.tokens
+        # Freeing the slot grants it to the waiter, which is cancelled before it gets to run
+        llm_scheduler._release()
+        assert llm_scheduler.stats()["active"] == 1
+        assert llm_scheduler.request_bucket.tokens < requests_before
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert llm_scheduler.stats()["active"] == 0
+        assert llm_scheduler.request_bucket.tokens == pytest.approx(requests_before, abs=0.01)
+        assert llm_scheduler.token_bucket.tokens == pytest.approx(tokens_before, abs=1)
+
+    asyncio.run(scenario())
+
+
+def test_an_empty_request_bucket_throttles_until_it_refills():
+    async def scenario():
+        llm_scheduler = LLMScheduler(max_concurrency=10)
+        # 100 requests a second, one at a time
+        llm_scheduler.request_bucket = TokenBucket(6000, capacity=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(3):
+            async with llm_scheduler.slot():
+                pass
+        assert loop.time() - start >= 0.015
+        assert llm_scheduler.stats()["throttle_events"] == 2
+
+    asyncio.run(scenario())
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+def test_submit_retries_retryable_errors_and_counts_them():
+    async def scenario():
+        llm_scheduler = LLMScheduler(
+            max_retries=2, base_backoff_seconds=0, is_retryable=lambda exc: isinstance(exc, RateLimited)
+        )
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RateLimited()
+            return SimpleNamespace(usage_metadata=None)
+
+        await llm_scheduler.submit(flaky)
+        stats = llm_scheduler.stats()
+        assert (stats["requests"], stats["retries"], stats["rate_limited_responses"], stats["failures"]) == (3, 2, 2, 0)
+
+        async def always_failing():
+            raise RateLimited()
+
+        with pytest.raises(RateLimited):
+            await llm_scheduler.submit(always_failing)
+        assert llm_scheduler.stats()["failures"] == 1
+
+        async def broken():
+            raise ValueError("not retryable")
+
+        with pytest.raises(ValueError):
+            await llm_scheduler.submit(broken)
+        assert llm_scheduler.stats()["retries"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_actual_usage_corrects_the_token_estimate(clock):
+    llm_scheduler = LLMScheduler(tokens_per_minute=10_000)
+    llm_scheduler.token_bucket.take(1000)
+    llm_scheduler.record_usage(1000, SimpleNamespace(usage_metadata=SimpleNamespace(total_token_count=1500)))
+    assert llm_scheduler.token_bucket.tokens == 8500
+    llm_scheduler.record_usage(1000, SimpleNamespace(usage_metadata=SimpleNamespace(total_token_count=200)))
+    assert llm_scheduler.token_bucket.tokens == 9300
+
+
+def test_estimate_tokens():
+    pdf = SimpleNamespace(text=None, inline_data=SimpleNamespace(data=b"x" * 2000))
+    assert estimate_tokens(["a" * 400, SimpleNamespace(text="b" * 40), pdf]) == 100 + 10 + 10
@@ -0,0 +1,132 @@
+import asyncio
+import gc
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flights, calls = SingleFlight(), []
+        release = asyncio.Event()
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return {"result": 1}
+
+        waiters = [asyncio.create_task(flights.do("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flights.stats() == {"executed": 1, "coalesced": 4, "in_flight": 1}
+        release.set()
+        results = await asyncio.gather(*waiters)
+        assert calls == [1]
+        assert all(result is results[0] for result in results)
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately_and_a_finished_key_runs_again():
+    async def scenario():
+        flights, calls = SingleFlight(), []
+
+        async def work(key):
+            calls.append(key)
+            return key
+
+        assert await asyncio.gather(flights.do("a", lambda: work("a")), flights.do("b", lambda: work("b"))) == ["a", "b"]
+        assert await flights.do("a", lambda: work("a")) == "a"
+        assert calls == ["a", "b", "a"]
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_call():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def work():
+            await release.wait()
+            finished.append(1)
+            return "done"
+
+        first = asyncio.create_task(flights.do("key", work))
+        second = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        release.set()
+        assert await second == "done"
+        assert finished == [1]
+
+    asyncio.run(scenario())
+
+
+def test_work_finishes_even_when_every_caller_is_cancelled():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def work():
+            await release.wait()
+            finished.append(1)
+
+        caller = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert finished == [1]
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_an_exception_reaches_every_waiter():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            raise ValueError("conversion failed")
+
+        waiters = [asyncio.create_task(flights.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert [type(result) for result in results] == [ValueError] * 3
+        assert len({id(result) for result in results}) == 1
+        # A failure is not remembered: the next call runs the work again
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_an_unobserved_failure_is_not_reported_as_never_retrieved():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        unhandled = []
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            raise ValueError("nobody is waiting")
+
+        caller = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        gc.collect()
+        assert unhandled == []
+
+    asyncio.run(scenario())
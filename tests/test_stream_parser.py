@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from stream_parser import TopLevelSectionParser
+
+RESUME = {
+    "professional_summary": "Data engineer, 8+ years.",
+    "education": [{"degree": "B.Sc. Computer Science"}],
+    "credits": [{"category": "Languages", "items": ["Python", "C++", "C#"]}],
+    "quote": 'He said "ship it", then {left}',
+    "escaped_key\"": None,
+    "years": 12,
+    "remote": True,
+}
+
+
+def feed_all(parser, chunks):
+    sections = []
+    for chunk in chunks:
+        sections.extend(parser.feed(chunk))
+    return sections
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_sections_split_across_chunk_boundaries(size):
+    text = json.dumps(RESUME, indent=2)
+    parser = TopLevelSectionParser()
+    sections = feed_all(parser, [text[i:i + size] for i in range(0, len(text), size)])
+    assert sections == list(RESUME.items())
+    assert parser.done
+
+
+def test_each_section_is_reported_in_the_chunk_that_completes_it():
+    parser = TopLevelSectionParser()
+    assert parser.feed('{"profes') == []
+    assert parser.feed('sional_summary": "Data') == []
+    assert parser.feed(' engineer", "educ') == [("professional_summary", "Data engineer")]
+    assert parser.feed('ation": [{"degree": "B') == []
+    assert parser.feed('.Sc."}]}') == [("education", [{"degree": "B.Sc."}])]
+    assert parser.done
+
+
+def test_escape_split_across_chunks():
+    parser = TopLevelSectionParser()
+    assert feed_all(parser, ['{"a": "x\\', '"y", "b": 1}']) == [("a", 'x"y'), ("b", 1)]
+
+
+def test_truncated_stream_reports_only_complete_sections():
+    parser = TopLevelSectionParser()
+    sections = feed_all(parser, ['{"summary": "Done", "education": [{"degree": "B.Sc'])
+    assert sections == [("summary", "Done")]
+    assert not parser.done
+
+
+def test_undecodable_section_is_skipped_and_parsing_continues():
+    parser = TopLevelSectionParser()
+    sections = feed_all(parser, ['{"a": 1, "b": tru', 'x, "c": [1, 2], "d": {"e": nul}, "f": "ok"}'])
+    assert sections == [("a", 1), ("c", [1, 2]), ("f", "ok")]
+    assert parser.done
+
+
+def test_undecodable_last_section_still_ends_the_object():
+    parser = TopLevelSectionParser()
+    assert feed_all(parser, ['{"a": 1, "b": [1,,2]}']) == [("a", 1)]
+    assert parser.done
+
+
+def test_text_before_the_object_is_ignored():
+    parser = TopLevelSectionParser()
+    assert feed_all(parser, ['```json\n{"a": ', '1}\n```']) == [("a", 1)]
+    assert parser.done
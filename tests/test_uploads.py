@@ -0,0 +1,135 @@
+import io
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import (
+    BodySizeLimitMiddleware,
+    UploadSniffMiddleware,
+    read_upload,
+    sniff_format,
+    sniff_multipart_head,
+    verify_format,
+)
+
+PDF = b"%PDF-1.7\n" + b"0" * 4096
+
+
+def make_zip(names):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, "<xml/>")
+    return buffer.getvalue()
+
+
+DOCX = make_zip(["[Content_Types].xml", "word/document.xml"])
+ZIP = make_zip(["notes.txt"])
+
+
+def multipart(filename, content, boundary=b"boundary"):
+    return (
+        b"--" + boundary + b"\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="' + filename.encode() + b'"\r\n'
+        b"Content-Type: application/octet-stream\r\n\r\n" + content + b"\r\n--" + boundary + b"--\r\n"
+    )
+
+
+def test_sniff_format():
+    assert sniff_format(PDF) == ".pdf"
+    assert sniff_format(b"junk" * 10 + PDF) == ".pdf"
+    assert sniff_format(DOCX[:8]) == ".zip"
+    assert sniff_format(DOCX, io.BytesIO(DOCX)) == ".docx"
+    assert sniff_format(ZIP, io.BytesIO(ZIP)) == ".zip"
+    assert sniff_format(b"PK\x03\x04 truncated", io.BytesIO(b"PK\x03\x04 truncated")) is None
+    assert sniff_format(b"plain text") is None
+
+
+def test_verify_format_accepts_matching_content_and_rewinds():
+    file = io.BytesIO(DOCX)
+    verify_format(file, ".docx")
+    assert file.tell() == 0
+    verify_format(io.BytesIO(PDF), ".pdf")
+
+
+@pytest.mark.parametrize(
+    "content, extension",
+    [
+        (PDF, ".docx"),  # a PDF renamed to .docx
+        (ZIP, ".docx"),  # a ZIP that is not a DOCX
+        (DOCX, ".pdf"),
+        (b"plain text", ".pdf"),
+    ],
+)
+def test_verify_format_rejects_mislabelled_uploads(content, extension):
+    with pytest.raises(HTTPException) as excinfo:
+        verify_format(io.BytesIO(content), extension)
+    assert excinfo.value.status_code == 400
+    assert extension.lstrip(".").upper() in excinfo.value.detail
+
+
+def test_read_upload_rejects_oversized_files_before_sniffing():
+    upload = SimpleNamespace(size=None, file=io.BytesIO(b"not even a pdf" * 100))
+    with pytest.raises(HTTPException) as excinfo:
+        read_upload(upload, ".pdf", max_bytes=100)
+    assert excinfo.value.status_code == 413
+    assert upload.file.tell() == 0
+
+
+def test_read_upload_returns_the_bytes():
+    assert read_upload(SimpleNamespace(size=len(PDF), file=io.BytesIO(PDF)), ".pdf", len(PDF)) == PDF
+
+
+def test_sniff_multipart_head_waits_for_enough_bytes():
+    body = multipart("resume.pdf", PDF)
+    header_end = body.index(b"\r\n\r\n") + 4
+    assert sniff_multipart_head(body[:20], False, (".pdf", ".docx")) is False
+    assert sniff_multipart_head(body[: header_end + 10], False, (".pdf", ".docx")) is False
+    assert sniff_multipart_head(body, True, (".pdf", ".docx")) is True
+
+
+def test_sniff_multipart_head_rejects_a_pdf_renamed_to_docx():
+    with pytest.raises(HTTPException) as excinfo:
+        sniff_multipart_head(multipart("resume.docx", PDF), False, (".pdf", ".docx"))
+    assert excinfo.value.status_code == 400
+
+
+def test_sniff_multipart_head_leaves_zip_versus_docx_to_verify_format():
+    assert sniff_multipart_head(multipart("resume.docx", ZIP), True, (".pdf", ".docx")) is True
+
+
+def test_sniff_multipart_head_ignores_other_extensions():
+    assert sniff_multipart_head(multipart("notes.txt", b"hello"), True, (".pdf", ".docx")) is True
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadSniffMiddleware, paths=["/upload"], extensions=(".pdf", ".docx"))
+    app.add_middleware(BodySizeLimitMiddleware, max_body_bytes=64 * 1024, path_limits={"/upload": 16 * 1024})
+    return TestClient(app)
+
+
+def test_middleware_passes_a_matching_upload(client):
+    response = client.post("/upload", files={"file": ("resume.pdf", PDF, "application/pdf")})
+    assert response.status_code == 200
+    assert response.json() == {"size": len(PDF)}
+
+
+def test_middleware_rejects_a_mislabelled_upload(client):
+    response = client.post("/upload", files={"file": ("resume.docx", PDF, "application/octet-stream")})
+    assert response.status_code == 400
+
+
+def test_middleware_rejects_an_oversized_upload(client):
+    response = client.post("/upload", files={"file": ("resume.pdf", PDF * 10, "application/pdf")})
+    assert response.status_code == 413
+    assert "16384" in response.json()["detail"]
@@ -0,0 +1,58 @@
+import pathlib
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from metrics import STAGE_DURATION
+
+# The timing of the request (or queued job) being handled, installed by the timing middleware
+_current_timing = ContextVar("request_timing", default=None)
+
+# Metric label per extension; anything else a client names its file is "other", so labels stay bounded
+FILE_TYPE_LABELS = {".pdf": "pdf", ".docx": "docx"}
+
+
+class RequestTiming:
+    def __init__(self):
+        # Stage durations in milliseconds, in the order the stages first ran
+        self.stages = {}
+        self.file_type = "none"
+        # Overrides the outcome derived from the status code, e.g. "cache_hit"
+        self.outcome = None
+
+
+def start_request_timing():
+    timing = RequestTiming()
+    _current_timing.set(timing)
+    return timing
+
+
+def set_file_type(filename):
+    """Label the current request's metrics with the upload's type: "pdf", "docx" or "other"."""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.file_type = FILE_TYPE_LABELS.get(pathlib.Path(filename or "").suffix.lower(), "other")
+
+
+def set_outcome(outcome):
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.outcome = outcome
+
+
+@contextmanager
+def stage(name):
+    """Time a block into the stage histogram and the current request's Server-Timing entries."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timing = _current_timing.get()
+        STAGE_DURATION.observe(elapsed, stage=name, file_type=timing.file_type if timing else "none")
+        if timing is not None:
+            timing.stages[name] = timing.stages.get(name, 0.0) + elapsed * 1000
+
+
+def server_timing_header(stages):
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in stages.items())
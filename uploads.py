@@ -0,0 +1,185 @@
+import logging
+import os
+import re
+import zipfile
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.formparsers import MultiPartParser
+
+logger = logging.getLogger(__name__)
+
+# Enough to find the PDF header, which may follow a little leading junk
+SNIFF_BYTES = 8 * 1024
+
+# Boundaries and part headers sent on top of the file bytes themselves
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+_FILENAME_PATTERN = re.compile(rb'filename="([^"\r\n]*)"')
+
+
+def set_spool_threshold(max_bytes):
+    """Form uploads larger than this are spooled to a temporary file instead of kept in memory."""
+    MultiPartParser.spool_max_size = max_bytes
+
+
+def sniff_format(head, file=None):
+    """Detect ".pdf", ".docx" or ".zip" from the first bytes; ``file`` lets ZIPs be told apart from DOCX."""
+    if b"%PDF-" in head[:1024]:
+        return ".pdf"
+    if head.startswith(b"PK\x03\x04"):
+        if file is None:
+            return ".zip"
+        # Only the central directory at the end of the file is read
+        try:
+            with zipfile.ZipFile(file) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            return None
+        return ".docx" if "word/document.xml" in names else ".zip"
+    return None
+
+
+def _raise_format_mismatch(detected, extension):
+    logger.warning(f"Upload content sniffed as {detected or 'unknown'} does not match extension {extension}")
+    raise HTTPException(
+        status_code=400,
+        detail=f"File content is not a valid {extension.lstrip('.').upper()} document.",
+    )
+
+
+def sniff_multipart_head(body, complete, extensions):
+    """Check the first file part of a multipart body prefix against its filename's extension.
+
+    Returns False while more of the body is needed, True once the file part
+    looks right (or is not one of ``extensions``) and raises a 400 as soon as
+    its first bytes rule the extension out. DOCX is only told apart from ZIP
+    by ``verify_format`` once the whole file is there.
+    """
+    match = _FILENAME_PATTERN.search(body)
+    header_end = body.find(b"\r\n\r\n", match.end()) if match else -1
+    if header_end < 0:
+        return complete
+    extension = os.path.splitext(match.group(1).decode("utf-8", "replace"))[1].lower()
+    if extension not in extensions:
+        return True
+    head = body[header_end + 4:]
+    # The PDF header may follow up to 1 KB of junk; a DOCX (ZIP) starts with its 4-byte signature
+    needed = 1024 if extension == ".pdf" else 4
+    if len(head) < needed and not complete:
+        return False
+    detected = sniff_format(head[:SNIFF_BYTES])
+    if detected != extension and not (extension == ".docx" and detected == ".zip"):
+        _raise_format_mismatch(detected, extension)
+    return True
+
+
+def verify_format(file, extension):
+    """Raise a 400 unless the content of ``file`` matches the file extension it was uploaded with."""
+    file.seek(0)
+    detected = sniff_format(file.read(SNIFF_BYTES), file)
+    file.seek(0)
+    if detected != extension:
+        _raise_format_mismatch(detected, extension)
+
+
+def _file_size(upload):
+    if upload.size is not None:
+        return upload.size
+    position = upload.file.tell()
+    size = upload.file.seek(0, 2)
+    upload.file.seek(position)
+    return size
+
+
+def read_upload(upload, extension, max_bytes):
+    """Check the size and the sniffed format of a (spooled) upload, then read it into memory exactly once.
+
+    Blocking: run it on the thread pool.
+    """
+    if _file_size(upload) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes} byte upload limit.")
+    verify_format(upload.file, extension)
+    return upload.file.read()
+
+
+class BodySizeLimitMiddleware:
+    """Rejects request bodies over a per-path limit before they are parsed.
+
+    A declared Content-Length over the limit is answered with a 413 without
+    reading the body at all; chunked bodies are cut off as soon as the limit
+    is crossed.
+    """
+
+    def __init__(self, app, max_body_bytes, path_limits=None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_body_bytes)
+        detail = f"Request body exceeds the {limit} byte limit."
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class UploadSniffMiddleware:
+    """Rejects a single-file upload whose first bytes do not match its extension while the body is still arriving.
+
+    Only the start of the body is buffered, up to the file part's first
+    bytes, so a mislabelled upload gets its 400 before the rest of it is
+    read and spooled. The full check (``read_upload``) still runs on what
+    gets through.
+    """
+
+    def __init__(self, app, paths, extensions):
+        self.app = app
+        self.paths = set(paths)
+        self.extensions = tuple(extensions)
+
+    async def __call__(self, scope, receive, send):
+        content_type = dict(scope.get("headers", [])).get(b"content-type", b"")
+        if (
+            scope["type"] != "http"
+            or scope["path"] not in self.paths
+            or not content_type.startswith(b"multipart/form-data")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        settled = False
+
+        async def sniffing_receive():
+            nonlocal settled
+            message = await receive()
+            if not settled and message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+                complete = not message.get("more_body", False)
+                # Give up on a part header that never shows up rather than buffer the whole body
+                giving_up = len(body) > MULTIPART_OVERHEAD_BYTES + SNIFF_BYTES
+                settled = sniff_multipart_head(bytes(body), complete or giving_up, self.extensions)
+                if settled:
+                    body.clear()
+            return message
+
+        await self.app(scope, sniffing_receive, send)